@@ -0,0 +1,120 @@
+"""Cookie数据的内存占用测试
+
+生成（或复用）合成Cookie文件，在独立的子进程中分别加载，用tracemalloc测量：
+
+- dicts：json.load得到的dict列表（原来的存放方式）
+- records：cookie_core.load_cookie_file得到的紧凑记录及域名索引
+
+输出加载完成后仍占用的内存、加载过程中的峰值以及平均每条Cookie的字节数。
+
+用法：
+    python benchmarks/bench_memory.py --count 1000000 --output memory.json
+"""
+import os
+import sys
+import gc
+import json
+import argparse
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synth_jar import write_jar  # noqa: E402
+
+VARIANTS = ['dicts', 'records']
+
+def _load(variant: str, jar_path: str):
+    if variant == 'dicts':
+        with open(jar_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    import cookie_core
+    return cookie_core.load_cookie_file(jar_path)
+
+def measure(variant: str, jar_path: str) -> dict:
+    """在当前进程中加载一次并测量内存"""
+    # 先导入模块，模块本身的内存不计入
+    if variant != 'dicts':
+        import cookie_core  # noqa: F401
+    gc.collect()
+    tracemalloc.start()
+    data = _load(variant, jar_path)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(data)
+    return {
+        'variant': variant,
+        'cookies': count,
+        'bytes': current,
+        'peak_bytes': peak,
+        'bytes_per_cookie': round(current / count, 1) if count else 0,
+    }
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ''
+
+def run_variant(variant: str, jar_path: str) -> dict:
+    """在子进程中测量，互不影响"""
+    output = subprocess.run([sys.executable, __file__, '--measure', variant, '--jar', jar_path],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+def main():
+    parser = argparse.ArgumentParser(description='测量Cookie数据加载后的内存占用')
+    parser.add_argument('--count', type=int, default=1000000, help='Cookie数量（默认1000000）')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    parser.add_argument('--data-dir', help='合成文件的存放目录，默认使用临时目录')
+    parser.add_argument('--output', help='结果JSON文件，默认输出到标准输出')
+    parser.add_argument('--measure', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--jar', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.jar)))
+        return
+
+    def run(data_dir):
+        jar_path = os.path.join(data_dir, f'jar_{args.count}_{args.seed}.json')
+        if not os.path.exists(jar_path):
+            write_jar(jar_path, args.count, args.seed)
+        return jar_path, [run_variant(variant, jar_path) for variant in VARIANTS]
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        jar_path, variants = run(args.data_dir)
+        file_bytes = os.path.getsize(jar_path)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            jar_path, variants = run(tmp)
+            file_bytes = os.path.getsize(jar_path)
+
+    baseline = variants[0]['bytes']
+    for variant in variants:
+        variant['ratio'] = round(variant['bytes'] / baseline, 3) if baseline else 0
+
+    results = {
+        'revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'file_bytes': file_bytes,
+        'variants': variants,
+    }
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
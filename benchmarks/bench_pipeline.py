@@ -0,0 +1,155 @@
+"""提取流程各阶段耗时测试
+
+为每个规模生成（或复用）合成Cookie文件，分别测量：
+
+- file_read：读取整个文件
+- json_loads：json.loads解析整个文本
+- stream_load：cookie_core.load_cookie_file流式解析并建立域名索引
+- filter：若干典型查询的域名过滤
+- display_results：把结果填入界面表格（需要PySide6，缺少时跳过）
+- save_results：各种导出格式的序列化
+
+结果以JSON输出，便于比较不同版本的性能。
+
+用法：
+    python benchmarks/bench_pipeline.py --sizes 10000,100000,1000000 --output pipeline.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cookie_core  # noqa: E402
+from synth_jar import write_jar  # noqa: E402
+
+# 典型查询：纯文本、后缀、正则，以及逐步细化的输入
+QUERIES = ['twitter', '.google.com', 'bilibili|zhihu', 'g', 'go', 'goo', 'goog', 'google', '*.google.com', '*tube*']
+SAVE_FORMATS = ['.json', '.ndjson', '.json.gz']
+
+def timed(fn, *args, **kwargs):
+    """返回(结果, 耗时秒数)"""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ''
+
+def _make_gui():
+    """创建用于测量表格填充的主窗口，没有PySide6时返回None"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PySide6.QtWidgets import QApplication
+        import cookie_gui
+    except ImportError:
+        return None, None
+    app = QApplication.instance() or QApplication([])
+    window = cookie_gui.CookieExtractorGUI()
+    window.show()
+    return app, window
+
+def bench_size(count: int, data_dir: str, seed: int, app, window) -> dict:
+    jar_path = os.path.join(data_dir, f'jar_{count}_{seed}.json')
+    if not os.path.exists(jar_path):
+        write_jar(jar_path, count, seed)
+
+    stages = {}
+
+    def record(stage, seconds, rows):
+        stages[stage] = {'seconds': seconds, 'rows': rows}
+
+    with open(jar_path, 'r', encoding='utf-8') as f:
+        text, seconds = timed(f.read)
+    record('file_read', seconds, count)
+    cookies, seconds = timed(json.loads, text)
+    record('json_loads', seconds, len(cookies))
+    del text, cookies
+
+    store, seconds = timed(cookie_core.load_cookie_file, jar_path)
+    record('stream_load', seconds, len(store))
+
+    filters = {}
+    matched = []
+    for query in QUERIES:
+        matched, seconds = timed(store.filter_domain, query)
+        filters[query] = {'seconds': seconds, 'rows': len(matched)}
+    stages['filter'] = filters
+
+    # 用最大的结果集测量表格填充和导出
+    largest = max(QUERIES, key=lambda query: filters[query]['rows'])
+    matched = store.filter_domain(largest)
+
+    if window is not None:
+        def display():
+            window.display_results(matched)
+            app.processEvents()
+        _, seconds = timed(display)
+        record('display_results', seconds, len(matched))
+
+    saves = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in SAVE_FORMATS:
+            output = os.path.join(tmp, 'result' + extension)
+            _, seconds = timed(cookie_core.save_cookies, output, matched)
+            saves[extension] = {'seconds': seconds, 'rows': len(matched),
+                                'bytes': os.path.getsize(output)}
+    stages['save_results'] = saves
+
+    return {
+        'cookies': count,
+        'file_bytes': os.path.getsize(jar_path),
+        'distinct_domains': len(store.index.rows),
+        'stages': stages,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='测量Cookie提取流程各阶段的耗时')
+    parser.add_argument('--sizes', default='10000,100000',
+                        help='逗号分隔的Cookie数量（如10000,100000,1000000,5000000）')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    parser.add_argument('--data-dir', help='合成文件的存放目录，默认使用临时目录')
+    parser.add_argument('--output', help='结果JSON文件，默认输出到标准输出')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    app, window = _make_gui()
+
+    def run(data_dir):
+        return [bench_size(count, data_dir, args.seed, app, window) for count in sizes]
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        runs = run(args.data_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = run(tmp)
+
+    results = {
+        'revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'gui': window is not None,
+        'seed': args.seed,
+        'runs': runs,
+    }
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""启动耗时测试
+
+分别测量以下场景从启动进程到完成的时间，结果以JSON输出，便于比较不同版本：
+
+- core_import：只导入cookie_core（脚本调用的开销）
+- cli_help：命令行模式启动（python cookie_extractor_gui.py --cli --help）
+- gui_first_window：图形界面显示首个窗口
+- executables：用--exe指定的打包版本显示首个窗口（build_exe.py --bench会传入各打包版本）
+
+用法：
+    python benchmarks/bench_startup.py [--runs 5] [--output startup.json] [--exe dist/程序 ...]
+
+没有显示器的环境可设置 QT_QPA_PLATFORM=offscreen。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+ENTRY = str(ROOT / 'cookie_extractor_gui.py')
+PROBE_ENV = 'COOKIE_EXTRACTOR_STARTUP_PROBE'
+
+def _run(command, env=None) -> float:
+    """运行命令并返回耗时（秒）"""
+    started = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def measure_gui(command) -> dict:
+    """启动图形界面，首个窗口显示后由程序自行写出耗时并退出"""
+    with tempfile.TemporaryDirectory() as tmp:
+        probe_path = os.path.join(tmp, 'startup.json')
+        env = dict(os.environ, **{PROBE_ENV: probe_path})
+        wall = _run(command, env)
+        with open(probe_path, encoding='utf-8') as f:
+            timings = json.load(f)
+    timings['wall'] = wall
+    return timings
+
+def measure_executable(path: str, runs: int) -> dict:
+    """打包版本显示首个窗口的耗时
+
+    wall包含onefile版本解压运行时的时间，in_process从程序入口开始计时。
+    """
+    path = os.path.abspath(path)
+    samples = [measure_gui([path]) for _ in range(runs)]
+    return {
+        'path': path,
+        'size': _bundle_size(path),
+        'wall': _summary([run['wall'] for run in samples]),
+        'in_process': _summary([run['first_window'] for run in samples]),
+    }
+
+def _bundle_size(path: str) -> int:
+    """可执行文件的大小；onedir版本为整个文件夹的大小"""
+    directory = Path(path).parent
+    if (directory / '_internal').is_dir() or any(directory.glob('*PySide6*')):
+        return sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
+    return os.path.getsize(path)
+
+def _summary(samples) -> dict:
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'runs': len(samples),
+    }
+
+def check_cli_without_qt() -> bool:
+    """命令行和核心模块不应导入PySide6"""
+    code = ('import sys, cookie_extractor_gui, cookie_cli, cookie_core; '
+            'sys.exit(1 if "PySide6" in sys.modules else 0)')
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT).returncode == 0
+
+def main():
+    parser = argparse.ArgumentParser(description='测量程序启动耗时')
+    parser.add_argument('--runs', type=int, default=5, help='每个场景运行的次数')
+    parser.add_argument('--output', help='结果JSON文件，默认输出到标准输出')
+    parser.add_argument('--exe', action='append', default=[],
+                        help='同时测量打包后的可执行文件，可多次指定')
+    args = parser.parse_args()
+
+    core_import = [_run([sys.executable, '-c', 'import cookie_core']) for _ in range(args.runs)]
+    cli_help = [_run([sys.executable, ENTRY, '--cli', '--help']) for _ in range(args.runs)]
+    gui = [measure_gui([sys.executable, ENTRY]) for _ in range(args.runs)]
+
+    results = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'cli_without_qt': check_cli_without_qt(),
+        'core_import': _summary(core_import),
+        'cli_help': _summary(cli_help),
+        'gui_first_window': {
+            'wall': _summary([run['wall'] for run in gui]),
+            'in_process': _summary([run['first_window'] for run in gui]),
+            'qt_import': _summary([run['qt_import'] for run in gui]),
+        },
+        'executables': [measure_executable(path, args.runs) for path in args.exe],
+    }
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+    return 0 if results['cli_without_qt'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""生成用于性能测试的合成Cookie文件
+
+生成浏览器扩展导出格式的Cookie数组。同一个种子总是生成完全相同的数据；
+域名的分布接近真实浏览数据：少数站点占据大部分Cookie，其余是长尾，
+并带有不同层级的子域名。
+
+用法：
+    python benchmarks/synth_jar.py --count 1000000 --out jar_1m.json
+"""
+import json
+import random
+import argparse
+from typing import Dict, Any, Iterator, List
+
+# 真实数据中常见的站点，按出现频率从高到低
+POPULAR_SITES = [
+    'google.com', 'youtube.com', 'twitter.com', 'x.com', 'facebook.com',
+    'instagram.com', 'baidu.com', 'qq.com', 'bilibili.com', 'taobao.com',
+    'amazon.com', 'microsoft.com', 'github.com', 'linkedin.com', 'reddit.com',
+    'weibo.com', 'zhihu.com', 'jd.com', 'apple.com', 'netflix.com',
+]
+SUFFIXES = ['com', 'net', 'org', 'cn', 'com.cn', 'co.uk', 'io', 'de', 'jp', 'co.jp']
+SUBDOMAINS = ['www', 'api', 'accounts', 'mail', 'static', 'm', 'login', 'cdn', 'img', 'pay']
+COOKIE_NAMES = [
+    '_ga', '_gid', 'sid', 'session_id', 'auth_token', 'ct0', 'csrftoken', 'uid',
+    'lang', 'NID', '1P_JAR', 'SAPISID', 'guest_id', 'personalization_id', '_fbp',
+]
+SAME_SITE = ['no_restriction', 'lax', 'strict', 'unspecified']
+
+# 生成的Cookie过期时间以此为基准，保证结果与运行时间无关
+BASE_TIME = 1_700_000_000
+
+def _site_names(rng: random.Random, count: int) -> List[str]:
+    """热门站点加上随机生成的长尾站点"""
+    sites = list(POPULAR_SITES)
+    while len(sites) < count:
+        length = rng.randint(4, 12)
+        name = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(length))
+        sites.append(f'{name}.{rng.choice(SUFFIXES)}')
+    return sites
+
+def generate_cookies(count: int, seed: int = 0, sites: int = 0) -> Iterator[Dict[str, Any]]:
+    """按固定种子生成count个Cookie
+
+    sites为不同站点的数量，默认随Cookie数量增长（约每50个Cookie一个站点）。
+    """
+    rng = random.Random(seed)
+    site_count = sites or max(len(POPULAR_SITES), count // 50)
+    site_names = _site_names(rng, site_count)
+    # Zipf分布的权重：排名越靠前的站点Cookie越多
+    weights = [1.0 / (rank + 1) for rank in range(site_count)]
+    picks = rng.choices(range(site_count), weights=weights, k=count)
+
+    for cookie_id, site_index in enumerate(picks, 1):
+        site = site_names[site_index]
+        roll = rng.random()
+        if roll < 0.45:
+            domain = '.' + site
+        elif roll < 0.75:
+            domain = f'{rng.choice(SUBDOMAINS)}.{site}'
+        elif roll < 0.85:
+            # 不放回抽取，不会出现.www.www.site.net这样重复的标签
+            outer, inner = rng.sample(SUBDOMAINS, 2)
+            domain = f'.{outer}.{inner}.{site}'
+        else:
+            domain = site
+        session = rng.random() < 0.15
+        cookie = {'domain': domain}
+        if not session:
+            cookie['expirationDate'] = BASE_TIME + rng.uniform(-86400 * 30, 86400 * 400)
+        value_length = rng.randint(8, 120)
+        cookie.update({
+            'hostOnly': not domain.startswith('.'),
+            'httpOnly': rng.random() < 0.4,
+            'name': rng.choice(COOKIE_NAMES) if rng.random() < 0.7 else f'c_{rng.randrange(10000)}',
+            'path': '/' if rng.random() < 0.9 else '/' + rng.choice(SUBDOMAINS),
+            'sameSite': rng.choice(SAME_SITE),
+            'secure': rng.random() < 0.8,
+            'session': session,
+            'storeId': '0',
+            'value': f'{rng.getrandbits(value_length * 4):0{value_length}x}',
+            'id': cookie_id,
+        })
+        yield cookie
+
+def write_jar(file_path: str, count: int, seed: int = 0, sites: int = 0):
+    """把合成Cookie流式写成JSON数组文件"""
+    encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for index, cookie in enumerate(generate_cookies(count, seed, sites)):
+            if index:
+                f.write(',')
+            f.write(encode(cookie))
+        f.write(']')
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成Cookie文件')
+    parser.add_argument('--count', type=int, default=100000, help='Cookie数量')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--sites', type=int, default=0, help='不同站点的数量（默认按数量估算）')
+    parser.add_argument('--out', required=True, help='输出文件')
+    args = parser.parse_args()
+    write_jar(args.out, args.count, args.seed, args.sites)
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,163 @@
-import PyInstaller.__main__
+"""打包脚本
+
+用法：
+    python build_exe.py [--mode onefile|onedir|all] [--no-splash] [--bench]
+
+- onefile：打包成单个exe文件，便于分发，但每次启动都要先把整个运行时解压到临时目录
+- onedir：打包成文件夹，启动时不需要解压；同时排除用不到的Qt模块和插件，
+  并在导入期间显示启动画面，适合注重启动速度的场合
+- all：依次打包以上两种
+- --bench：打包完成后用benchmarks/bench_startup.py测量各版本显示首个窗口的耗时
+"""
 import os
+import sys
+import shutil
+import argparse
+import subprocess
 from pathlib import Path
 
 # 获取当前目录
 current_dir = Path(__file__).parent
 
+APP_NAME = 'Cookie信息提取器'
+MODES = ('onefile', 'onedir')
+
+# 程序只用到QtCore、QtGui和QtWidgets，其余模块即使被间接引用也不打包
+EXCLUDED_MODULES = [
+    'PySide6.QtNetwork', 'PySide6.QtQml', 'PySide6.QtQuick', 'PySide6.QtQuickWidgets',
+    'PySide6.QtOpenGL', 'PySide6.QtOpenGLWidgets', 'PySide6.QtSvg', 'PySide6.QtSvgWidgets',
+    'PySide6.QtPrintSupport', 'PySide6.QtSql', 'PySide6.QtXml', 'PySide6.QtTest',
+    'PySide6.QtDBus', 'PySide6.QtConcurrent', 'PySide6.QtMultimedia',
+    'PySide6.QtMultimediaWidgets', 'PySide6.QtWebEngineCore', 'PySide6.QtWebEngineWidgets',
+    'PySide6.QtWebChannel', 'PySide6.QtWebSockets', 'PySide6.QtPdf', 'PySide6.QtCharts',
+    'PySide6.QtDataVisualization', 'PySide6.Qt3DCore', 'PySide6.QtBluetooth',
+    'PySide6.QtPositioning', 'PySide6.QtSensors', 'PySide6.QtSerialPort', 'PySide6.QtUiTools',
+    'PySide6.QtDesigner', 'PySide6.QtHelp',
+    'tkinter', 'unittest', 'pydoc', 'doctest', 'lib2to3', 'xmlrpc',
+]
+
+# onedir版本打包后删除的Qt插件目录（QtGui的打包钩子会整体收集插件）
+EXCLUDED_PLUGINS = {
+    'generic', 'iconengines', 'networkinformation', 'tls', 'multimedia', 'sqldrivers',
+    'qmltooling', 'position', 'sensors', 'canbus', 'designer', 'printsupport', 'renderers',
+    'sceneparsers', 'geometryloaders', 'texttospeech', 'webview', 'virtualkeyboard',
+}
+# 图片格式插件只保留窗口图标用到的ico（png由QtGui内置支持）
+KEPT_IMAGE_FORMATS = ('qico',)
+# 没有加载Qt翻译，软件OpenGL渲染器也用不到
+EXCLUDED_FILES = ('opengl32sw.dll',)
+
 # 定义图标文件
 icon_file = 'icons.ico' if Path('icons.ico').exists() else 'icons.png'
+# 启动画面图片
+splash_file = 'icons.png'
 
-# 确保图标文件存在
-if not Path(icon_file).exists():
-    print(f"警告: 图标文件 {icon_file} 不存在!")
-
-# PyInstaller参数
-params = [
-    'cookie_extractor_gui.py',  # 主程序文件
-    '--name=Cookie信息提取器',  # 生成的exe名称
-    '--noconsole',  # 不显示控制台窗口
-    '--onefile',    # 打包成单个exe文件
-    '--clean',      # 清理临时文件
-    f'--distpath={current_dir / "dist"}',  # 输出目录
-    f'--workpath={current_dir / "build"}',  # 工作目录
-    '--noconfirm',  # 覆盖现有文件不确认
-]
+def pyinstaller_params(mode: str, splash: bool = True) -> list:
+    """生成指定打包方式的PyInstaller参数"""
+    params = [
+        'cookie_extractor_gui.py',  # 主程序文件
+        f'--name={APP_NAME}',  # 生成的exe名称
+        '--noconsole',  # 不显示控制台窗口
+        f'--{mode}',    # 打包成单个exe文件或文件夹
+        '--clean',      # 清理临时文件
+        f'--distpath={current_dir / "dist"}',  # 输出目录
+        f'--workpath={current_dir / "build" / mode}',  # 工作目录
+        '--noconfirm',  # 覆盖现有文件不确认
+    ]
 
-# 添加图标
-if Path(icon_file).exists():
-    params.extend(['--icon', icon_file])
+    # 添加图标
+    if Path(icon_file).exists():
+        params.extend(['--icon', icon_file])
 
-# 添加数据文件
-datas = []
-if Path('icons.ico').exists():
-    datas.append(('icons.ico', '.'))
-if Path('icons.png').exists():
-    datas.append(('icons.png', '.'))
+    # 添加数据文件
+    datas = []
+    if Path('icons.ico').exists():
+        datas.append(('icons.ico', '.'))
+    if Path('icons.png').exists():
+        datas.append(('icons.png', '.'))
 
-# 如果有数据文件，添加到参数中
-if datas:
+    # 如果有数据文件，添加到参数中
     for src, dst in datas:
-        params.extend(['--add-data', f'{src};{dst}'])
+        params.extend(['--add-data', f'{src}{os.pathsep}{dst}'])
+
+    if mode == 'onedir':
+        for module in EXCLUDED_MODULES:
+            params.extend(['--exclude-module', module])
+        # macOS不支持启动画面
+        if splash and sys.platform != 'darwin' and Path(splash_file).exists():
+            params.extend(['--splash', splash_file])
+    return params
+
+def prune_qt(app_dir: Path) -> int:
+    """删除onedir版本中用不到的Qt插件和翻译文件，返回删除的字节数"""
+    removed = 0
+
+    def remove(path: Path):
+        nonlocal removed
+        if path.is_dir():
+            removed += sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+            shutil.rmtree(path)
+        elif path.exists():
+            removed += path.stat().st_size
+            path.unlink()
+
+    for qt_dir in app_dir.rglob('PySide6'):
+        if not qt_dir.is_dir():
+            continue
+        plugins = qt_dir / 'plugins'
+        if plugins.is_dir():
+            for plugin_dir in plugins.iterdir():
+                if plugin_dir.name in EXCLUDED_PLUGINS:
+                    remove(plugin_dir)
+            image_formats = plugins / 'imageformats'
+            if image_formats.is_dir():
+                for plugin in image_formats.iterdir():
+                    if not plugin.name.removeprefix('lib').startswith(KEPT_IMAGE_FORMATS):
+                        remove(plugin)
+        remove(qt_dir / 'translations')
+        for name in EXCLUDED_FILES:
+            remove(qt_dir / name)
+    return removed
+
+def executable_path(mode: str) -> Path:
+    """打包后的可执行文件路径"""
+    name = APP_NAME + ('.exe' if sys.platform == 'win32' else '')
+    if mode == 'onedir':
+        return current_dir / 'dist' / APP_NAME / name
+    return current_dir / 'dist' / name
+
+def build(mode: str, splash: bool = True) -> Path:
+    params = pyinstaller_params(mode, splash)
+    print("打包参数:", params)
+    # 每种打包方式在单独的进程中运行PyInstaller，互不影响
+    subprocess.run([sys.executable, '-m', 'PyInstaller', *params], cwd=current_dir, check=True)
+    if mode == 'onedir':
+        removed = prune_qt(current_dir / 'dist' / APP_NAME)
+        print(f"已删除用不到的Qt插件和翻译文件 {removed / (1 << 20):.1f} MB")
+    return executable_path(mode)
+
+def main():
+    parser = argparse.ArgumentParser(description='打包Cookie信息提取器')
+    parser.add_argument('--mode', choices=[*MODES, 'all'], default='onefile',
+                        help='打包方式：单个exe文件、启动更快的文件夹版本或两者都打包（默认onefile）')
+    parser.add_argument('--no-splash', action='store_true', help='onedir版本不显示启动画面')
+    parser.add_argument('--bench', action='store_true', help='打包后测量各版本的启动耗时')
+    parser.add_argument('--runs', type=int, default=5, help='启动耗时测试的运行次数')
+    args = parser.parse_args()
+
+    # 确保图标文件存在
+    if not Path(icon_file).exists():
+        print(f"警告: 图标文件 {icon_file} 不存在!")
+
+    modes = MODES if args.mode == 'all' else (args.mode,)
+    executables = [build(mode, not args.no_splash) for mode in modes]
 
-print("打包参数:", params)
+    if args.bench:
+        command = [sys.executable, str(current_dir / 'benchmarks' / 'bench_startup.py'),
+                   '--runs', str(args.runs)]
+        for path in executables:
+            command.extend(['--exe', str(path)])
+        subprocess.run(command, cwd=current_dir, check=True)
 
-# 运行PyInstaller
-PyInstaller.__main__.run(params) 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""已解析Cookie文件的磁盘缓存
+
+同一个导出文件再次打开时直接读取缓存的解析结果和域名索引，不再解析JSON。
+缓存以文件内容的哈希为键；路径、大小和修改时间都没变时连哈希也不必重新计算。
+缓存总大小有上限，超出时淘汰最久未使用的条目。
+"""
+import os
+import sys
+import time
+import mmap
+import marshal
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from itertools import starmap
+from typing import Optional
+
+from cookie_trace import traced
+
+from cookie_core import (CookieStore, CookieRecord, DomainIndex, TaskControl,
+                         load_cookie_file, IO_CHUNK_SIZE)
+
+# 缓存目录，默认为系统的用户缓存目录
+CACHE_DIR_ENV = 'COOKIE_EXTRACTOR_CACHE_DIR'
+# 缓存总大小上限（MB），设为0时禁用缓存
+CACHE_SIZE_ENV = 'COOKIE_EXTRACTOR_CACHE_MB'
+DEFAULT_CACHE_MB = 1024
+# 缓存数据格式版本，格式变化时递增，旧的缓存自动失效
+CACHE_FORMAT = 2
+
+def default_cache_dir() -> str:
+    """用户缓存目录下的程序缓存目录"""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if directory:
+        return directory
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'CookieExtractor', 'cache')
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Caches/CookieExtractor')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'cookie-extractor')
+
+def file_digest(file_path: str, task: Optional[TaskControl] = None) -> str:
+    """计算文件内容的哈希"""
+    digest = hashlib.blake2b(digest_size=20)
+    total = os.path.getsize(file_path)
+    if total:
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, total, IO_CHUNK_SIZE * 8):
+                if task is not None:
+                    task.check()
+                    task.progress(offset, total, '正在校验缓存')
+                digest.update(mapped[offset:offset + IO_CHUNK_SIZE * 8])
+    return digest.hexdigest()
+
+class JarCache:
+    """已解析Cookie文件的磁盘缓存"""
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_MB)) * (1 << 20))
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @contextmanager
+    def _database(self):
+        """打开缓存索引库并在一个事务中操作
+
+        每次操作单独连接，可在任意线程和进程中使用。
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=30)
+        try:
+            self._create_tables(conn)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jars (
+                digest TEXT PRIMARY KEY,
+                bytes INTEGER NOT NULL,
+                cookies INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+        """)
+
+    def _data_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f'{digest}.bin')
+
+    def load(self, file_path: str, domain_pattern: str = '',
+             task: Optional[TaskControl] = None) -> CookieStore:
+        """读取Cookie文件，命中缓存时跳过JSON解析
+
+        与load_cookie_file相同，给出域名匹配模式时通过task.partial()回报匹配的Cookie。
+        """
+        if not self.enabled:
+            return load_cookie_file(file_path, domain_pattern, task)
+
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._database() as conn:
+            row = conn.execute(
+                'SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?',
+                (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        with traced(task, 'hash'):
+            digest = row[0] if row else file_digest(path, task)
+
+        with traced(task, 'cache_read') as stage:
+            store = self._read(digest, file_path)
+            stage.rows = len(store) if store is not None else None
+        if store is not None:
+            if task is not None and domain_pattern:
+                task.partial(store.filter(domain_pattern, task))
+        else:
+            store = load_cookie_file(file_path, domain_pattern, task)
+            with traced(task, 'cache_write'):
+                self._write(digest, store)
+
+        with self._database() as conn:
+            conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                         (path, stat.st_size, stat.st_mtime_ns, digest))
+            conn.execute('UPDATE jars SET last_used = ? WHERE digest = ?', (time.time(), digest))
+        return store
+
+    def _read(self, digest: str, source: str) -> Optional[CookieStore]:
+        """读取缓存的解析结果，不存在或无法读取时返回None"""
+        try:
+            # 整体读入后再反序列化，比marshal.load逐段读取文件快得多
+            with open(self._data_path(digest), 'rb') as f:
+                data_format, states, rows = marshal.loads(f.read())
+            if data_format != CACHE_FORMAT:
+                return None
+            cookies = list(starmap(CookieRecord, states))
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        store = CookieStore(cookies, source)
+        store.index = DomainIndex.from_rows(rows)
+        return store
+
+    def _write(self, digest: str, store: CookieStore):
+        """写入解析结果并淘汰超出容量的旧条目"""
+        if store.index is None:
+            store.index = DomainIndex.build(store.cookies)
+        try:
+            # 保存每条记录的全部槽，相同的字段顺序元组和驻留字符串只写一次
+            states = [cookie.state() if isinstance(cookie, CookieRecord) else None
+                      for cookie in store.cookies]
+            if None in states:
+                return
+            data = marshal.dumps((CACHE_FORMAT, states, store.index.rows))
+        except ValueError:
+            # 含有marshal不支持的值，不缓存
+            return
+        if len(data) > self.max_bytes:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        data_path = self._data_path(digest)
+        temp_path = f'{data_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, data_path)
+
+        with self._database() as conn:
+            conn.execute('INSERT OR REPLACE INTO jars VALUES (?, ?, ?, ?)',
+                         (digest, len(data), len(store), time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """按最久未使用的顺序淘汰，直到总大小不超过上限"""
+        total = conn.execute('SELECT COALESCE(SUM(bytes), 0) FROM jars').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, size in conn.execute(
+                'SELECT digest, bytes FROM jars ORDER BY last_used').fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM jars WHERE digest = ?', (digest,))
+            conn.execute('DELETE FROM files WHERE digest = ?', (digest,))
+            try:
+                os.remove(self._data_path(digest))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """删除全部缓存"""
+        with self._database() as conn:
+            digests = [row[0] for row in conn.execute('SELECT digest FROM jars')]
+            conn.execute('DELETE FROM jars')
+            conn.execute('DELETE FROM files')
+        for digest in digests:
+            try:
+                os.remove(self._data_path(digest))
+            except OSError:
+                pass
+
+def load_cached(file_path: str, domain_pattern: str = '',
+                task: Optional[TaskControl] = None) -> CookieStore:
+    """通过默认缓存读取Cookie文件"""
+    return JarCache().load(file_path, domain_pattern, task)
+
+def load_for_query(file_path: str, domain_pattern: str = '',
+                   task: Optional[TaskControl] = None) -> CookieStore:
+    """读取Cookie文件供按domain_pattern查询
+
+    浏览器数据库在SQL查询中按域名条件过滤，只读出匹配的行，结果随条件变化，不经过缓存；
+    其他文件和没有条件时通过默认缓存读取。条件放宽后可用store.covers()判断是否需要重新读取。
+    """
+    from cookie_readers import detect_reader
+    reader = detect_reader(file_path) if domain_pattern else None
+    if reader is not None and reader.filters_domain:
+        return load_cookie_file(file_path, domain_pattern, task, prefilter=True)
+    return load_cached(file_path, domain_pattern, task)
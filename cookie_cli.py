@@ -0,0 +1,372 @@
+"""命令行批量模式"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional
+
+from cookie_core import (load_cookie_file, save_cookies, TaskControl, FORMAT_JSON, FORMAT_NDJSON,
+                         COMPRESSED_EXTENSIONS)
+from cookie_cache import JarCache
+from cookie_watch import FolderWatch
+from cookie_split import split_store, SPLIT_WRITERS
+from cookie_merge import merge_files, MERGE_RULES, MERGE_NEWEST, MERGE_WORKERS
+from cookie_diff import diff_files, diff_summary
+from cookie_readers import detect_reader
+from cookie_trace import OperationTrace, TRACE_DIR_ENV
+
+def extract_file(input_path: str, domain_pattern: str, output_path: str,
+                 use_cache: bool = True) -> Dict[str, Any]:
+    """提取单个文件中匹配的Cookie并写出，返回处理摘要"""
+    started = time.perf_counter()
+    trace = OperationTrace('cli_extract')
+    task = TaskControl(trace=trace)
+    trace.start_profile()
+    try:
+        store = _load_input(input_path, domain_pattern, use_cache, task)
+        cookies = store.filter(domain_pattern, task)
+        save_cookies(output_path, cookies, task)
+    finally:
+        trace.stop_profile()
+    trace.rows = len(cookies)
+    return {
+        'input': input_path,
+        'output': output_path,
+        'total': len(store),
+        'matched': len(cookies),
+        'seconds': time.perf_counter() - started,
+        'trace': trace.finish().summary() if trace.output_dir else None,
+    }
+
+def split_file(input_path: str, query: str, output_dir: str, extension: str = '.json',
+               use_cache: bool = True) -> Dict[str, Any]:
+    """把单个文件的Cookie按可注册域名拆分到output_dir，返回处理摘要"""
+    started = time.perf_counter()
+    trace = OperationTrace('cli_split')
+    task = TaskControl(trace=trace)
+    trace.start_profile()
+    try:
+        store = _load_input(input_path, query, use_cache, task)
+        written = split_store(store, output_dir, query, extension, SPLIT_WRITERS, task)
+    finally:
+        trace.stop_profile()
+    matched = sum(count for _, _, count in written)
+    trace.rows = matched
+    return {
+        'input': input_path,
+        'output': f'{output_dir}（{len(written)} 个文件）',
+        'total': len(store),
+        'matched': matched,
+        'seconds': time.perf_counter() - started,
+        'trace': trace.finish().summary() if trace.output_dir else None,
+    }
+
+def merge_inputs(input_paths: List[str], query: str, output_path: str, rule: str = MERGE_NEWEST,
+                 split: bool = False, extension: str = '.json', use_cache: bool = True,
+                 workers: int = MERGE_WORKERS) -> Dict[str, Any]:
+    """并行读取多个文件并去重合并，再提取匹配的Cookie写出（split为True时按域名拆分），
+    返回处理摘要"""
+    started = time.perf_counter()
+    trace = OperationTrace('cli_merge')
+    task = TaskControl(trace=trace)
+    loader = JarCache().load if use_cache else load_cookie_file
+    trace.start_profile()
+    try:
+        store, duplicates = merge_files(input_paths, rule=rule, workers=workers, task=task,
+                                        loader=loader)
+        if split:
+            written = split_store(store, output_path, query, extension, SPLIT_WRITERS, task)
+            matched = sum(count for _, _, count in written)
+            output = f'{output_path}（{len(written)} 个文件）'
+        else:
+            cookies = store.filter(query, task)
+            save_cookies(output_path, cookies, task)
+            matched = len(cookies)
+            output = output_path
+    finally:
+        trace.stop_profile()
+    trace.rows = matched
+    return {
+        'input': f'{len(input_paths)} 个文件（去除重复 {duplicates} 个）',
+        'output': output,
+        'total': len(store),
+        'matched': matched,
+        'seconds': time.perf_counter() - started,
+        'trace': trace.finish().summary() if trace.output_dir else None,
+    }
+
+def diff_inputs(old_path: str, new_path: str, query: str, output_path: str,
+                use_cache: bool = True) -> Dict[str, Any]:
+    """对比两份快照中匹配的Cookie，把差异行（带diff状态字段）写出，返回处理摘要"""
+    started = time.perf_counter()
+    trace = OperationTrace('cli_diff')
+    task = TaskControl(trace=trace)
+    loader = JarCache().load if use_cache else load_cookie_file
+    trace.start_profile()
+    try:
+        old, new, rows, counts = diff_files(old_path, new_path, query, task, loader)
+        save_cookies(output_path, rows, task)
+    finally:
+        trace.stop_profile()
+    trace.rows = len(rows)
+    return {
+        'input': f'{old_path} → {new_path}（{diff_summary(counts)}）',
+        'output': output_path,
+        'total': len(old) + len(new),
+        'matched': len(rows),
+        'seconds': time.perf_counter() - started,
+        'trace': trace.finish().summary() if trace.output_dir else None,
+    }
+
+def _load_input(input_path: str, query: str, use_cache: bool, task: TaskControl):
+    """读取输入文件；数据库文件在SQL查询中按域名条件过滤，只读出匹配的行，不经过缓存"""
+    reader = detect_reader(input_path)
+    if query and reader is not None and reader.filters_domain:
+        return load_cookie_file(input_path, query, task, prefilter=True)
+    if use_cache:
+        return JarCache().load(input_path, task=task)
+    return load_cookie_file(input_path, task=task)
+
+def _process_file(input_path: str, output_path: str, args) -> Dict[str, Any]:
+    """按命令行参数提取或拆分一个文件，在工作进程中运行"""
+    if args.split:
+        return split_file(input_path, args.domain, output_path, args.extension,
+                          not args.no_cache)
+    return extract_file(input_path, args.domain, output_path, not args.no_cache)
+
+def _expand_inputs(patterns: List[str]) -> List[str]:
+    """展开通配符（Windows命令行不会自动展开）"""
+    import glob
+    paths = []
+    for pattern in patterns:
+        matched = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(matched)
+    return paths
+
+def input_stem(input_path: str) -> str:
+    """输入文件名去掉扩展名，压缩文件同时去掉压缩扩展名，例如a.json.gz为a"""
+    name = Path(input_path).name
+    for extension in COMPRESSED_EXTENSIONS:
+        if name.lower().endswith(extension):
+            name = name[:-len(extension)]
+            break
+    return Path(name).stem or name
+
+def _output_paths(inputs: List[str], output_dir: str, extension: str = '.json',
+                  used: Optional[set] = None) -> List[str]:
+    """为每个输入文件分配输出路径，同名文件追加序号避免互相覆盖
+
+    used为已分配的文件名，监视模式下分批分配时传入同一个集合。
+    """
+    if used is None:
+        used = set()
+    outputs = []
+    for input_path in inputs:
+        stem = input_stem(input_path)
+        name = f'{stem}{extension}'
+        counter = 1
+        while name in used:
+            counter += 1
+            name = f'{stem}_{counter}{extension}'
+        used.add(name)
+        outputs.append(os.path.join(output_dir, name))
+    return outputs
+
+def run_cli(argv: List[str]) -> int:
+    """命令行批量模式：多进程并行处理多个Cookie文件"""
+    parser = argparse.ArgumentParser(
+        prog='cookie_extractor_gui.py --cli',
+        description='批量提取Cookie文件中与域名匹配的Cookie')
+    parser.add_argument('--domain', default='',
+                        help='要匹配的域名（例如：twitter）或查询条件'
+                             '（例如："domain:twitter|x.com secure:true"）；拆分模式下可省略')
+    parser.add_argument('--out', required=True, help='输出目录')
+    parser.add_argument('--format', choices=[FORMAT_JSON, FORMAT_NDJSON], default=FORMAT_JSON,
+                        help='输出格式：单行JSON数组或每行一个Cookie的NDJSON（默认json）')
+    parser.add_argument('--gzip', action='store_true', help='使用gzip压缩输出文件')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不读写已解析文件的磁盘缓存')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='并行进程数（默认为CPU核心数）')
+    parser.add_argument('--split', action='store_true',
+                        help='按可注册域名拆分：每个输入文件在输出目录下生成一个同名文件夹，'
+                             '其中每个域名一个文件')
+    parser.add_argument('--merge', metavar='NAME',
+                        help='把所有输入文件去重合并后写入输出目录下的一个文件（拆分模式下为文件夹），'
+                             '不含扩展名')
+    parser.add_argument('--keep', choices=list(MERGE_RULES), default=MERGE_NEWEST,
+                        help='合并时重复Cookie（域名、名称、路径都相同）的取舍：'
+                             'newest保留过期时间最晚的，last保留后面文件中的（默认newest）')
+    parser.add_argument('--diff', metavar='NAME',
+                        help='对比两个输入文件（较早的在前），把新增、删除以及值或过期时间改变的Cookie'
+                             '写入输出目录下的一个文件，不含扩展名；--domain可省略')
+    parser.add_argument('--watch', action='store_true',
+                        help='持续监视输入目录，定时扫描并处理新增或变化的JSON文件（含压缩的JSON文件和ZIP压缩包）')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='监视模式的扫描间隔秒数（默认2）')
+    parser.add_argument('--trace', metavar='DIR',
+                        help=f'把每个文件各阶段的耗时记录（JSON）和性能分析数据（.prof）写入此目录，'
+                             f'也可以设置环境变量{TRACE_DIR_ENV}')
+    parser.add_argument('inputs', nargs='+',
+                        help='输入的Cookie文件（JSON、cookies.txt、HAR或浏览器Cookie数据库，'
+                             '可以是gzip或zstd压缩的文件或ZIP压缩包），支持通配符；监视模式下为目录')
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        # 在启动工作进程之前设置，工作进程继承环境变量
+        os.environ[TRACE_DIR_ENV] = os.path.abspath(args.trace)
+    if args.diff and (args.split or args.merge or args.watch):
+        parser.error('--diff不能与--split、--merge或--watch同时使用')
+    if not args.domain and not args.split and not args.diff:
+        parser.error('需要指定--domain（或使用--split拆分全部Cookie）')
+    args.extension = '.' + args.format + ('.gz' if args.gzip else '')
+    # 拆分模式的输出是文件夹
+    extension = '' if args.split else args.extension
+    if args.watch:
+        if args.merge:
+            parser.error('--merge不能与--watch同时使用')
+        return _watch_folders(args, extension)
+
+    inputs = _expand_inputs(args.inputs)
+    if not inputs:
+        print('没有找到输入文件', file=sys.stderr)
+        return 2
+    if args.diff and len(inputs) != 2:
+        parser.error('--diff需要两个输入文件')
+    os.makedirs(args.out, exist_ok=True)
+    if args.diff:
+        return _diff_inputs(inputs, args)
+    if args.merge:
+        return _merge_inputs(inputs, args, extension)
+    outputs = _output_paths(inputs, args.out, extension)
+    workers = max(1, min(args.workers, len(inputs)))
+
+    started = time.perf_counter()
+    summary = _Summary()
+    with _executor(workers) as executor:
+        _run_jobs(list(zip(inputs, outputs)), args, executor, summary)
+
+    print(f'完成 {len(inputs) - summary.failed}/{len(inputs)} 个文件，共 {summary.total} 个Cookie，'
+          f'匹配 {summary.matched} 个，总耗时 {time.perf_counter() - started:.2f} 秒（{workers} 个进程）')
+    return 1 if summary.failed else 0
+
+def _merge_inputs(inputs: List[str], args, extension: str) -> int:
+    """--merge：在当前进程中用线程并行读取，合并为一个输出"""
+    output_path = os.path.join(args.out, args.merge + extension)
+    workers = max(1, min(args.workers, MERGE_WORKERS))
+    summary = _Summary()
+    try:
+        summary.report(merge_inputs(inputs, args.domain, output_path, args.keep, args.split,
+                                    args.extension, not args.no_cache, workers))
+    except Exception as e:
+        summary.report_error(f'{len(inputs)} 个文件', e)
+        return 1
+    return 0
+
+def _diff_inputs(inputs: List[str], args) -> int:
+    """--diff：对比两个输入文件"""
+    output_path = os.path.join(args.out, args.diff + args.extension)
+    summary = _Summary()
+    try:
+        summary.report(diff_inputs(inputs[0], inputs[1], args.domain, output_path,
+                                   not args.no_cache))
+    except Exception as e:
+        summary.report_error(' → '.join(inputs), e)
+        return 1
+    return 0
+
+class _Summary:
+    """累计处理结果并逐个文件输出"""
+    def __init__(self):
+        self.failed = 0
+        self.total = 0
+        self.matched = 0
+
+    def report(self, summary: Dict[str, Any]):
+        self.total += summary['total']
+        self.matched += summary['matched']
+        print(f"{summary['input']}: 共 {summary['total']} 个Cookie，匹配 {summary['matched']} 个，"
+              f"耗时 {summary['seconds']:.2f} 秒 -> {summary['output']}", flush=True)
+        if summary.get('trace'):
+            print(f"  {summary['trace']}", flush=True)
+
+    def report_error(self, input_path: str, error: Exception):
+        self.failed += 1
+        print(f'{input_path}: 处理失败：{error}', file=sys.stderr, flush=True)
+
+def _executor(workers: int):
+    """多于一个进程时使用进程池，否则在当前进程中处理"""
+    if workers == 1:
+        return nullcontext()
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupt)
+
+def _ignore_interrupt():
+    """工作进程忽略Ctrl+C，由主进程统一结束"""
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _run_jobs(jobs, args, executor, summary: _Summary):
+    """处理(输入文件, 输出文件)列表"""
+    if executor is None:
+        for input_path, output_path in jobs:
+            try:
+                summary.report(_process_file(input_path, output_path, args))
+            except Exception as e:
+                summary.report_error(input_path, e)
+        return
+    from concurrent.futures import as_completed
+    futures = {
+        executor.submit(_process_file, input_path, output_path, args): input_path
+        for input_path, output_path in jobs
+    }
+    for future in as_completed(futures):
+        try:
+            summary.report(future.result())
+        except Exception as e:
+            summary.report_error(futures[future], e)
+
+def _watch_folders(args, extension: str) -> int:
+    """轮询监视输入目录，处理新增或变化的文件，按Ctrl+C结束
+
+    解析失败的文件（例如还没写完）在再次变化时重新处理。
+    """
+    output_dir = os.path.abspath(args.out)
+    watches = []
+    for directory in args.inputs:
+        if not os.path.isdir(directory):
+            print(f'{directory}: 监视模式的输入必须是目录', file=sys.stderr)
+            return 2
+        watch = FolderWatch(directory)
+        if watch.directory == output_dir:
+            print(f'{directory}: 输出目录不能是监视的目录', file=sys.stderr)
+            return 2
+        watches.append(watch)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # 输入文件 → 输出文件，文件再次变化时覆盖同一个输出文件
+    outputs: Dict[str, str] = {}
+    used = set()
+    summary = _Summary()
+    print(f'正在监视 {len(watches)} 个目录，每 {args.interval:g} 秒扫描一次，按Ctrl+C结束', flush=True)
+    try:
+        with _executor(max(1, args.workers)) as executor:
+            while True:
+                jobs = []
+                for watch in watches:
+                    changed, _ = watch.scan()
+                    for path, version in changed.items():
+                        watch.mark(path, version)
+                    new = [path for path in changed if path not in outputs]
+                    outputs.update(zip(new, _output_paths(new, output_dir, extension, used)))
+                    jobs.extend((path, outputs[path]) for path in changed)
+                if jobs:
+                    _run_jobs(jobs, args, executor, summary)
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    print(f'已停止监视，共处理 {summary.total} 个Cookie，匹配 {summary.matched} 个，'
+          f'{summary.failed} 个文件处理失败')
+    return 0
@@ -0,0 +1,1325 @@
+"""Cookie解析、匹配与导出的核心逻辑，不依赖Qt，可在命令行和脚本中直接使用"""
+import os
+import re
+import json
+import mmap
+import codecs
+import gzip
+import time
+import threading
+from itertools import chain
+from operator import attrgetter, itemgetter
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
+from datetime import datetime, timedelta
+
+from cookie_trace import OperationTrace, traced
+from cookie_match import (KIND_GLOB, KIND_SUBSTRING, KIND_SUFFIX, domain_matcher,
+                          glob_to_regex, literal_suffix, make_domain_predicate, pattern_kind,
+                          text_matcher)
+
+# 结果表格的列定义：(字段名, 表头, 缺省值)
+COLUMNS = [
+    ('domain', '域名', ''),
+    ('name', 'Cookie名称', ''),
+    ('value', 'Cookie值', ''),
+    ('expirationDate', '过期时间', 0),
+    ('httpOnly', 'HttpOnly', False),
+    ('path', '路径', '/'),
+    ('sameSite', 'SameSite', ''),
+    ('secure', 'Secure', False),
+    ('id', 'ID', ''),
+]
+EXPIRATION_COLUMN = 3
+
+def format_expiration(expiration) -> str:
+    """格式化过期时间戳"""
+    if not expiration:
+        return ''
+    try:
+        return datetime.fromtimestamp(float(expiration)).strftime('%Y-%m-%d %H:%M:%S')
+    except Exception:
+        return str(expiration)
+
+def _sort_number(value, missing: float) -> float:
+    try:
+        return float(value) if value not in (None, '') else missing
+    except (TypeError, ValueError):
+        return missing
+
+def sort_keys(cookies: List[Dict[str, Any]], column: int, columns=COLUMNS) -> list:
+    """为某一列计算类型化的排序键
+
+    过期时间和ID按数值、HttpOnly和Secure按布尔值比较；
+    域名先按不区分大小写的顺序编号，之后只比较整数序号。
+    columns为表格的列定义，默认为COLUMNS。
+    """
+    key, _, default = columns[column]
+    if key == 'domain':
+        domains = [cookie.get('domain', '') for cookie in cookies]
+        if not all(domain.__class__ is str for domain in set(domains)):
+            domains = [domain_of(cookie) for cookie in cookies]
+        ordered = sorted(set(domains), key=lambda domain: domain.lstrip('.').lower())
+        ordinals = {domain: ordinal for ordinal, domain in enumerate(ordered)}
+        return list(map(ordinals.__getitem__, domains))
+    if key == 'expirationDate':
+        return [_sort_number(cookie.get(key), 0.0) for cookie in cookies]
+    if key == 'id':
+        return [_sort_number(cookie.get(key), float('-inf')) for cookie in cookies]
+    if isinstance(default, bool):
+        return [bool(cookie.get(key, default)) for cookie in cookies]
+    return [str(cookie.get(key, default)) for cookie in cookies]
+
+def sorted_rows(keys: list) -> List[int]:
+    """按排序键升序排列的行号"""
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+# 后台任务每处理这么多条记录检查一次取消
+TASK_BLOCK_SIZE = 20000
+# 分块读写文件的块大小
+IO_CHUNK_SIZE = 1 << 20
+# 已移除的行超过总行数的这一比例时压缩CookieStore
+COMPACT_RATIO = 0.5
+
+class TaskCancelled(Exception):
+    """任务已被用户取消"""
+
+class TaskControl:
+    """后台任务的进度回报与取消控制
+
+    trace不为None时，各处理函数把阶段耗时记录到其中。
+    """
+    def __init__(self, progress_callback=None, partial_callback=None,
+                 trace: Optional[OperationTrace] = None):
+        self.trace = trace
+        self._cancelled = threading.Event()
+        self._progress_callback = progress_callback
+        self._partial_callback = partial_callback
+        self._last_percent = -1
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self):
+        """任务已取消时抛出TaskCancelled"""
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def progress(self, done: int, total: int, message: str = ''):
+        """回报进度，百分比变化时才通知界面"""
+        if self._progress_callback is None:
+            return
+        percent = int(done * 100 / total) if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self._progress_callback(percent, message)
+
+    @property
+    def wants_partial(self) -> bool:
+        """是否有接收阶段性结果的回调"""
+        return self._partial_callback is not None
+
+    def partial(self, result):
+        """回报阶段性结果，例如流式加载时已匹配的Cookie"""
+        if self._partial_callback is not None:
+            self._partial_callback(result)
+
+    def subtask(self) -> 'TaskControl':
+        """并行处理的子任务：与本任务同时取消，不回报进度和阶段性结果
+
+        子任务的耗时记录在单独的trace中，完成后由调用方用trace.merge()汇总。
+        """
+        trace = OperationTrace(self.trace.operation, '') if self.trace is not None else None
+        child = TaskControl(trace=trace)
+        child._cancelled = self._cancelled
+        return child
+
+def domain_of(cookie: Dict[str, Any]) -> str:
+    """取Cookie的域名，缺失时为空串"""
+    domain = cookie.get('domain', '')
+    if isinstance(domain, str):
+        return domain
+    return '' if domain is None else str(domain)
+
+def narrows(previous: str, current: str) -> bool:
+    """current匹配的域名是否必然包含在previous的匹配结果中
+
+    例如在"twit"后继续输入得到"twitter"，或从".google.com"改为".mail.google.com"。
+    """
+    kind = pattern_kind(current)
+    if kind not in (KIND_SUBSTRING, KIND_SUFFIX) or kind != pattern_kind(previous):
+        return False
+    previous, current = previous.lower(), current.lower()
+    if kind == KIND_SUBSTRING:
+        return previous in current
+    previous, current = previous.strip('.'), current.strip('.')
+    return current == previous or current.endswith('.' + previous)
+
+# 每个索引缓存的查询结果数
+MATCH_CACHE_SIZE = 64
+
+class _DomainTrieNode:
+    """反转域名标签树的节点"""
+    __slots__ = ('children', 'domains')
+
+    def __init__(self):
+        self.children: Dict[str, '_DomainTrieNode'] = {}
+        # 恰好终止于此节点的域名（如google.com与.google.com）
+        self.domains: List[str] = []
+
+class DomainIndex:
+    """Cookie域名索引
+
+    rows记录每个不同域名对应的行号列表；所有域名按反转的标签
+    （com → google → www）组织成树，后缀查询只需沿树查找。
+    其他查询只对每个不同的域名判断一次，而不是对每个Cookie判断。
+    """
+    def __init__(self):
+        self.rows: Dict[str, List[int]] = {}
+        self._root = _DomainTrieNode()
+        # 最近的查询模式 → 匹配的域名列表
+        self._cache: 'OrderedDict[str, List[str]]' = OrderedDict()
+        # 上一次实际计算的查询模式，用于逐步细化的查询
+        self._last_pattern: Optional[str] = None
+
+    @classmethod
+    def build(cls, cookies: List[Dict[str, Any]],
+              task: Optional[TaskControl] = None) -> 'DomainIndex':
+        """为一组Cookie建立索引"""
+        index = cls()
+        total = len(cookies)
+        for start in range(0, total, TASK_BLOCK_SIZE):
+            if task is not None:
+                task.check()
+                task.progress(start, total, '正在建立索引')
+            index.extend(cookies, start, min(start + TASK_BLOCK_SIZE, total))
+        return index
+
+    @classmethod
+    def from_rows(cls, rows: Dict[str, List[int]]) -> 'DomainIndex':
+        """由已有的 域名 → 行号列表 映射恢复索引"""
+        index = cls()
+        index.rows = rows
+        for domain in rows:
+            index._insert(domain)
+        return index
+
+    def extend(self, cookies: List[Dict[str, Any]], start: int, stop: int):
+        """登记cookies[start:stop]，行号即其在列表中的位置"""
+        rows_of = self.rows
+        for row in range(start, stop):
+            cookie = cookies[row]
+            if cookie is None:
+                # 已移除的行
+                continue
+            domain = cookie.get('domain', '')
+            if domain.__class__ is not str:
+                domain = domain_of(cookie)
+            rows = rows_of.get(domain)
+            if rows is None:
+                rows_of[domain] = [row]
+                self._insert(domain)
+                self._cache.clear()
+            else:
+                rows.append(row)
+
+    def add(self, row: int, domain: str):
+        """登记一行Cookie"""
+        rows = self.rows.get(domain)
+        if rows is None:
+            self.rows[domain] = [row]
+            self._insert(domain)
+            self._cache.clear()
+        else:
+            rows.append(row)
+
+    def discard(self, rows_by_domain: Dict[str, set]):
+        """移除若干行，rows_by_domain为 域名 → 要移除的行号集合"""
+        rows_of = self.rows
+        for domain, gone in rows_by_domain.items():
+            rows = rows_of.get(domain)
+            if rows is None:
+                continue
+            rows = [row for row in rows if row not in gone]
+            if rows:
+                rows_of[domain] = rows
+            else:
+                del rows_of[domain]
+                self._remove(domain)
+                self._cache.clear()
+
+    def _remove(self, domain: str):
+        node = self._root
+        for label in reversed(domain.lower().lstrip('.').split('.')):
+            node = node.children.get(label)
+            if node is None:
+                return
+        if domain in node.domains:
+            node.domains.remove(domain)
+
+    def _insert(self, domain: str):
+        node = self._root
+        for label in reversed(domain.lower().lstrip('.').split('.')):
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = _DomainTrieNode()
+            node = child
+        node.domains.append(domain)
+
+    def suffix_domains(self, suffix: str) -> List[str]:
+        """查找某个域名及其所有子域名"""
+        node = self._root
+        for label in reversed(suffix.lower().strip('.').split('.')):
+            node = node.children.get(label)
+            if node is None:
+                return []
+        domains = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            domains.extend(node.domains)
+            stack.extend(node.children.values())
+        return domains
+
+    def match_domains(self, domain_pattern: str) -> List[str]:
+        """返回与模式匹配的所有不同域名
+
+        新查询是在上一次查询基础上的细化时（例如继续输入了更多字符），
+        只在上一次匹配到的域名中查找。
+        """
+        domains = self._cache.get(domain_pattern)
+        if domains is not None:
+            self._cache.move_to_end(domain_pattern)
+            return domains
+
+        previous = self._last_pattern
+        suffix = literal_suffix(domain_pattern)
+        if previous is not None and previous in self._cache and narrows(previous, domain_pattern):
+            matches = make_domain_predicate(domain_pattern)
+            domains = [domain for domain in self._cache[previous] if matches(domain)]
+        elif pattern_kind(domain_pattern) == KIND_SUFFIX:
+            domains = self.suffix_domains(domain_pattern)
+        elif suffix:
+            # *.google.com只需在google.com的子树中查找
+            matches = make_domain_predicate(domain_pattern)
+            domains = [domain for domain in self.suffix_domains(suffix) if matches(domain)]
+        else:
+            matches = make_domain_predicate(domain_pattern)
+            domains = [domain for domain in self.rows if matches(domain)]
+
+        self._last_pattern = domain_pattern
+        self._cache[domain_pattern] = domains
+        if len(self._cache) > MATCH_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return domains
+
+    def match_rows(self, domain_pattern: str) -> List[int]:
+        """返回与模式匹配的所有行号，按原始顺序排列"""
+        domains = self.match_domains(domain_pattern)
+        if len(domains) == 1:
+            return self.rows[domains[0]]
+        return sorted(chain.from_iterable(self.rows[domain] for domain in domains))
+
+# 查询语法中的字段：查询名 → (Cookie字段名, 类型)
+QUERY_FIELDS = {
+    'domain': ('domain', 'domain'),
+    'name': ('name', 'text'),
+    'value': ('value', 'text'),
+    'path': ('path', 'text'),
+    'samesite': ('sameSite', 'nocase'),
+    'secure': ('secure', 'flag'),
+    'httponly': ('httpOnly', 'flag'),
+    'expires': ('expirationDate', 'time'),
+    'expirationdate': ('expirationDate', 'time'),
+}
+_QUERY_TERM = re.compile(r'(?P<field>[A-Za-z]+)(?P<op>:|>=|<=|>|<)'
+                         r'(?:"(?P<quoted>[^"]*)"|(?P<value>\S*))(?=\s|$)')
+_TIME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+_RELATIVE_TIME = re.compile(r'now(?:([+-])(\d+(?:\.\d+)?)([smhdw]))?')
+# 只有日期没有时刻的取值表示这一整天
+_DATE_ONLY = re.compile(r'\d{4}-?\d{2}-?\d{2}')
+_FLAG_VALUES = {'true': True, '1': True, 'yes': True,
+                'false': False, '0': False, 'no': False}
+
+def is_query(text: str) -> bool:
+    """输入中是否含有"字段:值"形式的查询条件，否则整段按域名模式处理"""
+    return any(match.group('field').lower() in QUERY_FIELDS
+               for match in _QUERY_TERM.finditer(text))
+
+def _split_alternatives(value: str) -> List[str]:
+    """按顶层的'|'拆分候选，正则括号和字符集中的'|'以及转义的'\\|'不拆分"""
+    parts = []
+    depth = 0
+    in_class = False
+    start = 0
+    position = 0
+    while position < len(value):
+        char = value[position]
+        if char == '\\':
+            position += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # 字符集开头的]是普通字符
+            if value.startswith(']', position + 1):
+                position += 1
+            elif value.startswith('^]', position + 1):
+                position += 2
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        elif char == '|' and depth == 0:
+            parts.append(value[start:position])
+            start = position + 1
+        position += 1
+    parts.append(value[start:])
+    return parts
+
+def merge_domain_patterns(alternatives: List[str]) -> str:
+    """把多个域名模式合并为一个等价的正则，匹配任意一个即可"""
+    if len(alternatives) == 1:
+        return alternatives[0]
+    parts = []
+    for pattern in alternatives:
+        kind = pattern_kind(pattern)
+        if kind == KIND_SUFFIX:
+            parts.append(r'(?:^\.*|\.)' + re.escape(pattern.strip('.')) + '$')
+        elif kind == KIND_SUBSTRING:
+            parts.append(re.escape(pattern))
+        elif kind == KIND_GLOB:
+            parts.append(glob_to_regex(pattern))
+        else:
+            parts.append('(?:' + pattern + ')')
+    return '|'.join(parts)
+
+def _parse_time(text: str) -> float:
+    """解析now、now-7d、时间戳或日期（2024-01-31、2024-01-31T08:00）"""
+    match = _RELATIVE_TIME.fullmatch(text.lower())
+    if match:
+        now = datetime.now().timestamp()
+        if match.group(1) is None:
+            return now
+        offset = float(match.group(2)) * _TIME_UNITS[match.group(3)]
+        return now + offset if match.group(1) == '+' else now - offset
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise ValueError(f'无法识别的时间：{text}') from None
+
+def _text_predicate(key: str, alternatives: List[str], flags=0) -> Callable:
+    """字段值等于任意一个候选值，支持*和?通配符；所有候选合并为一个正则"""
+    matcher = text_matcher(tuple(alternatives), flags)
+
+    def check(cookie):
+        value = cookie.get(key)
+        return value is not None and matcher(str(value)) is not None
+    return check
+
+def _flag_predicate(key: str, expected: bool) -> Callable:
+    return lambda cookie: bool(cookie.get(key)) is expected
+
+def _time_predicate(key: str, op: str, text: str) -> Callable:
+    if text.lower() == 'session':
+        if op != ':':
+            raise ValueError('session只能用于expires:session')
+        # 会话Cookie没有过期时间
+        return lambda cookie: not cookie.get(key)
+    bound = _parse_time(text)
+    if _DATE_ONLY.fullmatch(text):
+        # 日期按当地时间的一整天比较：expires:2024-01-31匹配当天任何时刻过期的Cookie
+        day_end = (datetime.fromisoformat(text) + timedelta(days=1)).timestamp()
+        compare = {
+            ':': lambda expiration: bound <= expiration < day_end,
+            '>': lambda expiration: expiration >= day_end,
+            '>=': lambda expiration: expiration >= bound,
+            '<': lambda expiration: expiration < bound,
+            '<=': lambda expiration: expiration < day_end,
+        }[op]
+    else:
+        compare = {
+            ':': lambda expiration: int(expiration) == int(bound),
+            '>': lambda expiration: expiration > bound,
+            '>=': lambda expiration: expiration >= bound,
+            '<': lambda expiration: expiration < bound,
+            '<=': lambda expiration: expiration <= bound,
+        }[op]
+
+    def check(cookie):
+        expiration = cookie.get(key)
+        if not expiration:
+            return False
+        try:
+            return compare(float(expiration))
+        except (TypeError, ValueError):
+            return False
+    return check
+
+class CookieQuery:
+    """编译后的Cookie查询
+
+    查询由空格分隔的条件组成，所有条件同时满足才算匹配，例如
+    "domain:twitter|x.com name:auth_token secure:true expires>now"。
+    不带字段名的条件按域名模式处理；'|'分隔的候选值合并为一个匹配器。
+    域名条件交给DomainIndex按域名查询，其余条件合成一个判断函数，
+    对候选行只遍历一次。
+    """
+    def __init__(self, domain_patterns: List[str], predicate: Optional[Callable]):
+        self.domain_patterns = domain_patterns
+        # 除域名外所有条件合成的判断函数，没有其他条件时为None
+        self.predicate = predicate
+
+    @classmethod
+    def parse(cls, text: str) -> 'CookieQuery':
+        """解析查询文本，格式错误时抛出ValueError"""
+        text = text.strip()
+        if not is_query(text):
+            if text:
+                domain_matcher(text)
+            return cls([text] if text else [], None)
+
+        domain_patterns = []
+        checks = []
+        position = 0
+        while position < len(text):
+            if text[position].isspace():
+                position += 1
+                continue
+            match = _QUERY_TERM.match(text, position)
+            field = match.group('field').lower() if match else None
+            if field not in QUERY_FIELDS:
+                # 不带字段名的条件按域名模式处理
+                end = position
+                while end < len(text) and not text[end].isspace():
+                    end += 1
+                domain_patterns.append(text[position:end])
+                position = end
+                continue
+            position = match.end()
+            op = match.group('op')
+            value = match.group('quoted')
+            if value is None:
+                value = match.group('value')
+            key, kind = QUERY_FIELDS[field]
+            if kind != 'time' and op != ':':
+                raise ValueError(f'字段{field}不支持比较运算符{op}')
+            if not value and kind != 'text':
+                raise ValueError(f'字段{field}缺少取值')
+
+            if kind == 'domain':
+                # 每个候选按各自的类型转换后再合并，正则候选不会改变其他候选的含义
+                domain_patterns.append(merge_domain_patterns(_split_alternatives(value)))
+            elif kind == 'text':
+                checks.append(_text_predicate(key, value.split('|')))
+            elif kind == 'nocase':
+                checks.append(_text_predicate(key, value.split('|'), re.IGNORECASE))
+            elif kind == 'flag':
+                expected = _FLAG_VALUES.get(value.lower())
+                if expected is None:
+                    raise ValueError(f'字段{field}的取值应为true或false：{value}')
+                checks.append(_flag_predicate(key, expected))
+            else:
+                checks.append(_time_predicate(key, op, value))
+
+        for pattern in domain_patterns:
+            domain_matcher(pattern)
+        return cls(domain_patterns, cls._fuse(checks))
+
+    @staticmethod
+    def _fuse(checks: List[Callable]) -> Optional[Callable]:
+        """把多个判断函数合成一个"""
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        checks = tuple(checks)
+        return lambda cookie: all(check(cookie) for check in checks)
+
+    def cookie_predicate(self) -> Optional[Callable]:
+        """单条Cookie的完整判断函数，每个不同的域名只判断一次；空查询返回None"""
+        if not self.domain_patterns and self.predicate is None:
+            return None
+        domain_checks = [make_domain_predicate(pattern) for pattern in self.domain_patterns]
+        predicate = self.predicate
+        matched_domains: Dict[str, bool] = {}
+
+        def check(cookie):
+            domain = domain_of(cookie)
+            matched = matched_domains.get(domain)
+            if matched is None:
+                matched = matched_domains[domain] = all(
+                    domain_check(domain) for domain_check in domain_checks)
+            return matched and (predicate is None or predicate(cookie))
+        return check
+
+    def match_rows(self, index: DomainIndex, count: int) -> List[int]:
+        """先用域名索引取出候选行；没有域名条件时候选为全部count行"""
+        if not self.domain_patterns:
+            return list(range(count))
+        rows = index.match_rows(self.domain_patterns[0])
+        for pattern in self.domain_patterns[1:]:
+            allowed = set(index.match_rows(pattern))
+            rows = [row for row in rows if row in allowed]
+        return rows
+
+# 常见的导出字段直接存放在CookieRecord的槽中
+_RECORD_FIELDS = ('domain', 'name', 'value', 'path', 'expirationDate', 'sameSite', 'storeId', 'id')
+# 布尔字段压缩存放在flags中，每个字段两位：低位表示已压缩存放，高位为取值
+_RECORD_FLAGS = {'hostOnly': 1, 'httpOnly': 4, 'secure': 16, 'session': 64}
+# 原始字段顺序 → (共用的字段顺序元组, 放入extra的字段, 布尔字段及其位,
+#                  槽字段取值函数, 还原dict时的取值函数)
+_RECORD_LAYOUTS: Dict[tuple, tuple] = {}
+
+def _record_layout(layout: tuple) -> tuple:
+    info = _RECORD_LAYOUTS.get(layout)
+    if info is None:
+        extra_keys = tuple(key for key in layout
+                           if key not in _RECORD_FLAGS and key not in _RECORD_FIELDS)
+        flag_keys = tuple((key, bit) for key, bit in _RECORD_FLAGS.items() if key in layout)
+        # 槽字段齐全时一次取出全部取值
+        fields = (itemgetter(*_RECORD_FIELDS)
+                  if all(field in layout for field in _RECORD_FIELDS) else None)
+        # 没有额外字段时，所有字段都能作为属性一次取出
+        values = attrgetter(*layout) if layout and not extra_keys else None
+        info = _RECORD_LAYOUTS[layout] = (layout, extra_keys, flag_keys, fields, values)
+    return info
+
+class CookieRecord:
+    """紧凑存放的一条Cookie
+
+    比每条Cookie一个dict省内存：没有逐条重复的键名，域名、路径等字符串共用，
+    布尔字段压缩为一个整数。字段顺序和不认识的字段（放在extra中）都原样保留，
+    to_dict()可还原出与原始记录相同的dict。读取方式与dict相同（get、[]、in、遍历键名）。
+    """
+    __slots__ = _RECORD_FIELDS + ('flags', 'layout', 'extra')
+
+    def __init__(self, domain, name, value, path, expirationDate, sameSite, storeId, id,
+                 flags=0, layout=(), extra=None):
+        self.domain = domain
+        self.name = name
+        self.value = value
+        self.path = path
+        self.expirationDate = expirationDate
+        self.sameSite = sameSite
+        self.storeId = storeId
+        self.id = id
+        self.flags = flags
+        # 原始字段顺序，相同顺序的记录共用一个元组
+        self.layout = layout
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, cookie: Dict[str, Any],
+                  strings: Optional[Dict[str, str]] = None) -> 'CookieRecord':
+        """由解析得到的dict创建记录
+
+        strings为同一批记录共用的字符串表，重复率高的域名、名称、路径、SameSite
+        和storeId相同时只保留一个对象。
+        """
+        layout, extra_keys, flag_keys, fields, _ = _record_layout(tuple(cookie))
+        extra = {key: cookie[key] for key in extra_keys} if extra_keys else None
+        flags = 0
+        for key, bit in flag_keys:
+            value = cookie[key]
+            if value is True:
+                flags |= bit | (bit << 1)
+            elif value is False:
+                flags |= bit
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        (domain, name, value, path, expiration, same_site, store_id,
+         cookie_id) = fields(cookie) if fields is not None else map(cookie.get, _RECORD_FIELDS)
+        if strings is not None:
+            share = strings.setdefault
+            try:
+                domain = share(domain, domain)
+                name = share(name, name)
+                path = share(path, path)
+                same_site = share(same_site, same_site)
+                store_id = share(store_id, store_id)
+            except TypeError:
+                # 字段值不可哈希，保持原样
+                pass
+        return cls(domain, name, value, path, expiration, same_site, store_id, cookie_id,
+                   flags, layout, extra)
+
+    def get(self, key, default=None):
+        getter = _RECORD_GETTERS.get(key)
+        if getter is not None:
+            value = getter(self)
+            if value is None and key not in self.layout:
+                return default
+            return value
+        bit = _RECORD_FLAGS.get(key)
+        if bit is not None and self.flags & bit:
+            return self.flags & (bit << 1) != 0
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        if key not in self.layout:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key):
+        return key in self.layout
+
+    def __iter__(self):
+        return iter(self.layout)
+
+    def __len__(self):
+        return len(self.layout)
+
+    def keys(self):
+        return self.layout
+
+    def items(self):
+        return self.to_dict().items()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为原始的dict"""
+        layout = self.layout
+        values = _record_layout(layout)[4]
+        if values is not None:
+            if len(layout) == 1:
+                return {layout[0]: values(self)}
+            return dict(zip(layout, values(self)))
+        get = self.get
+        return {key: get(key) for key in layout}
+
+    def state(self) -> tuple:
+        """全部槽的取值，CookieRecord(*state)可重建记录，可直接用marshal序列化"""
+        return _RECORD_STATE(self)
+
+    def __eq__(self, other):
+        if isinstance(other, CookieRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'CookieRecord({self.to_dict()!r})'
+
+def _flag_property(key: str, bit: int) -> property:
+    """布尔字段的属性，未压缩存放的取值从extra中读取"""
+    def getter(self):
+        flags = self.flags
+        if flags & bit:
+            return flags & (bit << 1) != 0
+        return self.extra.get(key) if self.extra is not None else None
+    return property(getter)
+
+for _key, _bit in _RECORD_FLAGS.items():
+    setattr(CookieRecord, _key, _flag_property(_key, _bit))
+
+_RECORD_GETTERS = {field: attrgetter(field) for field in _RECORD_FIELDS}
+_RECORD_STATE = attrgetter(*CookieRecord.__slots__)
+
+def _checked_record(cookie):
+    """数组中不是dict的元素：已经是CookieRecord时原样返回，否则抛出ValueError"""
+    if isinstance(cookie, CookieRecord):
+        return cookie
+    text = json.dumps(cookie, ensure_ascii=False, default=repr)
+    if len(text) > 50:
+        text = text[:50] + '...'
+    raise ValueError(f'Cookie数组的元素必须是JSON对象，遇到：{text}')
+
+def compact_cookies(cookies: list) -> list:
+    """把解析得到的dict转换为CookieRecord，不是JSON对象的元素抛出ValueError"""
+    from_dict = CookieRecord.from_dict
+    strings: Dict[str, str] = {}
+    return [from_dict(cookie, strings) if cookie.__class__ is dict else _checked_record(cookie)
+            for cookie in cookies]
+
+def _encode_record(value):
+    """供JSONEncoder使用，把CookieRecord等带to_dict()的记录还原为dict"""
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+# 导出格式的编码器：不缩进、不换行，保留非ASCII字符
+_COOKIE_ENCODER = json.JSONEncoder(indent=None, separators=(',', ':'), ensure_ascii=False,
+                                   default=_encode_record)
+
+def encode_cookies(cookies: List[Dict[str, Any]]) -> str:
+    """把Cookie编码为与导出的JSON文件相同格式的数组"""
+    return _COOKIE_ENCODER.encode(cookies)
+
+def _domain_implies(narrow: str, wide: str) -> bool:
+    """匹配narrow的域名是否一定匹配wide，只识别纯域名和后缀的简单情形"""
+    if narrow == wide:
+        return True
+    wide_kind = pattern_kind(wide)
+    if wide_kind not in (KIND_SUBSTRING, KIND_SUFFIX):
+        return False
+    if pattern_kind(narrow) == KIND_SUBSTRING:
+        # 子串条件只能推出更短的子串条件
+        return wide_kind == KIND_SUBSTRING and wide.lower() in narrow.lower()
+    suffix = literal_suffix(narrow)
+    if suffix is None:
+        return False
+    if wide_kind == KIND_SUBSTRING:
+        return wide.lower() in suffix
+    wide_suffix = wide.strip('.').lower()
+    return suffix == wide_suffix or suffix.endswith('.' + wide_suffix)
+
+class CookieStore:
+    """已解析的Cookie数据
+
+    在导入文件或文本时解析一次，之后的每次提取都直接在内存中查询，
+    只有输入内容真正改变时才需要重新解析。
+    """
+    def __init__(self, cookies: List[Dict[str, Any]], source: str = '', text_key=None):
+        self.cookies = cookies
+        self.source = source
+        # 解析文本的指纹，用于判断输入框内容是否真的改变
+        self.text_key = text_key
+        # 域名索引，首次查询时建立
+        self.index: Optional[DomainIndex] = None
+        # 已移除的行数，移除的行在cookies中留空为None
+        self.discarded = 0
+        # 读取时已在数据源中应用的域名条件，不为空时只包含匹配的Cookie
+        self.prefilter = ''
+
+    @staticmethod
+    def text_key_of(text: str):
+        """计算文本指纹"""
+        return (len(text), hash(text))
+
+    @classmethod
+    def from_text(cls, text: str, source: str = '') -> 'CookieStore':
+        """从JSON文本解析Cookie"""
+        text = text.strip()
+        cookies = json.loads(text)
+        if not isinstance(cookies, list):
+            raise ValueError('Cookie数据必须是JSON数组')
+        return cls(compact_cookies(cookies), source, cls.text_key_of(text))
+
+    def __len__(self):
+        return len(self.cookies) - self.discarded
+
+    def append(self, cookies: list) -> range:
+        """追加Cookie并登记到索引，返回新行的行号"""
+        start = len(self.cookies)
+        self.cookies.extend(cookies)
+        if self.index is not None:
+            self.index.extend(self.cookies, start, len(self.cookies))
+        return range(start, len(self.cookies))
+
+    def discard(self, rows) -> list:
+        """移除若干行并返回移除的Cookie；其他行的行号不变"""
+        cookies = self.cookies
+        removed = []
+        rows_by_domain: Dict[str, set] = {}
+        for row in rows:
+            cookie = cookies[row]
+            if cookie is None:
+                continue
+            removed.append(cookie)
+            rows_by_domain.setdefault(domain_of(cookie), set()).add(row)
+            cookies[row] = None
+        self.discarded += len(removed)
+        if self.index is not None:
+            self.index.discard(rows_by_domain)
+        return removed
+
+    def covers(self, query: str) -> bool:
+        """在store上执行query的结果是否与在完整数据上相同
+
+        读取时在数据源中按域名条件过滤过（prefilter不为空）时，只有query的域名条件
+        不比读取时的条件宽，结果才完整；无法判断时按不完整处理。格式错误的query返回True，
+        错误留给查询本身报告。
+        """
+        if not self.prefilter:
+            return True
+        try:
+            wanted = CookieQuery.parse(query).domain_patterns
+        except (re.error, ValueError):
+            return True
+        applied = CookieQuery.parse(self.prefilter).domain_patterns
+        return all(any(_domain_implies(narrow, wide) for narrow in wanted) for wide in applied)
+
+    @property
+    def needs_compact(self) -> bool:
+        """已移除的行是否多到值得压缩"""
+        return self.discarded > len(self.cookies) * COMPACT_RATIO
+
+    def compact(self) -> List[int]:
+        """去掉已移除的行并重建索引，返回 旧行号 → 新行号 的列表（已移除的行为-1）"""
+        mapping = []
+        live = []
+        for cookie in self.cookies:
+            if cookie is None:
+                mapping.append(-1)
+            else:
+                mapping.append(len(live))
+                live.append(cookie)
+        self.cookies[:] = live
+        self.discarded = 0
+        if self.index is not None:
+            self.index = DomainIndex.build(self.cookies)
+        return mapping
+
+    def filter_domain(self, domain_pattern: str,
+                      task: Optional[TaskControl] = None) -> List[Dict[str, Any]]:
+        """按域名过滤Cookie"""
+        if self.index is None:
+            self.index = DomainIndex.build(self.cookies, task)
+        cookies = self.cookies
+        return [cookies[row] for row in self.index.match_rows(domain_pattern)]
+
+    def filter(self, query: str,
+               task: Optional[TaskControl] = None) -> List[Dict[str, Any]]:
+        """按查询条件过滤Cookie，查询语法见CookieQuery"""
+        if self.index is None:
+            with traced(task, 'index') as stage:
+                self.index = DomainIndex.build(self.cookies, task)
+                stage.rows = len(self)
+        with traced(task, 'filter') as stage:
+            result = self._filter(query, task)
+            stage.rows = len(result)
+        return result
+
+    def _filter(self, query: str, task: Optional[TaskControl]) -> List[Dict[str, Any]]:
+        compiled = CookieQuery.parse(query)
+        if compiled.predicate is None and len(compiled.domain_patterns) <= 1:
+            return self.filter_domain(''.join(compiled.domain_patterns), task)
+        cookies = self.cookies
+        rows = compiled.match_rows(self.index, len(cookies))
+        if self.discarded and not compiled.domain_patterns:
+            rows = [row for row in rows if cookies[row] is not None]
+        predicate = compiled.predicate
+        if predicate is None:
+            return [cookies[row] for row in rows]
+        result = []
+        total = len(rows)
+        for start in range(0, total, TASK_BLOCK_SIZE):
+            if task is not None:
+                task.check()
+                task.progress(start, total, '正在过滤')
+            result.extend(cookie for cookie in map(cookies.__getitem__,
+                                                   rows[start:start + TASK_BLOCK_SIZE])
+                          if predicate(cookie))
+        return result
+
+    def filter_rows(self, query: str, rows) -> List[Dict[str, Any]]:
+        """只在指定的行中按查询条件过滤，用于合并新数据后增量更新结果"""
+        matches = CookieQuery.parse(query).cookie_predicate()
+        cookies = [cookie for cookie in map(self.cookies.__getitem__, rows) if cookie is not None]
+        if matches is None:
+            return cookies
+        return [cookie for cookie in cookies if matches(cookie)]
+
+# 压缩文件的文件头
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+ZIP_MAGIC = b'PK\x03\x04'
+# 压缩文件和压缩包的扩展名
+COMPRESSED_EXTENSIONS = ('.gz', '.zst', '.zip')
+
+def detect_encoding(head: bytes) -> str:
+    """根据开头的BOM或零字节判断文本编码：UTF-16（有无BOM均可）或UTF-8（可带BOM）"""
+    head = bytes(head[:4])
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    if len(head) >= 4:
+        # Cookie数据开头是ASCII字符，UTF-16编码后每个字符有一个零字节
+        if head[1] == 0 and head[3] == 0 and head[0] != 0:
+            return 'utf-16-le'
+        if head[0] == 0 and head[2] == 0 and head[1] != 0:
+            return 'utf-16-be'
+    return 'utf-8-sig'
+
+def open_decompressed(stream):
+    """按文件头识别gzip和zstd压缩，返回解压后的二进制流，未压缩时原样返回
+
+    stream须可回到开头；zstd需要安装可选的zstandard包。
+    """
+    magic = stream.read(len(_ZSTD_MAGIC))
+    stream.seek(0)
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if magic.startswith(_ZSTD_MAGIC):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError('读取zstd压缩的文件需要安装zstandard：pip install zstandard') from None
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+    return stream
+
+def iter_decoded(blocks, errors: str = 'strict'):
+    """把字节块流逐块解码为文本，编码由第一块开头的BOM或零字节判断"""
+    decoder = None
+    for block in blocks:
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(detect_encoding(block))(errors)
+        text = decoder.decode(block)
+        if text:
+            yield text
+    if decoder is not None:
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+def iter_buffer_chunks(buffer, task: Optional[TaskControl] = None, errors: str = 'strict'):
+    """逐块解码内存中的字节数据（bytes或mmap）"""
+    total = len(buffer)
+    view = memoryview(buffer)
+
+    def blocks():
+        for offset in range(0, total, IO_CHUNK_SIZE):
+            if task is not None:
+                task.check()
+                task.progress(offset, total, '正在读取')
+            yield view[offset:offset + IO_CHUNK_SIZE]
+    try:
+        yield from iter_decoded(blocks(), errors)
+    finally:
+        view.release()
+
+def iter_stream_chunks(stream, task: Optional[TaskControl] = None, total: int = 0,
+                       position: Optional[Callable[[], int]] = None, errors: str = 'strict',
+                       head: bytes = b''):
+    """逐块读取二进制流（例如解压流）并解码为文本
+
+    total和position()为进度的总量和当前位置，例如压缩文件的大小和已读取的压缩数据量；
+    head为已经从流中读出的开头部分。
+    """
+    def blocks():
+        if head:
+            yield head
+        while True:
+            if task is not None:
+                task.check()
+                if total:
+                    task.progress(position(), total, '正在读取')
+            block = stream.read(IO_CHUNK_SIZE)
+            if not block:
+                return
+            yield block
+    return iter_decoded(blocks(), errors)
+
+def iter_file_chunks(file_path: str, task: Optional[TaskControl] = None, errors: str = 'strict'):
+    """逐块读取文件并解码为文本
+
+    未压缩的文件通过内存映射读取；gzip和zstd压缩的文件边读边解压，
+    任何时候都只有一块解压后的数据在内存中。
+    """
+    if not os.path.getsize(file_path):
+        return
+    with open(file_path, 'rb') as f:
+        stream = open_decompressed(f)
+        if stream is not f:
+            yield from iter_stream_chunks(stream, task, os.fstat(f.fileno()).st_size, f.tell,
+                                          errors)
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter_buffer_chunks(mapped, task, errors)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def _is_truncated(error: json.JSONDecodeError, buffer_size: int) -> bool:
+    """解析错误是否只是因为缓冲区里的数据还不完整"""
+    return (error.msg.startswith('Unterminated string')
+            or error.pos >= buffer_size - 8)
+
+def iter_json_array(chunks, trailing: bool = False):
+    """从文本块流中逐个解析JSON数组的元素
+
+    每次只在缓冲区中保留尚未解析完的一小段文本，元素解析出来后立即交给调用方。
+    trailing为True时忽略数组之后的内容（例如从HAR文件中间开始的数组）。
+    """
+    scan_once = json.JSONDecoder().scan_once
+    skip_whitespace = _WHITESPACE.match
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    eof = False
+    # 新数据到达后先尝试整批解析
+    try_batch = True
+
+    def read_more():
+        """丢弃已解析的部分并追加一块数据，没有更多数据时返回False"""
+        nonlocal buffer, pos, eof, try_batch
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        try_batch = True
+        return True
+
+    def next_char():
+        """跳过空白并返回下一个字符，数据读完时返回空串"""
+        nonlocal pos
+        while True:
+            pos = skip_whitespace(buffer, pos).end()
+            if pos < len(buffer) or not read_more():
+                return buffer[pos:pos + 1]
+
+    first = next_char()
+    if first != '[':
+        if not first:
+            raise json.JSONDecodeError('Expecting value', buffer, pos)
+        raise ValueError('Cookie数据必须是JSON数组')
+    pos += 1
+
+    if next_char() == ']':
+        pos += 1
+    else:
+        while True:
+            if try_batch:
+                # 把缓冲区中到最后一个'}'为止的部分当作一个数组整体解析：
+                # 只有截断位置恰好在元素之间时才能解析成功，
+                # 这样一次调用就能解析出一整块的元素，键名也能在块内共享
+                try_batch = False
+                batch_end = buffer.rfind('}', pos) + 1
+                if batch_end:
+                    batch = '[' + buffer[pos:batch_end] + ']'
+                    try:
+                        values, end = scan_once(batch, 0)
+                    except (StopIteration, json.JSONDecodeError):
+                        values = None
+                    if values is not None and end != len(batch):
+                        # 数组在这一段中间就结束了，其后是数组之外的内容
+                        values = None
+                    if values is not None:
+                        pos = batch_end
+                        yield from values
+                        if _expect_separator(next_char(), buffer, pos):
+                            pos += 1
+                            next_char()
+                            continue
+                        pos += 1
+                        break
+
+            try:
+                value, end = scan_once(buffer, pos)
+            except StopIteration as e:
+                error = json.JSONDecodeError('Expecting value', buffer, e.value)
+            except json.JSONDecodeError as e:
+                error = e
+            else:
+                error = None
+            if error is not None:
+                if not eof and _is_truncated(error, len(buffer)) and read_more():
+                    continue
+                raise error
+            # 数字和true/false/null可能恰好在块边界被截断
+            if (not eof and not isinstance(value, (dict, list, str))
+                    and (end == len(buffer) or buffer[end] in '.eE+-0123456789')
+                    and read_more()):
+                continue
+            pos = end
+            yield value
+
+            if _expect_separator(next_char(), buffer, pos):
+                pos += 1
+                next_char()
+            else:
+                pos += 1
+                break
+
+    if not trailing and next_char():
+        raise json.JSONDecodeError('Extra data', buffer, pos)
+
+def _expect_separator(char: str, buffer: str, pos: int) -> bool:
+    """检查数组元素之后的分隔符，遇到','返回True，遇到']'返回False"""
+    if char == ',':
+        return True
+    if char == ']':
+        return False
+    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+
+# 导出格式：单行JSON数组，或每行一个Cookie的NDJSON
+FORMAT_JSON = 'json'
+FORMAT_NDJSON = 'ndjson'
+# 保存对话框的文件类型：(过滤器, 扩展名)
+SAVE_FILTERS = [
+    ('JSON文件 (*.json)', '.json'),
+    ('NDJSON文件 (*.ndjson *.jsonl)', '.ndjson'),
+    ('GZIP压缩的JSON文件 (*.json.gz)', '.json.gz'),
+    ('GZIP压缩的NDJSON文件 (*.ndjson.gz *.jsonl.gz)', '.ndjson.gz'),
+]
+
+def output_format_of(file_path: str):
+    """根据扩展名判断导出格式，返回(格式, 是否gzip压缩)"""
+    name = file_path.lower()
+    compressed = name.endswith('.gz')
+    if compressed:
+        name = name[:-3]
+    if name.endswith(('.ndjson', '.jsonl')):
+        return FORMAT_NDJSON, compressed
+    return FORMAT_JSON, compressed
+
+def save_cookies(file_path: str, cookies: List[Dict[str, Any]],
+                 task: Optional[TaskControl] = None):
+    """把原始Cookie记录分块写出，保留所有字段，取消时删除未写完的文件
+
+    格式由扩展名决定：.ndjson/.jsonl为每行一个Cookie，其他为单行JSON数组（不缩进，不换行），
+    再以.gz结尾时使用gzip压缩。任何时候都只有一块数据的文本在内存中。
+    """
+    output_format, compressed = output_format_of(file_path)
+    encode = _COOKIE_ENCODER.encode
+    total = len(cookies)
+    trace = task.trace if task is not None else None
+    encode_seconds = write_seconds = 0.0
+    if compressed:
+        # 压缩级别6比默认的9快得多，文件只大一点
+        f = gzip.open(file_path, 'wt', encoding='utf-8', compresslevel=6)
+    else:
+        f = open(file_path, 'w', encoding='utf-8')
+    try:
+        with f:
+            if output_format == FORMAT_JSON:
+                f.write('[')
+            for start in range(0, total, TASK_BLOCK_SIZE):
+                if task is not None:
+                    task.check()
+                    task.progress(start, total, '正在保存')
+                block = cookies[start:start + TASK_BLOCK_SIZE]
+                started = time.perf_counter()
+                if output_format == FORMAT_NDJSON:
+                    text = '\n'.join(map(encode, block)) + '\n'
+                else:
+                    # 整块编码为数组后去掉首尾括号
+                    text = (',' if start else '') + encode(block)[1:-1]
+                encoded = time.perf_counter()
+                f.write(text)
+                encode_seconds += encoded - started
+                write_seconds += time.perf_counter() - encoded
+            if output_format == FORMAT_JSON:
+                f.write(']')
+        if trace is not None:
+            trace.add('encode', encode_seconds, total)
+            trace.add('write', write_seconds, total)
+    except TaskCancelled:
+        os.remove(file_path)
+        raise
+
+def load_cookie_chunks(chunks, source: str = '', domain_pattern: str = '',
+                       task: Optional[TaskControl] = None) -> CookieStore:
+    """流式解析文本块中的Cookie数组
+
+    给出域名模式或查询条件时，每解析完一批Cookie就通过task.partial()回报其中匹配的部分，
+    界面可以在全部解析完之前显示结果。
+    """
+    trace = task.trace if task is not None else None
+    if trace is not None:
+        chunks = _timed_chunks(chunks, trace)
+    return load_cookie_records(iter_json_array(chunks), source, domain_pattern, task)
+
+def load_cookie_records(records, source: str = '', domain_pattern: str = '',
+                        task: Optional[TaskControl] = None) -> CookieStore:
+    """把逐个产生的Cookie（dict）转为紧凑记录并建立索引，参数含义同load_cookie_chunks"""
+    matches = None
+    if domain_pattern and task is not None and task.wants_partial:
+        matches = CookieQuery.parse(domain_pattern).cookie_predicate()
+    trace = task.trace if task is not None else None
+    # 建立索引和匹配的耗时，其余为解析耗时
+    other_seconds = 0.0
+
+    def finish_block(start):
+        nonlocal other_seconds
+        started = time.perf_counter()
+        index.extend(cookies, start, len(cookies))
+        indexed = time.perf_counter()
+        if matches is not None:
+            task.partial([cookie for cookie in cookies[start:] if matches(cookie)])
+        if trace is not None:
+            trace.add('index', indexed - started, len(cookies))
+            if matches is not None:
+                trace.add('match', time.perf_counter() - indexed)
+        other_seconds += time.perf_counter() - started
+
+    started = time.perf_counter()
+    cookies = []
+    index = DomainIndex()
+    block_start = 0
+    from_dict = CookieRecord.from_dict
+    strings: Dict[str, str] = {}
+    for cookie in records:
+        # 解析出的dict立即转为紧凑记录，不会同时保留整个文件的dict
+        cookies.append(from_dict(cookie, strings) if cookie.__class__ is dict
+                       else _checked_record(cookie))
+        if len(cookies) - block_start >= TASK_BLOCK_SIZE:
+            finish_block(block_start)
+            block_start = len(cookies)
+    finish_block(block_start)
+    if trace is not None:
+        read_seconds = trace.stages['read'].seconds if 'read' in trace.stages else 0.0
+        trace.add('parse', time.perf_counter() - started - read_seconds - other_seconds,
+                  len(cookies))
+
+    store = CookieStore(cookies, source)
+    store.index = index
+    return store
+
+def _timed_chunks(chunks, trace: OperationTrace):
+    """统计读取和解码每个文本块的耗时"""
+    chunks = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        trace.add('read', time.perf_counter() - started)
+        if chunk is None:
+            return
+        yield chunk
+
+def load_cookie_file(file_path: str, domain_pattern: str = '',
+                     task: Optional[TaskControl] = None, prefilter: bool = False) -> CookieStore:
+    """流式读取并解析Cookie文件，参数含义同load_cookie_chunks
+
+    文件格式自动识别，除JSON数组外的格式见cookie_readers。
+    prefilter为True时允许读取器只读出域名与domain_pattern匹配的Cookie
+    （SQLite数据库在SQL查询中过滤），此时store.prefilter记录所用的条件。
+    """
+    from cookie_readers import detect_reader
+    reader = detect_reader(file_path)
+    if reader is None:
+        return load_cookie_chunks(iter_file_chunks(file_path, task), file_path,
+                                  domain_pattern, task)
+    pushdown = domain_pattern if prefilter and reader.filters_domain else ''
+    store = load_cookie_records(reader.read(file_path, pushdown, task), file_path,
+                                domain_pattern, task)
+    store.prefilter = pushdown
+    return store
+
+def load_cookie_buffer(data: bytes, source: str, domain_pattern: str = '',
+                       task: Optional[TaskControl] = None) -> CookieStore:
+    """流式解析内存中的UTF-8文本，例如粘贴的大段Cookie数据"""
+    return load_cookie_chunks(iter_buffer_chunks(data, task), source, domain_pattern, task)
+
+def parse_if_changed(store: Optional[CookieStore], text: Optional[str],
+                     task: Optional[TaskControl] = None) -> CookieStore:
+    """text为None或与已解析的文本相同时直接返回store，否则重新解析"""
+    if text is not None and (store is None
+                             or store.text_key != CookieStore.text_key_of(text)):
+        if task is not None:
+            task.progress(0, 1, '正在解析')
+        with traced(task, 'parse') as stage:
+            store = CookieStore.from_text(text)
+            stage.rows = len(store)
+    return store
+
+def extract_from(store: Optional[CookieStore], text: Optional[str], domain_pattern: str,
+                 task: Optional[TaskControl] = None):
+    """必要时重新解析文本，再按查询条件过滤，返回(解析结果, 匹配的Cookie)"""
+    store = parse_if_changed(store, text, task)
+    return store, store.filter(domain_pattern, task)
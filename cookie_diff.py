@@ -0,0 +1,172 @@
+"""对比同一浏览器配置的两份Cookie快照
+
+两份数据先按同一查询条件过滤，再以(域名, 名称, 路径)为键做哈希连接，
+线性时间内找出新增、删除以及值或过期时间改变的Cookie，结果逐批回报给界面。
+"""
+from itertools import compress, islice, repeat
+from operator import attrgetter, ne
+from typing import Dict, List, Optional, Tuple
+
+from cookie_core import (COLUMNS, CookieRecord, CookieStore, TaskControl, TASK_BLOCK_SIZE,
+                         format_expiration)
+from cookie_cache import load_cached
+from cookie_merge import cookie_keys, gc_paused, iter_loaded
+from cookie_trace import traced
+
+DIFF_ADDED = 'added'
+DIFF_REMOVED = 'removed'
+DIFF_CHANGED = 'changed'
+# 状态 → 界面显示的名称
+DIFF_LABELS = {
+    DIFF_ADDED: '新增',
+    DIFF_REMOVED: '删除',
+    DIFF_CHANGED: '改变',
+}
+# 差异结果中表示状态的字段名
+STATUS_KEY = 'diff'
+# 导出的差异结果中改变前的值和过期时间
+PREVIOUS_KEY = 'previous'
+# 对比结果表格的列定义，在COLUMNS之后增加状态列
+DIFF_COLUMNS = COLUMNS + [(STATUS_KEY, '状态', '')]
+
+_RECORD_COMPARED = attrgetter('value', 'expirationDate')
+
+def _compared(cookie) -> tuple:
+    """判断是否改变时比较的字段：值和过期时间"""
+    if cookie.__class__ is CookieRecord:
+        return _RECORD_COMPARED(cookie)
+    return cookie.get('value'), cookie.get('expirationDate')
+
+def _compared_all(cookies: list) -> list:
+    """一批Cookie的比较字段，全部是CookieRecord时一次取出"""
+    try:
+        return list(map(_RECORD_COMPARED, cookies))
+    except AttributeError:
+        return list(map(_compared, cookies))
+
+# 旧快照中没有的键，其值不等于任何Cookie的值
+_MISSING = CookieRecord(None, None, object(), None, None, None, None, None)
+
+class DiffRow:
+    """差异结果中的一行，读取方式与Cookie相同，另有STATUS_KEY字段表示状态
+
+    新增和改变的行显示新快照中的Cookie，删除的行显示旧快照中的；old为改变前的Cookie。
+    """
+    __slots__ = ('status', 'cookie', 'old')
+
+    def __init__(self, status: str, cookie, old=None):
+        self.status = status
+        self.cookie = cookie
+        self.old = old
+
+    def get(self, key, default=None):
+        if key == STATUS_KEY:
+            return DIFF_LABELS[self.status]
+        return self.cookie.get(key, default)
+
+    def __getitem__(self, key):
+        if key == STATUS_KEY:
+            return DIFF_LABELS[self.status]
+        return self.cookie[key]
+
+    def describe(self) -> str:
+        """状态说明，改变的行列出改变前后的值和过期时间"""
+        label = DIFF_LABELS[self.status]
+        if self.old is None:
+            return label
+        lines = [label]
+        old_value, old_expiration = _compared(self.old)
+        value, expiration = _compared(self.cookie)
+        if old_value != value:
+            lines.append(f'值：{old_value} → {value}')
+        if old_expiration != expiration:
+            lines.append(f'过期时间：{format_expiration(old_expiration) or "会话"} → '
+                         f'{format_expiration(expiration) or "会话"}')
+        return '\n'.join(lines)
+
+    def to_dict(self) -> dict:
+        """导出时的记录：原Cookie的全部字段加上状态，改变的行还包括改变前的值和过期时间"""
+        cookie = self.cookie
+        result = cookie.to_dict() if cookie.__class__ is CookieRecord else dict(cookie)
+        result[STATUS_KEY] = self.status
+        if self.old is not None:
+            value, expiration = _compared(self.old)
+            result[PREVIOUS_KEY] = {'value': value, 'expirationDate': expiration}
+        return result
+
+def diff_summary(counts: Dict[str, int]) -> str:
+    return '，'.join(f'{label} {counts.get(status, 0)} 个' for status, label in DIFF_LABELS.items())
+
+def _by_key(cookies: list, task: Optional[TaskControl]) -> dict:
+    """去重键 → Cookie，同一份快照中重复的键保留最后一条"""
+    keyed = {}
+    for start in range(0, len(cookies), TASK_BLOCK_SIZE):
+        if task is not None:
+            task.check()
+        keys, block = cookie_keys(cookies[start:start + TASK_BLOCK_SIZE])
+        keyed.update(zip(keys, block))
+    return keyed
+
+def diff_stores(old: CookieStore, new: CookieStore, query: str = '',
+                task: Optional[TaskControl] = None) -> Tuple[List[DiffRow], Dict[str, int]]:
+    """对比两份数据中与查询条件匹配的Cookie，返回(差异行, 各状态的数量)
+
+    先列出新增和改变的行（按新快照中的顺序），最后是删除的行（按旧快照中的顺序）；
+    每处理完一批就通过task.partial()回报这一批的差异行。
+    查找和比较都对整批数据调用内置函数完成，只有不同的行才逐条处理。
+    """
+    # 没有查询条件时直接使用全部数据，不必建立索引
+    old_cookies = old.filter(query, task) if query else old.cookies
+    new_cookies = new.filter(query, task) if query else new.cookies
+    rows: List[DiffRow] = []
+    counts = dict.fromkeys(DIFF_LABELS, 0)
+
+    def emit(found: List[DiffRow]):
+        if found:
+            rows.extend(found)
+            if task is not None:
+                task.partial(found)
+
+    with gc_paused(), traced(task, 'join') as stage:
+        before = _by_key(old_cookies, task)
+        after = _by_key(new_cookies, task)
+        total = len(after) + len(before)
+        keys = iter(after.keys())
+        cookies = iter(after.values())
+        changed = 0
+        for start in range(0, len(after), TASK_BLOCK_SIZE):
+            if task is not None:
+                task.check()
+                task.progress(start, total, '正在对比')
+            block_keys = list(islice(keys, TASK_BLOCK_SIZE))
+            block = list(islice(cookies, TASK_BLOCK_SIZE))
+            # 取出旧快照中的同一条Cookie，剩下的就是删除的
+            previous = list(map(before.pop, block_keys, repeat(_MISSING)))
+            found = []
+            for row in compress(range(len(block)),
+                                map(ne, _compared_all(previous), _compared_all(block))):
+                if previous[row] is _MISSING:
+                    found.append(DiffRow(DIFF_ADDED, block[row]))
+                else:
+                    found.append(DiffRow(DIFF_CHANGED, block[row], previous[row]))
+                    changed += 1
+            emit(found)
+        counts[DIFF_ADDED] = len(rows) - changed
+        counts[DIFF_CHANGED] = changed
+
+        removed = iter(before.values())
+        for start in range(0, len(before), TASK_BLOCK_SIZE):
+            if task is not None:
+                task.check()
+                task.progress(total - len(before) + start, total, '正在对比')
+            emit([DiffRow(DIFF_REMOVED, cookie)
+                  for cookie in islice(removed, TASK_BLOCK_SIZE)])
+        counts[DIFF_REMOVED] = len(before)
+        stage.rows = len(rows)
+    return rows, counts
+
+def diff_files(old_path: str, new_path: str, query: str = '',
+               task: Optional[TaskControl] = None, loader=load_cached):
+    """并行读取两份快照并对比，返回(旧快照, 新快照, 差异行, 各状态的数量)"""
+    old, new = iter_loaded([old_path, new_path], task, loader, workers=2)
+    return (old, new) + diff_stores(old, new, query, task)
@@ -0,0 +1,1456 @@
+"""Cookie信息提取器图形界面"""
+import sys
+import os
+import re
+import json
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# 统计导入PySide6的耗时
+_QT_IMPORT_STARTED = time.perf_counter()
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                             QHBoxLayout, QPushButton, QLineEdit, QLabel, 
+                             QTableView, QFileDialog, 
+                             QMessageBox, QTextEdit, QPlainTextEdit, QHeaderView, QFrame,
+                             QSizePolicy, QProgressBar, QComboBox)
+from PySide6.QtCore import (Qt, QAbstractTableModel, QModelIndex, Signal, QObject,
+                            QRunnable, QThreadPool, QTimer, QFileSystemWatcher)
+from PySide6.QtGui import QDragEnterEvent, QDropEvent, QFont, QColor, QIcon
+QT_IMPORT_SECONDS = time.perf_counter() - _QT_IMPORT_STARTED
+
+from cookie_core import (COLUMNS, EXPIRATION_COLUMN, format_expiration, TaskCancelled,
+                         TaskControl, CookieStore, CookieQuery, extract_from, load_cookie_buffer,
+                         save_cookies, SAVE_FILTERS, sort_keys, sorted_rows)
+from cookie_cache import load_for_query
+from cookie_watch import FolderWatch
+from cookie_split import split_from
+from cookie_merge import merge_files, MERGE_RULES
+from cookie_diff import (diff_files, diff_stores, diff_summary, DIFF_COLUMNS, STATUS_KEY,
+                         DIFF_ADDED, DIFF_REMOVED, DIFF_CHANGED)
+from cookie_trace import OperationTrace, traced
+from cookie_match import UnsafeRegex
+
+# 设置此环境变量（值为输出文件路径）后，首个窗口显示即写出启动耗时并退出
+STARTUP_PROBE_ENV = 'COOKIE_EXTRACTOR_STARTUP_PROBE'
+# 输入域名后停止输入多久（毫秒）开始自动提取
+SEARCH_DELAY_MS = 250
+# 超过此大小的粘贴内容不放入输入框，直接在后台解析
+LARGE_PASTE_BYTES = 1 << 20
+# 大段粘贴内容的预览长度（字符）
+PASTE_PREVIEW_CHARS = 4000
+# 粘贴内容解析结果的来源名称
+PASTE_SOURCE = '粘贴的文本'
+# 监视的文件夹变化后等待多久（毫秒）再扫描，避免文件写入过程中反复解析
+WATCH_DELAY_MS = 500
+# 定时扫描的间隔（毫秒）：系统文件监视只报告文件的增删，覆盖写入已有文件要靠扫描发现，
+# 某些网络共享上系统文件监视也不可用
+WATCH_POLL_MS = 3000
+# 打开文件对话框的文件类型
+OPEN_FILTER = ("Cookie文件 (*.json *.txt *.har Cookies cookies.sqlite *.gz *.zst *.zip);;"
+               "JSON文件 (*.json);;cookies.txt (*.txt);;HAR文件 (*.har);;浏览器Cookie数据库 (Cookies *.sqlite);;"
+               "压缩文件 (*.gz *.zst *.zip);;所有文件 (*.*)")
+# 对比快照时各状态的文字颜色
+DIFF_COLORS = {
+    DIFF_ADDED: QColor('#2E7D32'),
+    DIFF_REMOVED: QColor('#C62828'),
+    DIFF_CHANGED: QColor('#E65100'),
+}
+
+def format_size(size: int) -> str:
+    """格式化字节数"""
+    if size < 1 << 20:
+        return f'{size / 1024:.1f} KB'
+    return f'{size / (1 << 20):.1f} MB'
+
+def resource_path(relative_path):
+    """获取资源绝对路径"""
+    try:
+        # PyInstaller创建临时文件夹，将路径存储在_MEIPASS中
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+class SimpleButton(QPushButton):
+    """简约风格按钮"""
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.setMinimumHeight(32)
+        self.setFont(QFont('Microsoft YaHei', 9))
+        self.setCursor(Qt.PointingHandCursor)
+        
+        self.setStyleSheet("""
+            QPushButton {
+                background-color: #4A90E2;
+                color: white;
+                border: none;
+                border-radius: 4px;
+                padding: 6px 16px;
+                font-weight: normal;
+            }
+            QPushButton:hover {
+                background-color: #357ABD;
+            }
+            QPushButton:pressed {
+                background-color: #2D6DA3;
+            }
+            QPushButton:disabled {
+                background-color: #BDBDBD;
+            }
+        """)
+
+class SimpleLineEdit(QLineEdit):
+    """简约风格输入框"""
+    def __init__(self, placeholder="", parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText(placeholder)
+        self.setMinimumHeight(32)
+        self.setFont(QFont('Microsoft YaHei', 9))
+        self.setStyleSheet("""
+            QLineEdit {
+                border: 1px solid #E0E0E0;
+                border-radius: 4px;
+                padding: 6px 12px;
+                background-color: white;
+                color: #333333;
+            }
+            QLineEdit:focus {
+                border: 1px solid #4A90E2;
+            }
+            QLineEdit::placeholder {
+                color: #999999;
+            }
+        """)
+
+class SimpleTextEdit(QTextEdit):
+    """简约风格文本编辑框"""
+    # 拖放文件时发出文件路径列表，由主窗口统一加载
+    filesDropped = Signal(list)
+    # 粘贴或拖入大段文本时发出其UTF-8字节，不插入输入框
+    largeTextPasted = Signal(object)
+
+    def __init__(self, placeholder="", parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText(placeholder)
+        self.setFont(QFont('Microsoft YaHei', 9))
+        self.setStyleSheet("""
+            QTextEdit {
+                border: 1px solid #E0E0E0;
+                border-radius: 4px;
+                padding: 8px;
+                background-color: white;
+                color: #333333;
+            }
+            QTextEdit:focus {
+                border: 1px solid #4A90E2;
+            }
+            QTextEdit::placeholder {
+                color: #999999;
+            }
+            /* 滚动条样式 */
+            QScrollBar:vertical {
+                border: none;
+                background: #F5F5F5;
+                width: 8px;
+                margin: 0px;
+            }
+            QScrollBar::handle:vertical {
+                background: #BDBDBD;
+                min-height: 20px;
+                border-radius: 4px;
+            }
+            QScrollBar::handle:vertical:hover {
+                background: #9E9E9E;
+            }
+            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+                height: 0px;
+            }
+        """)
+        # 启用拖放功能
+        self.setAcceptDrops(True)
+    
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls() or event.mimeData().hasText():
+            event.acceptProposedAction()
+    
+    def dropEvent(self, event):
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            self.filesDropped.emit(paths)
+        elif event.mimeData().hasText():
+            self.insertFromMimeData(event.mimeData())
+    
+    def insertFromMimeData(self, source):
+        """大段文本不交给QTextEdit排版，直接取出原始字节"""
+        if source.hasText() and not source.hasUrls():
+            data = source.data('text/plain')
+            if data.size() > LARGE_PASTE_BYTES:
+                self.largeTextPasted.emit(data.data())
+                return
+            if data.isEmpty():
+                text = source.text()
+                if len(text) > LARGE_PASTE_BYTES:
+                    self.largeTextPasted.emit(text.encode('utf-8'))
+                    return
+        super().insertFromMimeData(source)
+
+class WorkerSignals(QObject):
+    """后台任务信号"""
+    progress = Signal(int, str)
+    partial = Signal(object)
+    result = Signal(object)
+    error = Signal(object)
+    cancelled = Signal()
+    finished = Signal()
+
+class Worker(QRunnable):
+    """在线程池中执行的后台任务，任务函数通过task参数回报进度和响应取消
+
+    任务的各阶段耗时记录在task.trace中。
+    """
+    def __init__(self, fn, *args, error_prefix: str = '处理过程中出错', operation: str = 'task'):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.error_prefix = error_prefix
+        self.signals = WorkerSignals()
+        self.task = TaskControl(self._emit_progress, self._emit_partial,
+                                OperationTrace(operation))
+
+    def _emit_progress(self, percent: int, message: str):
+        self.signals.progress.emit(percent, message)
+
+    def _emit_partial(self, result):
+        self.signals.partial.emit(result)
+
+    def cancel(self):
+        self.task.cancel()
+
+    def run(self):
+        try:
+            self.task.trace.start_profile()
+            result = self.fn(*self.args, task=self.task)
+            self.task.check()
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.task.trace.stop_profile()
+            self.signals.finished.emit()
+
+class CookieTableModel(QAbstractTableModel):
+    """Cookie结果表格模型
+
+    只保存匹配到的Cookie引用，单元格文本、过期时间和工具提示
+    都在视图请求可见单元格时由data()按需生成。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cookies: List[Dict[str, Any]] = []
+        # 排序后显示的行号，None表示按原始顺序显示
+        self._order: Optional[List[int]] = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        # 列 → 按该列升序排列的行号，切换升降序时直接反转
+        self._sorted_rows: Dict[int, List[int]] = {}
+        # 列定义，对比快照时增加状态列
+        self._columns = COLUMNS
+    
+    @property
+    def diff_mode(self) -> bool:
+        return self._columns is DIFF_COLUMNS
+    
+    def set_diff_mode(self, enabled: bool):
+        """切换对比快照的显示方式：增加状态列，按状态给文字着色"""
+        columns = DIFF_COLUMNS if enabled else COLUMNS
+        if columns is self._columns:
+            return
+        self.beginResetModel()
+        self._columns = columns
+        self._cookies = []
+        self._sorted_rows.clear()
+        self._sort_column = -1
+        self._order = None
+        self.endResetModel()
+
+    def set_cookies(self, cookies: List[Dict[str, Any]]):
+        """替换模型中的全部Cookie，保持当前的排序列"""
+        self.beginResetModel()
+        self._cookies = cookies
+        self._sorted_rows.clear()
+        self._order = self._sorted_order()
+        self.endResetModel()
+
+    def append_cookies(self, cookies: List[Dict[str, Any]]):
+        """在末尾追加Cookie，用于流式加载时逐批显示结果
+
+        已排序时新行暂时排在最后，不对全部结果重新排序。
+        """
+        if not cookies:
+            return
+        first = len(self._cookies)
+        self.beginInsertRows(QModelIndex(), first, first + len(cookies) - 1)
+        self._cookies.extend(cookies)
+        self._sorted_rows.clear()
+        if self._order is not None:
+            self._order = self._order + list(range(first, len(self._cookies)))
+        self.endInsertRows()
+
+    def remove_cookies(self, cookies: List[Dict[str, Any]]):
+        """移除指定的Cookie（按对象判断），其余行的顺序不变"""
+        if not cookies or not self._cookies:
+            return
+        removed = set(map(id, cookies))
+        kept = [cookie for cookie in self._cookies if id(cookie) not in removed]
+        if len(kept) != len(self._cookies):
+            self.set_cookies(kept)
+
+    def cookies(self) -> List[Dict[str, Any]]:
+        """按当前显示顺序返回Cookie"""
+        if self._order is None:
+            return self._cookies
+        cookies = self._cookies
+        return [cookies[row] for row in self._order]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """按列排序，只重排行号而不移动数据"""
+        self._sort_column = column
+        self._sort_order = order
+        self.beginResetModel()
+        self._order = self._sorted_order()
+        self.endResetModel()
+
+    def _sorted_order(self) -> Optional[List[int]]:
+        column = self._sort_column
+        if column < 0 or not self._cookies:
+            return None
+        rows = self._sorted_rows.get(column)
+        if rows is None:
+            rows = self._sorted_rows[column] = sorted_rows(
+                sort_keys(self._cookies, column, self._columns))
+        return rows[::-1] if self._sort_order == Qt.DescendingOrder else rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cookies)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if self._order is not None:
+            row = self._order[row]
+        cookie = self._cookies[row]
+        column = index.column()
+        key, _, default = self._columns[column]
+
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            if role == Qt.ToolTipRole and key == STATUS_KEY:
+                return cookie.describe()
+            value = cookie.get(key, default)
+            if column == EXPIRATION_COLUMN:
+                return format_expiration(value)
+            return str(value)
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        if role == Qt.ForegroundRole and self._columns is DIFF_COLUMNS:
+            return DIFF_COLORS[cookie.status]
+        if role == Qt.UserRole and column == EXPIRATION_COLUMN:
+            # 原始时间戳
+            expiration = cookie.get(key, default)
+            try:
+                return float(expiration) if expiration else 0
+            except (TypeError, ValueError):
+                return 0
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._columns[section][1]
+        return None
+
+class SimpleTable(QTableView):
+    """简约风格表格"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFont(QFont('Microsoft YaHei', 9))
+        self.setStyleSheet("""
+            QTableView {
+                border: 1px solid #E0E0E0;
+                border-radius: 4px;
+                background-color: white;
+                gridline-color: #EEEEEE;
+                color: #333333;
+            }
+            QHeaderView::section {
+                background-color: #F5F5F5;
+                padding: 8px 12px;
+                border: none;
+                font-weight: bold;
+                color: #333333;
+                border-bottom: 1px solid #E0E0E0;
+            }
+            QTableView::item {
+                padding: 8px 12px;
+                border-bottom: 1px solid #EEEEEE;
+            }
+            QTableView::item:selected {
+                background-color: #F5F5F5;
+                color: #333333;
+            }
+            QTableView::item:hover {
+                background-color: #F8F9FA;
+            }
+            /* 设置交替行颜色 */
+            QTableView::item:alternate {
+                background-color: #FAFAFA;
+            }
+            /* 滚动条样式 */
+            QScrollBar:vertical {
+                border: none;
+                background: #F5F5F5;
+                width: 8px;
+                margin: 0px;
+            }
+            QScrollBar::handle:vertical {
+                background: #BDBDBD;
+                min-height: 20px;
+                border-radius: 4px;
+            }
+            QScrollBar::handle:vertical:hover {
+                background: #9E9E9E;
+            }
+            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+                height: 0px;
+            }
+            QScrollBar:horizontal {
+                border: none;
+                background: #F5F5F5;
+                height: 8px;
+                margin: 0px;
+            }
+            QScrollBar::handle:horizontal {
+                background: #BDBDBD;
+                min-width: 20px;
+                border-radius: 4px;
+            }
+            QScrollBar::handle:horizontal:hover {
+                background: #9E9E9E;
+            }
+            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
+                width: 0px;
+            }
+        """)
+        self.setShowGrid(True)
+        self.setGridStyle(Qt.SolidLine)
+        self.setAlternatingRowColors(True)
+        self.verticalHeader().setVisible(False)
+        # 固定行高，视图无需逐行测量即可处理海量数据
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(32)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.setEditTriggers(QTableView.NoEditTriggers)
+        
+        # 设置表格列宽
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.horizontalHeader().setDefaultSectionSize(120)
+        
+        # 设置水平滚动条
+        self.setHorizontalScrollMode(QTableView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+class CookieExtractorGUI(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.cookie_store: Optional[CookieStore] = None
+        # 输入框内容在上次解析后是否被编辑过
+        self._store_dirty = True
+        # 输入框编辑计数，用于判断后台解析期间文本是否又被修改
+        self._text_revision = 0
+        # 当前正在运行的后台任务
+        self._worker: Optional[Worker] = None
+        # 大段粘贴内容的字节数
+        self._paste_size = 0
+        # 当前结果对应的查询条件，监视文件夹时据此增量更新结果
+        self._result_query: Optional[str] = None
+        # 文件夹监视
+        self._folder_watch: Optional[FolderWatch] = None
+        self._watch_worker: Optional[Worker] = None
+        self._watch_rescan = False
+        # 等待前台任务结束后再合并的监视结果
+        self._pending_watch = None
+        # 仍在运行的前台任务（包括已取消、尚未结束的）的信号对象，它们可能正在读取cookie_store
+        self._running_tasks = set()
+        # 对比快照时的(旧快照, 新快照)，此时提取改为按匹配条件重新对比
+        self._diff_stores: Optional[tuple] = None
+        self._fs_watcher = QFileSystemWatcher(self)
+        self._fs_watcher.directoryChanged.connect(self._schedule_watch_scan)
+        self._watch_timer = QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(WATCH_DELAY_MS)
+        self._watch_timer.timeout.connect(self._scan_watch)
+        self._watch_poll_timer = QTimer(self)
+        self._watch_poll_timer.setInterval(WATCH_POLL_MS)
+        self._watch_poll_timer.timeout.connect(self._scan_watch)
+        self.initUI()
+        
+    def initUI(self):
+        """初始化UI界面"""
+        self.setWindowTitle('Cookie信息提取器')
+        self.setMinimumSize(900, 600)
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: white;
+            }
+            QLabel {
+                color: #333333;
+                font-weight: normal;
+                font-size: 13px;
+            }
+        """)
+        
+        # 创建中央部件
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        # 主布局
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.setSpacing(20)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        
+        # 标题
+        title_label = QLabel('Cookie信息提取器')
+        title_label.setStyleSheet("""
+            QLabel {
+                color: #333333;
+                font-size: 20px;
+                font-weight: bold;
+                margin-bottom: 16px;
+            }
+        """)
+        title_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(title_label)
+        
+        # 上半部分布局（文件导入和域名匹配）
+        top_layout = QVBoxLayout()
+        top_layout.setSpacing(16)
+        
+        # 文件导入区域
+        file_frame = QFrame()
+        file_layout = QVBoxLayout(file_frame)
+        file_layout.setSpacing(8)
+        file_layout.setContentsMargins(0, 0, 0, 0)
+        
+        file_label = QLabel('文件导入')
+        file_label.setStyleSheet('font-size: 14px; color: #333333;')
+        file_layout.addWidget(file_label)
+        
+        # 文件路径和按钮布局
+        path_layout = QHBoxLayout()
+        path_layout.setSpacing(8)
+        
+        self.file_path_label = QLabel('未选择文件')
+        self.file_path_label.setStyleSheet("""
+            QLabel {
+                color: #666666;
+                padding: 6px 12px;
+                background-color: #F8F9FA;
+                border: 1px solid #E0E0E0;
+                border-radius: 4px;
+            }
+        """)
+        self.file_path_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        
+        import_btn = SimpleButton('选择文件')
+        import_btn.setFixedWidth(90)
+        import_btn.clicked.connect(self.import_file)
+        
+        # 同时导入多个文件时重复Cookie的取舍规则
+        self.merge_rule_combo = QComboBox()
+        self.merge_rule_combo.setFont(QFont('Microsoft YaHei', 9))
+        self.merge_rule_combo.setMinimumHeight(32)
+        self.merge_rule_combo.setToolTip('同时导入多个文件时，域名、名称和路径都相同的Cookie只保留一条')
+        for rule, label in MERGE_RULES.items():
+            self.merge_rule_combo.addItem(f'重复时{label}', rule)
+        
+        path_layout.addWidget(self.file_path_label)
+        path_layout.addWidget(self.merge_rule_combo)
+        path_layout.addWidget(import_btn)
+        
+        self.watch_btn = SimpleButton('监视文件夹')
+        self.watch_btn.setFixedWidth(110)
+        self.watch_btn.clicked.connect(self.toggle_watch)
+        path_layout.addWidget(self.watch_btn)
+        file_layout.addLayout(path_layout)
+        
+        # Cookie文本输入区域
+        self.cookie_text = SimpleTextEdit('请在此粘贴Cookie文本或拖放文件')
+        self.cookie_text.setFixedHeight(100)
+        self.cookie_text.textChanged.connect(self._invalidate_store)
+        self.cookie_text.filesDropped.connect(self.load_files)
+        self.cookie_text.largeTextPasted.connect(self.load_pasted)
+        file_layout.addWidget(self.cookie_text)
+        
+        # 大段粘贴内容的只读预览，代替输入框显示
+        self.paste_panel = QWidget()
+        paste_layout = QVBoxLayout(self.paste_panel)
+        paste_layout.setSpacing(8)
+        paste_layout.setContentsMargins(0, 0, 0, 0)
+        self.paste_preview = QPlainTextEdit()
+        self.paste_preview.setReadOnly(True)
+        self.paste_preview.setFixedHeight(100)
+        self.paste_preview.setFont(QFont('Microsoft YaHei', 9))
+        self.paste_preview.setStyleSheet("""
+            QPlainTextEdit {
+                border: 1px solid #E0E0E0;
+                border-radius: 4px;
+                padding: 8px;
+                background-color: #F8F9FA;
+                color: #666666;
+            }
+        """)
+        paste_layout.addWidget(self.paste_preview)
+        paste_info_layout = QHBoxLayout()
+        self.paste_summary_label = QLabel()
+        self.paste_summary_label.setStyleSheet('color: #666666;')
+        clear_paste_btn = SimpleButton('清除')
+        clear_paste_btn.setFixedWidth(90)
+        clear_paste_btn.clicked.connect(self.clear_pasted)
+        paste_info_layout.addWidget(self.paste_summary_label)
+        paste_info_layout.addStretch()
+        paste_info_layout.addWidget(clear_paste_btn)
+        paste_layout.addLayout(paste_info_layout)
+        self.paste_panel.hide()
+        file_layout.addWidget(self.paste_panel)
+        
+        top_layout.addWidget(file_frame)
+        
+        # 域名匹配区域
+        domain_frame = QFrame()
+        domain_layout = QVBoxLayout(domain_frame)
+        domain_layout.setSpacing(8)
+        domain_layout.setContentsMargins(0, 0, 0, 0)
+        
+        domain_label = QLabel('域名匹配')
+        domain_label.setStyleSheet('font-size: 14px; color: #333333;')
+        domain_layout.addWidget(domain_label)
+        
+        # 域名输入和匹配按钮布局
+        input_layout = QHBoxLayout()
+        input_layout.setSpacing(8)
+        
+        self.domain_input = SimpleLineEdit('输入要匹配的域名（例如：twitter）或查询条件（例如：domain:twitter|x.com secure:true）')
+        match_btn = SimpleButton('提取Cookie')
+        match_btn.setFixedWidth(90)
+        match_btn.clicked.connect(self.extract_cookies)
+        
+        # 输入域名时自动提取，停止输入一段时间后才触发
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._live_search)
+        self.domain_input.textChanged.connect(self._on_domain_edited)
+        self.domain_input.returnPressed.connect(self.extract_cookies)
+        
+        input_layout.addWidget(self.domain_input)
+        input_layout.addWidget(match_btn)
+        domain_layout.addLayout(input_layout)
+        
+        top_layout.addWidget(domain_frame)
+        main_layout.addLayout(top_layout)
+        
+        # 匹配结果区域
+        result_frame = QFrame()
+        result_layout = QVBoxLayout(result_frame)
+        result_layout.setSpacing(8)
+        result_layout.setContentsMargins(0, 0, 0, 0)
+        
+        result_header = QHBoxLayout()
+        result_label = QLabel('匹配结果')
+        result_label.setStyleSheet('font-size: 14px; color: #333333;')
+        
+        # 添加匹配结果数量显示
+        self.result_count_label = QLabel('0 个结果')
+        self.result_count_label.setStyleSheet("""
+            QLabel {
+                color: #666666;
+                padding: 4px 8px;
+                background-color: #F5F5F5;
+                border-radius: 4px;
+                font-size: 12px;
+            }
+        """)
+        
+        # 后台任务进度和取消按钮，仅在任务运行时显示
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFixedWidth(200)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: 1px solid #E0E0E0;
+                border-radius: 4px;
+                background-color: #F5F5F5;
+                color: #333333;
+                font-size: 12px;
+                text-align: center;
+            }
+            QProgressBar::chunk {
+                background-color: #4A90E2;
+                border-radius: 4px;
+            }
+        """)
+        self.progress_bar.hide()
+        
+        self.cancel_btn = SimpleButton('取消')
+        self.cancel_btn.setFixedWidth(90)
+        self.cancel_btn.clicked.connect(self.cancel_task)
+        self.cancel_btn.hide()
+        
+        save_btn = SimpleButton('保存结果')
+        save_btn.setFixedWidth(90)
+        save_btn.clicked.connect(self.save_results)
+        
+        split_btn = SimpleButton('按域名拆分')
+        split_btn.setFixedWidth(100)
+        split_btn.setToolTip('把每个可注册域名（例如 google.co.uk）的Cookie分别保存为一个文件，'
+                             '已填写匹配条件时只拆分匹配的Cookie')
+        split_btn.clicked.connect(self.split_by_domain)
+        
+        self.diff_btn = SimpleButton('对比快照')
+        self.diff_btn.setFixedWidth(100)
+        self.diff_btn.setToolTip('选择同一浏览器先后导出的两个文件，列出新增、删除以及值或过期时间改变的Cookie，'
+                                 '已填写匹配条件时只对比匹配的Cookie')
+        self.diff_btn.clicked.connect(self.toggle_diff)
+        
+        result_header.addWidget(result_label)
+        result_header.addWidget(self.result_count_label)
+        result_header.addStretch()
+        result_header.addWidget(self.progress_bar)
+        result_header.addWidget(self.cancel_btn)
+        result_header.addWidget(self.diff_btn)
+        result_header.addWidget(split_btn)
+        result_header.addWidget(save_btn)
+        result_layout.addLayout(result_header)
+        
+        # 添加表格说明标签
+        table_info = QLabel('提示：表格显示了所有匹配的 Cookie 信息，包括域名、名称、值、过期时间等属性。可以通过点击列标题进行排序。')
+        table_info.setStyleSheet("""
+            QLabel {
+                color: #666666;
+                font-size: 12px;
+                padding: 4px 0;
+            }
+        """)
+        result_layout.addWidget(table_info)
+        
+        # 结果表格
+        self.result_model = CookieTableModel(self)
+        self.result_table = SimpleTable()
+        self.result_table.setModel(self.result_model)
+        # 点击表头时由模型按类型化的排序键排序，初始保持原始顺序
+        self.result_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.result_table.setSortingEnabled(True)
+        result_layout.addWidget(self.result_table)
+        
+        # 设置表格列宽
+        header = self.result_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)  # 域名
+        header.setSectionResizeMode(1, QHeaderView.Interactive)  # 名称
+        header.setSectionResizeMode(2, QHeaderView.Interactive)  # 值 - 改为Interactive以确保显示
+        header.setSectionResizeMode(3, QHeaderView.Interactive)  # 过期时间
+        header.setSectionResizeMode(4, QHeaderView.Interactive)  # HttpOnly
+        header.setSectionResizeMode(5, QHeaderView.Interactive)  # 路径
+        header.setSectionResizeMode(6, QHeaderView.Interactive)  # SameSite
+        header.setSectionResizeMode(7, QHeaderView.Interactive)  # Secure
+        header.setSectionResizeMode(8, QHeaderView.Interactive)  # ID
+        
+        # 设置默认列宽
+        self.result_table.setColumnWidth(0, 150)  # 域名
+        self.result_table.setColumnWidth(1, 150)  # 名称
+        self.result_table.setColumnWidth(2, 250)  # 值 - 设置更大的默认宽度
+        self.result_table.setColumnWidth(3, 150)  # 过期时间
+        self.result_table.setColumnWidth(4, 80)   # HttpOnly
+        self.result_table.setColumnWidth(5, 80)   # 路径
+        self.result_table.setColumnWidth(6, 100)  # SameSite
+        self.result_table.setColumnWidth(7, 80)   # Secure
+        self.result_table.setColumnWidth(8, 60)   # ID
+        
+        main_layout.addWidget(result_frame, stretch=1)
+
+        # 状态栏显示最近一次操作的各阶段耗时
+        self.trace_label = QLabel()
+        self.trace_label.setStyleSheet("QLabel { color: #666666; font-size: 12px; }")
+        self.statusBar().addPermanentWidget(self.trace_label, 1)
+
+        # 设置窗口图标
+        for icon_name in ['icons.ico', 'icons.png']:
+            icon_path = resource_path(icon_name)
+            if os.path.exists(icon_path):
+                self.setWindowIcon(QIcon(icon_path))
+                break
+        
+    def import_file(self):
+        """导入文件，可以同时选择多个文件"""
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "选择Cookie文件", "", OPEN_FILTER)
+        
+        if file_paths:
+            self.load_files(file_paths)
+    
+    def load_files(self, file_paths: List[str]):
+        """读取一个或多个文件；多个文件并行读取后去重合并为一份数据"""
+        if len(file_paths) == 1:
+            self.load_file(file_paths[0])
+            return
+        self.stop_watch()
+        self.stop_diff()
+        domain_pattern = self.domain_input.text().strip()
+        self._loading_paths = file_paths
+        self._loading_pattern = domain_pattern
+        self._extract_after_load = False
+        self._start_task(merge_files, file_paths, domain_pattern,
+                         self.merge_rule_combo.currentData(), operation='merge',
+                         on_result=self._on_files_merged, error_prefix='读取文件时出错',
+                         on_partial=self._on_partial_results)
+        if domain_pattern:
+            self.display_results([])
+    
+    def load_file(self, file_path: str):
+        """在后台流式读取并解析文件（打开过的文件直接读取缓存），供之后的提取重复使用
+
+        文件内容不再写入输入框，已填写域名时匹配的Cookie会在读取过程中逐批显示；
+        浏览器数据库只读出与已填写的域名匹配的行，条件放宽时重新读取。
+        """
+        self.stop_watch()
+        self.stop_diff()
+        domain_pattern = self.domain_input.text().strip()
+        self._loading_path = file_path
+        self._loading_pattern = domain_pattern
+        self._extract_after_load = False
+        self._start_task(load_for_query, file_path, domain_pattern, operation='load',
+                         on_result=self._on_file_loaded, error_prefix='读取文件时出错',
+                         on_partial=self._on_partial_results)
+        if domain_pattern:
+            self.display_results([])
+    
+    def load_pasted(self, data: bytes):
+        """大段粘贴内容：输入框换成只读预览，原始字节直接交给后台解析"""
+        self.stop_watch()
+        self.stop_diff()
+        self._paste_size = len(data)
+        preview = data[:PASTE_PREVIEW_CHARS * 4].decode('utf-8', 'replace')[:PASTE_PREVIEW_CHARS]
+        self.paste_preview.setPlainText(preview + '\n……（内容过长，仅显示开头部分）')
+        self.paste_summary_label.setText(f'已粘贴 {format_size(len(data))}，正在解析')
+        self.cookie_text.hide()
+        self.paste_panel.show()
+        
+        domain_pattern = self.domain_input.text().strip()
+        self._loading_pattern = domain_pattern
+        self._extract_after_load = False
+        self._start_task(load_cookie_buffer, data, PASTE_SOURCE, domain_pattern, operation='paste',
+                         on_result=self._on_paste_loaded, error_prefix='解析粘贴内容时出错',
+                         on_partial=self._on_partial_results)
+        if domain_pattern:
+            self.display_results([])
+    
+    def _on_paste_loaded(self, store: CookieStore):
+        """粘贴内容解析完成"""
+        if not self._is_current_task():
+            return
+        self.paste_summary_label.setText(
+            f'已粘贴 {format_size(self._paste_size)}，共 {len(store)} 个Cookie')
+        self._use_loaded_store(store)
+    
+    def clear_pasted(self):
+        """清除大段粘贴内容，恢复输入框"""
+        if self._worker is not None and self._worker.fn is load_cookie_buffer:
+            self.cancel_task()
+        if self.cookie_store is not None and self.cookie_store.source == PASTE_SOURCE:
+            self.cookie_store = None
+            self._store_dirty = True
+        self._hide_paste_panel()
+    
+    def _hide_paste_panel(self):
+        if self.paste_panel.isHidden():
+            return
+        self.paste_panel.hide()
+        self.paste_preview.clear()
+        self.cookie_text.show()
+    
+    def _is_loading(self) -> bool:
+        return self._worker is not None and self._worker.fn in (load_for_query, load_cookie_buffer,
+                                                                merge_files, diff_files)
+    
+    def _on_partial_results(self, cookies):
+        """流式加载过程中追加已匹配的Cookie"""
+        if not self._is_current_task():
+            return
+        self.result_model.append_cookies(cookies)
+        self.result_count_label.setText(f'已匹配 {self.result_model.rowCount()} 个结果')
+    
+    def _on_file_loaded(self, store: CookieStore):
+        """文件读取完成"""
+        if not self._is_current_task():
+            return
+        name = Path(self._loading_path).name
+        self.file_path_label.setText(name)
+        if store.prefilter:
+            self._show_loaded_files(f'已加载文件 {name}，按匹配条件读取了 {len(store)} 个Cookie')
+        else:
+            self._show_loaded_files(f'已加载文件 {name}，共 {len(store)} 个Cookie')
+        self._use_loaded_store(store)
+    
+    def _on_files_merged(self, result):
+        """多个文件读取并合并完成"""
+        if not self._is_current_task():
+            return
+        store, duplicates = result
+        count = len(self._loading_paths)
+        self.file_path_label.setText(f'已合并 {count} 个文件，去除重复Cookie {duplicates} 个')
+        self._show_loaded_files(f'已合并 {count} 个文件，共 {len(store)} 个Cookie')
+        self._use_loaded_store(store)
+    
+    def _show_loaded_files(self, message: str):
+        """清空输入框，在提示文字中显示已加载的文件"""
+        # 程序清空输入框不应使刚解析的数据失效
+        self.cookie_text.blockSignals(True)
+        try:
+            self.cookie_text.clear()
+        finally:
+            self.cookie_text.blockSignals(False)
+        self.cookie_text.setPlaceholderText(f'{message}；也可在此粘贴Cookie文本或拖放文件')
+        self._hide_paste_panel()
+    
+    def _use_loaded_store(self, store: CookieStore):
+        """使用后台加载的解析结果，加载期间修改了匹配条件时重新提取"""
+        self.cookie_store = store
+        self._store_dirty = False
+        self._result_query = self._loading_pattern or None
+        if self._loading_pattern:
+            self.result_count_label.setText(f'共 {self.result_model.rowCount()} 个结果')
+        if self._extract_after_load:
+            # 加载期间修改了匹配条件，加载完成后重新提取
+            self._extract_after_load = False
+            self._worker = None
+            self._extract(quiet=True)
+    
+    def _invalidate_store(self):
+        """输入框内容变化时标记已解析数据失效"""
+        self._store_dirty = True
+        self._text_revision += 1
+    
+    def _start_task(self, fn, *args, on_result, on_partial=None, error_prefix='处理过程中出错',
+                    quiet=False, operation='task'):
+        """在线程池中启动后台任务，同一时间只运行一个任务
+
+        on_partial接收阶段性结果，在任务启动前连接，不会漏掉很快就发出的结果。
+        quiet为True时出错只显示在结果数量标签中，不弹出对话框。
+        operation为耗时统计中的操作名称，见cookie_trace.OPERATION_LABELS。
+        """
+        self.cancel_task()
+        worker = Worker(fn, *args, error_prefix=error_prefix, operation=operation)
+        worker.quiet = quiet
+        worker.signals.progress.connect(self._on_task_progress)
+        worker.signals.result.connect(on_result)
+        if on_partial is not None:
+            worker.signals.partial.connect(on_partial)
+        worker.signals.error.connect(self._on_task_error)
+        worker.signals.finished.connect(self._on_task_finished)
+        worker.signals.finished.connect(self._on_any_task_finished)
+        self._running_tasks.add(worker.signals)
+        self._worker = worker
+        
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat('%p%')
+        self.progress_bar.show()
+        self.cancel_btn.show()
+        QThreadPool.globalInstance().start(worker)
+    
+    def _is_current_task(self) -> bool:
+        """信号是否来自当前任务，已取消任务的迟到信号直接忽略"""
+        return self._worker is not None and self.sender() is self._worker.signals
+    
+    def cancel_task(self):
+        """取消当前后台任务"""
+        if self._worker is not None:
+            if self._worker.fn is load_cookie_buffer:
+                self.paste_summary_label.setText(f'已粘贴 {format_size(self._paste_size)}，解析已取消')
+            self._worker.cancel()
+            self._worker = None
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+    
+    def _on_task_progress(self, percent: int, message: str):
+        if not self._is_current_task():
+            return
+        self.progress_bar.setValue(percent)
+        self.progress_bar.setFormat(f'{message} %p%' if message else '%p%')
+    
+    def _on_task_error(self, error: Exception):
+        if not self._is_current_task():
+            return
+        if isinstance(error, json.JSONDecodeError):
+            message = "Cookie文本格式错误"
+        else:
+            message = f"{self._worker.error_prefix}：{str(error)}"
+        if self._worker.fn is load_cookie_buffer:
+            self.paste_summary_label.setText(f'已粘贴 {format_size(self._paste_size)}，{message}')
+        if self._worker.quiet:
+            self.result_count_label.setText(message)
+        else:
+            QMessageBox.warning(self, "错误", message)
+    
+    def _on_task_finished(self):
+        if not self._is_current_task():
+            return
+        self._show_trace(self._worker.task.trace)
+        self._worker = None
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+
+    def _on_any_task_finished(self):
+        """前台任务（包括已取消的）结束，全部结束后合并等待中的监视结果"""
+        self._running_tasks.discard(self.sender())
+        if not self._running_tasks and self._pending_watch is not None:
+            pending, self._pending_watch = self._pending_watch, None
+            self._apply_watch(*pending)
+            if self._watch_rescan and self._watch_worker is None:
+                self._watch_rescan = False
+                self._scan_watch()
+    
+    def _show_trace(self, trace: OperationTrace):
+        """结束操作的耗时统计并显示在状态栏"""
+        self.trace_label.setText(trace.finish().summary())
+    
+    def toggle_watch(self):
+        """开始或停止监视文件夹"""
+        if self._folder_watch is not None:
+            self.stop_watch()
+            return
+        directory = QFileDialog.getExistingDirectory(self, "选择要监视的文件夹")
+        if directory:
+            self.start_watch(directory)
+    
+    def start_watch(self, directory: str):
+        """监视文件夹，新增或变化的Cookie文件在后台导入并合并到当前数据"""
+        self.stop_watch()
+        self.stop_diff()
+        self.cancel_task()
+        watch = FolderWatch(directory)
+        self._folder_watch = watch
+        self.cookie_store = watch.store
+        self._store_dirty = False
+        self._hide_paste_panel()
+        self.cookie_text.blockSignals(True)
+        try:
+            self.cookie_text.clear()
+        finally:
+            self.cookie_text.blockSignals(False)
+        # 已填写匹配条件时，导入过程中逐步显示匹配结果
+        self._result_query = self.domain_input.text().strip() or None
+        self.display_results([])
+        self._fs_watcher.addPath(watch.directory)
+        self._watch_poll_timer.start()
+        self.watch_btn.setText('停止监视')
+        self._update_watch_label()
+        self._scan_watch()
+    
+    def stop_watch(self):
+        """停止监视，已导入的数据保留"""
+        watch = self._folder_watch
+        if watch is None:
+            return
+        self._folder_watch = None
+        self._pending_watch = None
+        self._watch_rescan = False
+        if self._watch_worker is not None:
+            self._watch_worker.cancel()
+            self._watch_worker = None
+        if self._fs_watcher.directories():
+            self._fs_watcher.removePaths(self._fs_watcher.directories())
+        self._watch_timer.stop()
+        self._watch_poll_timer.stop()
+        self.watch_btn.setText('监视文件夹')
+        self.file_path_label.setText(f'已停止监视 {Path(watch.directory).name}')
+    
+    def _schedule_watch_scan(self, _=None):
+        """文件夹内容变化，稍后扫描"""
+        if self._folder_watch is not None:
+            self._watch_timer.start()
+    
+    def _scan_watch(self):
+        """在后台扫描并解析变化的文件，同一时间只运行一次扫描"""
+        watch = self._folder_watch
+        if watch is None:
+            return
+        if self._watch_worker is not None or self._pending_watch is not None:
+            # 等待中的结果合并之前不扫描，否则这些文件的版本还没记录，会被再次解析
+            self._watch_rescan = True
+            return
+        worker = Worker(watch.collect, error_prefix='监视文件夹时出错', operation='watch')
+        worker.signals.result.connect(self._on_watch_collected)
+        worker.signals.error.connect(self._on_watch_error)
+        worker.signals.finished.connect(self._on_watch_finished)
+        self._watch_worker = worker
+        QThreadPool.globalInstance().start(worker)
+    
+    def _on_watch_collected(self, result):
+        if self._watch_worker is None or self.sender() is not self._watch_worker.signals:
+            return
+        loaded, removed = result
+        if not loaded and not removed:
+            return
+        if self._running_tasks:
+            # 提取、拆分、保存等任务可能正在读取数据，全部结束后再合并
+            if self._pending_watch is not None:
+                loaded = self._pending_watch[0] + loaded
+                removed = self._pending_watch[1] + removed
+            self._pending_watch = (loaded, removed)
+            return
+        self._apply_watch(loaded, removed)
+    
+    def _apply_watch(self, loaded, removed):
+        """合并变化的文件，并只对新增和移除的Cookie更新结果表格"""
+        watch = self._folder_watch
+        if watch is None:
+            return
+        added, dropped = watch.merge(loaded, removed)
+        if self.cookie_store is not watch.store:
+            # 已改用其他数据，结果表格不再对应监视的文件夹
+            self._update_watch_label()
+            return
+        self._store_dirty = False
+        if self._result_query is not None:
+            self.result_model.remove_cookies(dropped)
+            self.result_model.append_cookies(watch.store.filter_rows(self._result_query, added))
+            self.result_count_label.setText(f'共 {self.result_model.rowCount()} 个结果')
+        self._update_watch_label()
+    
+    def _on_watch_error(self, error: Exception):
+        if self._watch_worker is None or self.sender() is not self._watch_worker.signals:
+            return
+        self.file_path_label.setText(f'{self._watch_worker.error_prefix}：{error}')
+    
+    def _on_watch_finished(self):
+        if self._watch_worker is None or self.sender() is not self._watch_worker.signals:
+            return
+        trace = self._watch_worker.task.trace
+        self._watch_worker = None
+        if trace.stages:
+            # 没有变化的文件时不更新统计
+            self._show_trace(trace)
+        if self._watch_rescan:
+            self._watch_rescan = False
+            self._scan_watch()
+    
+    def _update_watch_label(self):
+        watch = self._folder_watch
+        if watch is None:
+            return
+        text = (f'正在监视 {Path(watch.directory).name}：{watch.file_count} 个文件，'
+                f'共 {len(watch.store)} 个Cookie')
+        if watch.errors:
+            text += f'，{len(watch.errors)} 个文件无法解析'
+        self.file_path_label.setText(text)
+    
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        """处理拖入事件"""
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+    
+    def dropEvent(self, event: QDropEvent):
+        """处理文件拖放，同时拖入多个文件时合并读取"""
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            self.load_files(paths)
+    
+    def extract_cookies(self):
+        """在后台提取Cookie"""
+        self._search_timer.stop()
+        self._extract(quiet=False)
+    
+    def _on_domain_edited(self, _):
+        """域名输入变化时取消过时的查询，并重新开始计时"""
+        if self._worker is not None and self._worker.fn is extract_from:
+            self.cancel_task()
+        self._search_timer.start()
+    
+    def _live_search(self):
+        """停止输入后自动提取"""
+        self._extract(quiet=True)
+    
+    def _extract(self, quiet: bool):
+        """按当前输入在后台提取Cookie，quiet为True时输入不完整也不弹出提示"""
+        if self._is_loading():
+            # 文件还在加载，加载完成后再按当前条件提取
+            self._extract_after_load = True
+            return
+        
+        if self.result_model.diff_mode:
+            if self._diff_stores is not None:
+                self._rediff(quiet)
+            return
+        
+        ready, text = self._text_to_parse(quiet)
+        if not ready:
+            return
+        
+        # 获取域名匹配模式
+        domain_pattern = self.domain_input.text().strip()
+        if not domain_pattern:
+            if quiet:
+                self.result_count_label.setText(f'共 {self.result_model.rowCount()} 个结果')
+            else:
+                QMessageBox.warning(self, "警告", "请输入要匹配的域名")
+            return
+        if quiet:
+            # 正则或查询条件还没输入完整时不提取
+            try:
+                CookieQuery.parse(domain_pattern)
+            except UnsafeRegex as e:
+                # 正则完整但被拒绝，继续输入也不会自动变好，需要显示原因
+                self.result_count_label.setText(str(e))
+                return
+            except (re.error, ValueError):
+                self.result_count_label.setText('查询条件不完整')
+                return
+        
+        if text is None and not self.cookie_store.covers(domain_pattern):
+            # 数据库只读出了与之前的条件匹配的行，条件放宽后重新读取
+            self.load_file(self.cookie_store.source)
+            return
+        
+        self._extract_revision = self._text_revision
+        self._extract_pattern = domain_pattern
+        self._start_task(extract_from, self.cookie_store, text, domain_pattern, operation='extract',
+                         on_result=self._on_extract_finished, quiet=quiet)
+    
+    def _text_to_parse(self, quiet: bool):
+        """返回(是否有数据可用, 需要重新解析的文本)，已解析的数据仍然有效时文本为None"""
+        # 输入框内容改变后才需要取出文本重新解析
+        if self.cookie_store is None or self._store_dirty:
+            text = self.cookie_text.toPlainText().strip()
+            if text:
+                return True, text
+            if self.cookie_store is None or not self.cookie_store.source:
+                if not quiet:
+                    QMessageBox.warning(self, "警告", "请输入Cookie文本")
+                return False, None
+            # 输入框为空时继续使用已加载的文件
+        return True, None
+    
+    def _on_extract_finished(self, result):
+        """提取完成，保存解析结果并显示匹配的Cookie"""
+        if not self._is_current_task():
+            return
+        store, cookies = result
+        self.cookie_store = store
+        self._result_query = self._extract_pattern
+        # 后台处理期间文本又被编辑过则仍需重新解析
+        self._store_dirty = self._text_revision != self._extract_revision
+        self.display_results(cookies)
+    
+    def display_results(self, cookies: List[Dict[str, Any]]):
+        """显示结果到表格"""
+        # 后台任务的结果计入该任务的显示阶段
+        with traced(self._worker.task if self._worker is not None else None,
+                    'display') as stage:
+            self.result_model.set_cookies(cookies)
+            stage.rows = len(cookies)
+        
+        # 更新匹配结果数量
+        self.result_count_label.setText(f'共 {len(cookies)} 个结果')
+    
+    def save_results(self):
+        """在后台保存结果到文件"""
+        if not self.result_model.rowCount():
+            QMessageBox.warning(self, "警告", "没有可保存的结果")
+            return
+        
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "保存结果",
+            "",
+            ";;".join(name for name, _ in SAVE_FILTERS)
+        )
+        
+        if file_path:
+            # 未输入扩展名时按所选文件类型补全
+            if not file_path.lower().endswith(('.json', '.ndjson', '.jsonl', '.gz')):
+                file_path += dict(SAVE_FILTERS).get(selected_filter, '.json')
+            # 直接写出匹配到的原始Cookie记录
+            self._start_task(save_cookies, file_path, self.result_model.cookies(), operation='save',
+                             on_result=self._on_results_saved, error_prefix='保存文件时出错')
+    
+    def split_by_domain(self):
+        """在后台把Cookie按可注册域名拆分保存到所选文件夹，已填写匹配条件时只拆分匹配的Cookie"""
+        if self.result_model.diff_mode:
+            QMessageBox.warning(self, "警告", "请先退出对比快照再拆分")
+            return
+        if self._is_loading():
+            QMessageBox.warning(self, "警告", "文件还在读取，请稍后再拆分")
+            return
+        ready, text = self._text_to_parse(quiet=False)
+        if not ready:
+            return
+        query = self.domain_input.text().strip()
+        try:
+            CookieQuery.parse(query)
+        except (re.error, ValueError) as e:
+            QMessageBox.warning(self, "警告", f"匹配条件有误：{e}")
+            return
+        if text is None and not self.cookie_store.covers(query):
+            self.load_file(self.cookie_store.source)
+            QMessageBox.information(self, "提示", "数据库只读取了与之前的条件匹配的Cookie，"
+                                                "正在按当前条件重新读取，完成后请再拆分")
+            return
+        
+        directory = QFileDialog.getExistingDirectory(self, "选择保存拆分结果的文件夹")
+        if directory:
+            self._extract_revision = self._text_revision
+            self._start_task(split_from, self.cookie_store, text, query, directory,
+                             operation='split', on_result=self._on_split_finished,
+                             error_prefix='拆分时出错')
+    
+    def _on_split_finished(self, result):
+        if not self._is_current_task():
+            return
+        store, written = result
+        if store is not self.cookie_store:
+            self.cookie_store = store
+            self._store_dirty = self._text_revision != self._extract_revision
+        QMessageBox.information(self, "成功", f"已按域名拆分为 {len(written)} 个文件，"
+                                             f"共 {sum(count for _, _, count in written)} 个Cookie")
+    
+    def toggle_diff(self):
+        """选择较早和较新的两份快照开始对比，对比时再次点击退出"""
+        if self.result_model.diff_mode:
+            self.stop_diff()
+            self._extract(quiet=True)
+            return
+        old_path, _ = QFileDialog.getOpenFileName(self, "选择较早的快照", "", OPEN_FILTER)
+        if not old_path:
+            return
+        new_path, _ = QFileDialog.getOpenFileName(self, "选择较新的快照",
+                                                  os.path.dirname(old_path), OPEN_FILTER)
+        if new_path:
+            self.start_diff(old_path, new_path)
+    
+    def start_diff(self, old_path: str, new_path: str):
+        """在后台读取两份快照并对比，差异行逐批显示；之后修改匹配条件时重新对比"""
+        query = self.domain_input.text().strip()
+        try:
+            CookieQuery.parse(query)
+        except (re.error, ValueError) as e:
+            QMessageBox.warning(self, "警告", f"匹配条件有误：{e}")
+            return
+        self.stop_watch()
+        self._diff_stores = None
+        self._extract_after_load = False
+        self.result_model.set_diff_mode(True)
+        self.diff_btn.setText('退出对比')
+        self.file_path_label.setText(f'对比 {Path(old_path).name} → {Path(new_path).name}')
+        self._start_task(diff_files, old_path, new_path, query, operation='diff',
+                         on_result=self._on_diff_loaded, error_prefix='对比时出错',
+                         on_partial=self._on_partial_results)
+        self.display_results([])
+    
+    def _rediff(self, quiet: bool):
+        """按当前匹配条件重新对比已读取的两份快照"""
+        query = self.domain_input.text().strip()
+        try:
+            CookieQuery.parse(query)
+        except (re.error, ValueError) as e:
+            if quiet:
+                self.result_count_label.setText(
+                    str(e) if isinstance(e, UnsafeRegex) else '查询条件不完整')
+            else:
+                QMessageBox.warning(self, "警告", f"匹配条件有误：{e}")
+            return
+        self._start_task(diff_stores, *self._diff_stores, query, operation='diff',
+                         on_result=self._on_diff_finished, error_prefix='对比时出错', quiet=quiet,
+                         on_partial=self._on_partial_results)
+        self.display_results([])
+    
+    def _on_diff_loaded(self, result):
+        """两份快照读取并对比完成，读取期间修改了匹配条件时重新对比"""
+        if not self._is_current_task():
+            return
+        old, new, rows, counts = result
+        self._diff_stores = (old, new)
+        self._show_diff_counts(rows, counts)
+        if self._extract_after_load:
+            self._extract_after_load = False
+            self._worker = None
+            self._extract(quiet=True)
+    
+    def _on_diff_finished(self, result):
+        if not self._is_current_task():
+            return
+        self._show_diff_counts(*result)
+    
+    def _show_diff_counts(self, rows, counts):
+        # 差异行已在对比过程中逐批显示
+        self.result_count_label.setText(f'共 {len(rows)} 处差异：{diff_summary(counts)}')
+    
+    def stop_diff(self):
+        """退出对比快照，恢复普通的结果表格"""
+        if not self.result_model.diff_mode:
+            return
+        if self._worker is not None and self._worker.fn in (diff_files, diff_stores):
+            self.cancel_task()
+        self._diff_stores = None
+        self.result_model.set_diff_mode(False)
+        self.diff_btn.setText('对比快照')
+        self.file_path_label.setText('已退出对比快照')
+        self.result_count_label.setText('共 0 个结果')
+    
+    def _on_results_saved(self, _):
+        if not self._is_current_task():
+            return
+        QMessageBox.information(self, "成功", "结果已保存")
+    
+    def closeEvent(self, event):
+        """关闭窗口时取消后台任务"""
+        self.stop_watch()
+        self.cancel_task()
+        super().closeEvent(event)
+
+def _write_startup_probe(output_path: str, started: Optional[float]):
+    """写出启动耗时并退出"""
+    now = time.perf_counter()
+    timings = {
+        'qt_import': QT_IMPORT_SECONDS,
+        'first_window': now - started if started is not None else None,
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(timings, f)
+    QApplication.quit()
+
+def run_gui(started: Optional[float] = None, shown=None) -> int:
+    """启动图形界面，started为进程入口记录的perf_counter时间，shown在窗口显示后调用"""
+    app = QApplication(sys.argv)
+    
+    # 设置应用程序样式
+    app.setStyle('Fusion')
+    
+    # 设置全局字体
+    font = QFont('Microsoft YaHei', 10)
+    app.setFont(font)
+    
+    window = CookieExtractorGUI()
+    window.show()
+    if shown is not None:
+        shown()
+    
+    probe_path = os.environ.get(STARTUP_PROBE_ENV)
+    if probe_path:
+        # 事件循环处理完首次显示后再记录
+        QTimer.singleShot(0, lambda: _write_startup_probe(probe_path, started))
+    return app.exec()
@@ -0,0 +1,227 @@
+"""域名模式的匹配器
+
+输入先按形式分类，只有真正的正则才交给正则引擎：
+
+- 纯域名文本（如twitter）：不区分大小写的子串匹配
+- 以'.'开头的纯域名（如.google.com）：该域名及其所有子域名
+- 含*或?的通配符（如*.google.com、*google*）：匹配整个域名，常见形式化为前缀、后缀或子串判断；
+  含有'.*'或'.?'的输入（如.*google）是正则的惯用写法，仍按正则处理
+- 其余输入按正则搜索
+
+编译结果缓存在有上限的LRU中。Python的re在一次匹配中途无法打断，因此正则先做静态检查，
+拒绝嵌套的重复、重复中的重叠分支、过多的无界重复等可能导致灾难性回溯的写法，
+并且只匹配不超过MAX_REGEX_INPUT个字符的域名，单次匹配的耗时因此有上限；
+匹配时累计耗时，超过REGEX_TIME_BUDGET就抛出RegexTimeout停止查询。
+"""
+import re
+import time
+import fnmatch
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python 3.10及以前
+    import sre_parse
+
+# 缓存的已编译模式数
+PATTERN_CACHE_SIZE = 256
+# 一次查询中正则匹配的累计耗时上限（秒）
+REGEX_TIME_BUDGET = 2.0
+# 重复上限不小于此值的有界重复（如.{0,200}）与.*一样计为无界重复
+LARGE_REPEAT = 100
+# 一个正则中无界重复（如.*、\w+）的最多个数，每多一个，失败的匹配耗时就多乘一个域名长度
+MAX_UNBOUNDED_REPEATS = 3
+# 正则只匹配不超过此长度的域名（DNS域名最长253个字符），
+# 通过检查的正则单次匹配的耗时因此有上限，不会在累计耗时检查之前卡住
+MAX_REGEX_INPUT = 255
+
+KIND_SUBSTRING = 'substring'
+KIND_SUFFIX = 'suffix'
+KIND_GLOB = 'glob'
+KIND_REGEX = 'regex'
+
+# 只包含域名字符的输入按字面匹配；另含*或?的按通配符匹配
+_LITERAL_DOMAIN = re.compile(r'[\w\-.]+')
+_GLOB_DOMAIN = re.compile(r'[\w\-.*?]*[*?][\w\-.*?]*')
+
+class RegexTimeout(ValueError):
+    """正则匹配的累计耗时超过上限"""
+
+class UnsafeRegex(ValueError):
+    """正则能编译，但可能导致灾难性回溯而被拒绝"""
+
+def pattern_kind(domain_pattern: str) -> str:
+    """模式的类型：KIND_SUBSTRING、KIND_SUFFIX、KIND_GLOB或KIND_REGEX"""
+    if _LITERAL_DOMAIN.fullmatch(domain_pattern):
+        if domain_pattern.startswith('.') and domain_pattern.strip('.'):
+            return KIND_SUFFIX
+        return KIND_SUBSTRING
+    if (_GLOB_DOMAIN.fullmatch(domain_pattern)
+            and '.*' not in domain_pattern and '.?' not in domain_pattern):
+        return KIND_GLOB
+    return KIND_REGEX
+
+def literal_suffix(domain_pattern: str) -> Optional[str]:
+    """匹配的域名都以此域名结尾（或等于它）时返回该域名，用于按后缀树查找候选
+
+    .google.com和*.google.com都返回google.com。
+    """
+    kind = pattern_kind(domain_pattern)
+    if kind == KIND_SUFFIX:
+        return domain_pattern.strip('.').lower()
+    if kind == KIND_GLOB and domain_pattern.startswith('*.'):
+        rest = domain_pattern[2:]
+        if _LITERAL_DOMAIN.fullmatch(rest) and rest.strip('.'):
+            return rest.strip('.').lower()
+    return None
+
+# 重复节点的操作码，独占（possessive）重复不回溯，不在其列
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+_ATOMIC = getattr(sre_parse, 'ATOMIC_GROUP', None)
+_POSSESSIVE = getattr(sre_parse, 'POSSESSIVE_REPEAT', None)
+
+def _first_chars(items) -> Optional[set]:
+    """分支可能的第一个字符（小写），无法确定时返回None"""
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            return {chr(av).lower()}
+        if op is sre_parse.SUBPATTERN:
+            return _first_chars(av[3])
+        return None
+    return None
+
+def _disjoint(branches) -> bool:
+    """各分支的第一个字符是否两两不同，不同时每次重复最多只有一个分支能继续"""
+    seen = set()
+    for branch in branches:
+        chars = _first_chars(branch)
+        if chars is None or chars & seen:
+            return False
+        seen |= chars
+    return True
+
+def _screen(items, repeated: bool) -> int:
+    """检查可能导致灾难性回溯的结构，返回其中可回溯的无界重复个数
+
+    repeated表示这些节点位于上限大于1的重复之中。重复之中不允许再有重复、可能重叠的分支，
+    重复的内容也不能匹配空串，无论重复次数多少：这些写法的回溯次数随域名长度指数增长。
+    """
+    unbounded = 0
+    for op, av in items:
+        if op in _REPEATS:
+            low, high, body = av
+            if high > 1:
+                if repeated:
+                    raise ValueError('正则含有嵌套的重复（如(a+)+），可能导致匹配时间失控，'
+                                     '请改写或使用通配符')
+                if body.getwidth()[0] == 0:
+                    raise ValueError('正则含有可以匹配空串的重复（如(a?)+），可能导致匹配时间失控，'
+                                     '请改写或使用通配符')
+                large = high == sre_parse.MAXREPEAT or high >= LARGE_REPEAT
+                unbounded += large + _screen(body, True)
+            else:
+                unbounded += _screen(body, repeated)
+        elif op is sre_parse.SUBPATTERN:
+            unbounded += _screen(av[3], repeated)
+        elif op is sre_parse.BRANCH:
+            if repeated and not _disjoint(av[1]):
+                raise ValueError('正则在重复中含有可能重叠的分支（如(a|ab)*），'
+                                 '可能导致匹配时间失控，请改写或使用通配符')
+            unbounded += max(_screen(branch, repeated) for branch in av[1])
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            unbounded += _screen(av[1], repeated)
+        elif op is _ATOMIC or op is _POSSESSIVE:
+            # 原子组和独占重复匹配后不再回溯
+            _screen(av if op is _ATOMIC else av[2], False)
+    return unbounded
+
+def check_regex(domain_pattern: str):
+    """检查正则能否编译、是否可能导致灾难性回溯
+
+    无法编译时抛出ValueError，可能导致灾难性回溯时抛出UnsafeRegex。
+    """
+    try:
+        parsed = sre_parse.parse(domain_pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f'无效的域名模式：{domain_pattern}（{e}）') from None
+    try:
+        if _screen(parsed, False) > MAX_UNBOUNDED_REPEATS:
+            raise ValueError(f'正则含有超过{MAX_UNBOUNDED_REPEATS}个.*、+之类的无界重复，'
+                             '可能导致匹配时间失控，请改写或使用通配符')
+    except ValueError as e:
+        raise UnsafeRegex(f'{e}：{domain_pattern}') from None
+
+def glob_to_regex(glob: str) -> str:
+    """与通配符匹配结果相同的正则，用于合并多个候选模式"""
+    return r'^\.*' + fnmatch.translate(glob)
+
+def _glob_matcher(glob: str) -> Callable[[str], bool]:
+    glob = glob.lower()
+    core = glob.strip('*')
+    if '*' not in core and '?' not in core:
+        # *abc*、*abc、abc*只需子串、后缀、前缀判断
+        if glob.startswith('*') and glob.endswith('*'):
+            return lambda domain: core in domain.lower()
+        if glob.startswith('*'):
+            return lambda domain: domain.lower().endswith(core)
+
+        def match_prefix(domain: str) -> bool:
+            domain = domain.lower()
+            return domain.startswith(core) or domain.lstrip('.').startswith(core)
+        return match_prefix
+    match = re.compile(fnmatch.translate(glob), re.IGNORECASE).match
+
+    def match_glob(domain: str) -> bool:
+        # .google.com既按原样也去掉开头的'.'匹配，*.google.com和g?ogle.com都能匹配它
+        return match(domain) is not None or match(domain.lstrip('.')) is not None
+    return match_glob
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def domain_matcher(domain_pattern: str) -> Tuple[str, Callable[[str], bool]]:
+    """编译域名模式，返回(类型, 判断函数)，正则不安全或无效时抛出ValueError"""
+    kind = pattern_kind(domain_pattern)
+    if kind == KIND_SUFFIX:
+        suffix = domain_pattern.strip('.').lower()
+        dotted = '.' + suffix
+
+        def match_suffix(domain: str) -> bool:
+            domain = domain.lower().lstrip('.')
+            return domain == suffix or domain.endswith(dotted)
+        return kind, match_suffix
+    if kind == KIND_SUBSTRING:
+        literal = domain_pattern.lower()
+        return kind, lambda domain: literal in domain.lower()
+    if kind == KIND_GLOB:
+        return kind, _glob_matcher(domain_pattern)
+    check_regex(domain_pattern)
+    search = re.compile(domain_pattern, re.IGNORECASE).search
+    return kind, lambda domain: len(domain) <= MAX_REGEX_INPUT and search(domain) is not None
+
+def make_domain_predicate(domain_pattern: str,
+                          budget: Optional[float] = REGEX_TIME_BUDGET) -> Callable[[str], bool]:
+    """把域名匹配模式转换为判断函数
+
+    每次调用返回新的判断函数：正则的耗时从此时开始累计，超过budget秒抛出RegexTimeout，
+    budget为None时不限制。
+    """
+    kind, match = domain_matcher(domain_pattern)
+    if kind != KIND_REGEX or budget is None:
+        return match
+    clock = time.perf_counter
+    spent = 0.0
+
+    def match_within_budget(domain: str) -> bool:
+        nonlocal spent
+        start = clock()
+        matched = match(domain)
+        spent += clock() - start
+        if spent > budget:
+            raise RegexTimeout(f'正则匹配超过{budget:g}秒，已停止：{domain_pattern}')
+        return matched
+    return match_within_budget
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def text_matcher(alternatives: Tuple[str, ...], flags: int = 0) -> Callable:
+    """字段值等于任意一个候选值（支持*和?通配符）的正则match函数"""
+    return re.compile('|'.join(fnmatch.translate(value) for value in alternatives), flags).match
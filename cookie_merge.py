@@ -0,0 +1,191 @@
+"""合并多个Cookie文件
+
+多个文件在线程池中并行读取（打开过的文件直接读取缓存），按文件顺序合并到一个CookieStore，
+以(域名, 名称, 路径)为键用哈希表去除重复的Cookie，重复时按规则决定保留哪一条。
+"""
+import gc
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+from cookie_core import CookieRecord, CookieStore, TaskControl, TASK_BLOCK_SIZE, TaskCancelled
+from cookie_cache import load_cached
+from cookie_trace import traced
+
+# 同时读取的文件数
+MERGE_WORKERS = min(8, os.cpu_count() or 1)
+
+# 重复规则：保留过期时间最晚的一条（相同时保留后面文件中的），或总是保留后面文件中的
+MERGE_NEWEST = 'newest'
+MERGE_LAST = 'last'
+# 规则 → 界面显示的名称
+MERGE_RULES = {
+    MERGE_NEWEST: '保留过期时间最晚的',
+    MERGE_LAST: '保留后面文件中的',
+}
+
+_RECORD_KEY = attrgetter('domain', 'name', 'path')
+
+def cookie_key(cookie):
+    """去重键(域名, 名称, 路径)；不是对象的数组元素或字段不可哈希时返回唯一的键，不参与去重"""
+    if cookie.__class__ is CookieRecord:
+        key = _RECORD_KEY(cookie)
+    elif isinstance(cookie, dict):
+        key = (cookie.get('domain'), cookie.get('name'), cookie.get('path'))
+    else:
+        return object()
+    try:
+        hash(key)
+    except TypeError:
+        return object()
+    return key
+
+def cookie_keys(cookies: list) -> Tuple[list, list]:
+    """计算一批Cookie的去重键，返回(键, Cookie)，跳过已移除的行（None）
+
+    全部是CookieRecord且字段可哈希时一次取出所有键，否则逐条调用cookie_key()。
+    """
+    try:
+        keys = list(map(_RECORD_KEY, cookies))
+        hash(tuple(keys))
+        return keys, cookies
+    except (AttributeError, TypeError):
+        cookies = [cookie for cookie in cookies if cookie is not None]
+        return list(map(cookie_key, cookies)), cookies
+
+def expiration_of(cookie) -> float:
+    """过期时间，会话Cookie和无法识别的值为0，重复时总是让给有过期时间的Cookie"""
+    value = (cookie.expirationDate if cookie.__class__ is CookieRecord
+             else cookie.get('expirationDate'))
+    if value.__class__ is float or value.__class__ is int:
+        return value
+    try:
+        return float(value) if value not in (None, '') else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+class CookieMerger:
+    """按(域名, 名称, 路径)去重，逐批合并Cookie
+
+    去重键 → Cookie存放在一个dict中，合并结果保持每个键第一次出现的位置，
+    被替换时换成胜出的那一条。
+    """
+    def __init__(self, rule: str = MERGE_NEWEST):
+        if rule not in MERGE_RULES:
+            raise ValueError(f'未知的合并规则：{rule}')
+        self.rule = rule
+        self._cookies: Dict[object, object] = {}
+        # 去除的重复Cookie数量
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._cookies)
+
+    @property
+    def cookies(self) -> list:
+        return list(self._cookies.values())
+
+    def add(self, cookies: list, task: Optional[TaskControl] = None):
+        """合并一个文件的Cookie，后合并的文件视为更新"""
+        merged = self._cookies
+        for start in range(0, len(cookies), TASK_BLOCK_SIZE):
+            if task is not None:
+                task.check()
+            keys, block = cookie_keys(cookies[start:start + TASK_BLOCK_SIZE])
+            before = len(merged)
+            self._add_block(keys, block)
+            self.duplicates += len(block) - (len(merged) - before)
+
+    def _add_block(self, keys: list, block: list):
+        merged = self._cookies
+        if self.rule == MERGE_LAST:
+            merged.update(zip(keys, block))
+            return
+        get = merged.get
+        for key, cookie in zip(keys, block):
+            current = get(key)
+            if current is None or expiration_of(cookie) >= expiration_of(current):
+                merged[key] = cookie
+
+def _load_one(loader, path: str, task: Optional[TaskControl]):
+    """在线程池中读取一个文件，返回(解析结果, 子任务)"""
+    subtask = task.subtask() if task is not None else None
+    try:
+        return loader(path, task=subtask), subtask
+    except TaskCancelled:
+        raise
+    except Exception as e:
+        raise ValueError(f'{os.path.basename(path)}：{e}') from e
+
+def iter_loaded(paths: List[str], task: Optional[TaskControl] = None, loader=load_cached,
+                workers: int = MERGE_WORKERS):
+    """在线程池中并行读取多个文件，按paths的顺序逐个产生解析结果
+
+    已读取还未取走的文件不超过workers个，各文件的阶段耗时汇总到task.trace。
+    任一文件读取失败时抛出ValueError，错误信息中包含文件名。
+    """
+    workers = max(1, min(workers, len(paths)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        queued = iter(paths)
+        pending = deque(pool.submit(_load_one, loader, path, task)
+                        for path in islice(queued, workers))
+        try:
+            while pending:
+                future = pending.popleft()
+                for path in islice(queued, 1):
+                    pending.append(pool.submit(_load_one, loader, path, task))
+                store, subtask = future.result()
+                del future
+                if subtask is not None and subtask.trace is not None:
+                    task.trace.merge(subtask.trace)
+                yield store
+                del store
+        finally:
+            for future in pending:
+                future.cancel()
+
+@contextmanager
+def gc_paused():
+    """暂停循环垃圾回收
+
+    合并时产生数百万个不含循环引用的记录和元组，频繁触发的全量回收会反复扫描整个堆，
+    耗时随已读入的数据量增长。
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def merge_files(paths: List[str], domain_pattern: str = '', rule: str = MERGE_NEWEST,
+                workers: int = MERGE_WORKERS, task: Optional[TaskControl] = None,
+                loader=load_cached) -> Tuple[CookieStore, int]:
+    """并行读取多个文件并去重合并，返回(合并结果, 去除的重复Cookie数量)
+
+    paths的顺序即合并顺序；读取完一个文件就合并一个，不必等全部读完。
+    给出域名模式时与读取单个文件相同，通过task.partial()回报合并结果中匹配的Cookie。
+    """
+    merger = CookieMerger(rule)
+    total = len(paths)
+    with gc_paused():
+        for done, store in enumerate(iter_loaded(paths, task, loader, workers)):
+            if task is not None:
+                task.check()
+                task.progress(done, total, f'正在合并 {done + 1}/{total}')
+            with traced(task, 'merge') as stage:
+                merger.add(store.cookies, task)
+                stage.rows = len(merger)
+            # 合并后不再需要单个文件的解析结果
+            del store
+        store = CookieStore(merger.cookies, paths[0] if total == 1 else '')
+        duplicates = merger.duplicates
+        del merger
+    if task is not None and domain_pattern:
+        task.partial(store.filter(domain_pattern, task))
+    return store, duplicates
@@ -0,0 +1,451 @@
+"""其他格式的Cookie文件读取器
+
+除浏览器扩展导出的JSON数组外，还支持：
+
+- Netscape格式的cookies.txt（curl、wget、yt-dlp等工具使用）
+- HAR文件（浏览器开发者工具导出的网络记录），取出其中请求和响应的Cookie
+- Chromium（Cookies）和Firefox（cookies.sqlite）Cookie数据库的离线副本
+- ZIP压缩包，依次读取其中的每个Cookie文件
+
+每个读取器逐个产生与JSON导出格式字段相同的dict，由load_cookie_records转为紧凑记录。
+文件格式按开头的内容自动识别，gzip和zstd压缩的文件按解压后的内容识别；
+可以用register_reader()加入新的读取器。
+"""
+import re
+import codecs
+import sqlite3
+import zipfile
+import zlib
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from cookie_core import (CookieQuery, TaskControl, TASK_BLOCK_SIZE, ZIP_MAGIC, detect_encoding,
+                         iter_file_chunks, iter_json_array, iter_stream_chunks, open_decompressed)
+from cookie_match import (KIND_REGEX, KIND_SUBSTRING, KIND_SUFFIX, RegexTimeout, check_regex,
+                          make_domain_predicate, pattern_kind)
+
+try:
+    from zstandard import ZstdError
+except ImportError:
+    ZstdError = ValueError
+
+# 读取单个文件可能出现的错误：文件不可读、格式错误、压缩数据不完整（例如还没写完）等
+READ_ERRORS = (OSError, ValueError, EOFError, zlib.error, zipfile.BadZipFile, ZstdError,
+               sqlite3.Error)
+
+# 识别格式时读取的文件开头长度
+DETECT_BYTES = 4096
+
+_SQLITE_HEADER = b'SQLite format 3\x00'
+_NETSCAPE_HEADERS = ('# Netscape HTTP Cookie File', '# HTTP Cookie File')
+_HTTP_ONLY_PREFIX = '#HttpOnly_'
+# HAR文件中的"entries"键，前面是转义引号时属于字符串内容
+_HAR_ENTRIES = re.compile(r'(?<!\\)"entries"\s*:\s*\[')
+_HAR_LOG = re.compile(r'^\s*\{\s*"log"\s*:')
+
+# Chromium的时间为1601-01-01起的微秒数
+_CHROMIUM_EPOCH_OFFSET = 11644473600
+_CHROMIUM_SAME_SITE = {-1: 'unspecified', 0: 'no_restriction', 1: 'lax', 2: 'strict'}
+_FIREFOX_SAME_SITE = {0: 'no_restriction', 1: 'lax', 2: 'strict'}
+_HAR_SAME_SITE = {'none': 'no_restriction', 'lax': 'lax', 'strict': 'strict'}
+
+def _make_cookie(domain: str, name: str, value: str, path: str,
+                 expiration: Optional[float], http_only: bool, secure: bool,
+                 same_site: str = 'unspecified', host_only: Optional[bool] = None,
+                 cookie_id: Optional[int] = None) -> Dict[str, Any]:
+    """按JSON导出格式的字段顺序生成Cookie，字段顺序相同的记录共用布局"""
+    cookie = {'domain': domain}
+    if expiration is not None:
+        cookie['expirationDate'] = expiration
+    cookie.update({
+        'hostOnly': not domain.startswith('.') if host_only is None else host_only,
+        'httpOnly': http_only,
+        'name': name,
+        'path': path or '/',
+        'sameSite': same_site,
+        'secure': secure,
+        'session': expiration is None,
+        'storeId': '0',
+        'value': value,
+    })
+    if cookie_id is not None:
+        cookie['id'] = cookie_id
+    return cookie
+
+class CookieReader:
+    """读取器基类
+
+    detect()根据文件开头（已解压）的字节判断是否为该格式；read()逐个产生Cookie。
+    filters_domain为True的读取器可以在数据源中直接按域名条件过滤。
+    reads_text为True的读取器实现read_chunks()，从解码后的文本块读取，
+    因此也能读取压缩文件和ZIP包中的成员。
+    """
+    name = ''
+    filters_domain = False
+    reads_text = False
+    # 文本读取器解码时的错误处理方式
+    errors = 'strict'
+
+    def detect(self, head: bytes, file_path: str) -> bool:
+        raise NotImplementedError
+
+    def read(self, file_path: str, domain_pattern: str = '',
+             task: Optional[TaskControl] = None) -> Iterator[Dict[str, Any]]:
+        if not self.reads_text:
+            raise NotImplementedError
+        return self.read_chunks(iter_file_chunks(file_path, task, self.errors), task)
+
+    def read_chunks(self, chunks, task: Optional[TaskControl] = None) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+def _head_text(head: bytes) -> str:
+    """文件开头的文本，去掉BOM；末尾被截断的多字节字符直接丢弃"""
+    return codecs.getincrementaldecoder(detect_encoding(head))('ignore').decode(head)
+
+def _iter_lines(chunks) -> Iterator[str]:
+    """把文本块流按行切分，行尾不含换行符"""
+    rest = ''
+    for chunk in chunks:
+        lines = (rest + chunk).split('\n')
+        rest = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r')
+    if rest:
+        yield rest.rstrip('\r')
+
+class NetscapeReader(CookieReader):
+    """Netscape格式的cookies.txt：每行以制表符分隔的7个字段
+
+    域名、是否包含子域名、路径、是否仅HTTPS、过期时间、名称、值；
+    以#HttpOnly_开头的域名表示HttpOnly Cookie，过期时间为0表示会话Cookie。
+    """
+    name = 'netscape'
+    reads_text = True
+    errors = 'replace'
+
+    def detect(self, head: bytes, file_path: str) -> bool:
+        text = _head_text(head).lstrip()
+        if text.startswith(_NETSCAPE_HEADERS):
+            return True
+        for line in text.splitlines():
+            if line.startswith(_HTTP_ONLY_PREFIX):
+                return line.count('\t') == 6
+            if line.strip() and not line.startswith('#'):
+                return line.count('\t') == 6 and line.split('\t')[1].upper() in ('TRUE', 'FALSE')
+        return False
+
+    def read_chunks(self, chunks, task: Optional[TaskControl] = None) -> Iterator[Dict[str, Any]]:
+        for number, line in enumerate(_iter_lines(chunks)):
+            if task is not None and number % TASK_BLOCK_SIZE == 0:
+                task.check()
+            http_only = line.startswith(_HTTP_ONLY_PREFIX)
+            if http_only:
+                line = line[len(_HTTP_ONLY_PREFIX):]
+            elif not line.strip() or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            if len(fields) < 7:
+                raise ValueError(f'cookies.txt第{number + 1}行格式错误：{line[:80]}')
+            domain, subdomains, path, secure, expires, name = fields[:6]
+            # 值中可能含有制表符
+            value = '\t'.join(fields[6:])
+            try:
+                expiration = float(expires) or None
+            except ValueError:
+                raise ValueError(f'cookies.txt第{number + 1}行的过期时间无效：{expires}') from None
+            yield _make_cookie(domain, name, value, path, expiration, http_only,
+                               secure.upper() == 'TRUE',
+                               host_only=subdomains.upper() != 'TRUE')
+
+class HarReader(CookieReader):
+    """HAR文件：逐个解析log.entries中的请求记录，取出请求和响应中的Cookie
+
+    请求中的Cookie没有域名，使用请求URL的主机名；同一Cookie出现多次时保留最后一次。
+    """
+    name = 'har'
+    reads_text = True
+
+    def detect(self, head: bytes, file_path: str) -> bool:
+        return bool(_HAR_LOG.match(_head_text(head)))
+
+    def read_chunks(self, chunks, task: Optional[TaskControl] = None) -> Iterator[Dict[str, Any]]:
+        cookies: Dict[tuple, Dict[str, Any]] = {}
+        entries = iter_json_array(self._entries_array(iter(chunks)), trailing=True)
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            request = entry.get('request') or {}
+            host = urlsplit(request.get('url', '')).hostname or ''
+            for part, response in ((request, False), (entry.get('response') or {}, True)):
+                for item in part.get('cookies') or ():
+                    cookie = self._cookie(item, host, response)
+                    key = (cookie['domain'], cookie['name'], cookie['path'])
+                    cookies.pop(key, None)
+                    cookies[key] = cookie
+        yield from cookies.values()
+
+    @staticmethod
+    def _entries_array(chunks):
+        """跳过entries数组之前的内容，从'['开始产生文本块"""
+        buffer = ''
+        for chunk in chunks:
+            buffer += chunk
+            match = _HAR_ENTRIES.search(buffer)
+            if match:
+                yield buffer[match.end() - 1:]
+                yield from chunks
+                return
+            # 保留末尾一小段，键名可能被块边界截断
+            buffer = buffer[-64:]
+        raise ValueError('HAR文件中没有entries')
+
+    @staticmethod
+    def _cookie(item: Dict[str, Any], host: str, response: bool) -> Dict[str, Any]:
+        domain = item.get('domain') or host
+        expiration = None
+        expires = item.get('expires')
+        if expires:
+            try:
+                expiration = datetime.fromisoformat(expires.replace('Z', '+00:00'))
+                if expiration.tzinfo is None:
+                    expiration = expiration.replace(tzinfo=timezone.utc)
+                expiration = expiration.timestamp()
+            except (ValueError, AttributeError):
+                expiration = None
+        same_site = _HAR_SAME_SITE.get(str(item.get('sameSite', '')).lower(), 'unspecified')
+        return _make_cookie(domain, item.get('name', ''), item.get('value', ''),
+                            item.get('path') or '/', expiration, bool(item.get('httpOnly')),
+                            bool(item.get('secure')), same_site,
+                            host_only=not (response and item.get('domain')))
+
+class SqliteReader(CookieReader):
+    """浏览器Cookie数据库的基类
+
+    以只读、不加锁的方式打开数据库副本；给出域名条件时在SQL查询中过滤，
+    纯域名文本使用LIKE，其他正则模式通过注册的REGEXP函数匹配。
+    """
+    filters_domain = True
+    table = ''
+    host_column = ''
+
+    def detect(self, head: bytes, file_path: str) -> bool:
+        if not head.startswith(_SQLITE_HEADER):
+            return False
+        try:
+            with closing(self._connect(file_path)) as conn:
+                return bool(conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                                         "AND name = ?", (self.table,)).fetchone())
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _connect(file_path: str) -> sqlite3.Connection:
+        uri = Path(file_path).resolve().as_uri() + '?mode=ro&immutable=1'
+        return sqlite3.connect(uri, uri=True)
+
+    def _domain_filter(self, conn: sqlite3.Connection, domain_pattern: str):
+        """把查询中的域名条件转换为WHERE子句，返回(子句, 参数, REGEXP函数)
+
+        没有用到REGEXP时函数为None。
+        """
+        clauses = []
+        params: List[str] = []
+        regexp = _RegexpFunction()
+        host = self.host_column
+        for pattern in CookieQuery.parse(domain_pattern).domain_patterns:
+            kind = pattern_kind(pattern)
+            if kind == KIND_SUFFIX:
+                suffix = pattern.strip('.').lower()
+                clauses.append(f"(ltrim({host}, '.') = ? COLLATE NOCASE "
+                               f"OR {host} LIKE ? ESCAPE '\\')")
+                params.extend([suffix, '%.' + _escape_like(suffix)])
+            elif kind == KIND_SUBSTRING:
+                clauses.append(f"{host} LIKE ? ESCAPE '\\'")
+                params.append('%' + _escape_like(pattern) + '%')
+            else:
+                regexp.add(pattern)
+                clauses.append(f'{host} REGEXP ?')
+                params.append(pattern)
+        if not clauses:
+            return '', [], None
+        if not regexp.predicates:
+            return ' WHERE ' + ' AND '.join(clauses), params, None
+        conn.create_function('regexp', 2, regexp, deterministic=True)
+        return ' WHERE ' + ' AND '.join(clauses), params, regexp
+
+    def _columns(self, conn: sqlite3.Connection) -> set:
+        return {row[1] for row in conn.execute(f'PRAGMA table_info({self.table})')}
+
+    def read(self, file_path: str, domain_pattern: str = '',
+             task: Optional[TaskControl] = None) -> Iterator[Dict[str, Any]]:
+        conn = self._connect(file_path)
+        try:
+            select = self._select(self._columns(conn))
+            where, params, regexp = self._domain_filter(conn, domain_pattern)
+            try:
+                cursor = conn.execute(select + where, params)
+                while True:
+                    if task is not None:
+                        task.check()
+                    rows = cursor.fetchmany(TASK_BLOCK_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield self._cookie(row)
+            except sqlite3.OperationalError:
+                # SQLite只报告自定义函数出错，改为抛出原来的RegexTimeout
+                if regexp is not None and regexp.error is not None:
+                    raise regexp.error from None
+                raise
+        finally:
+            conn.close()
+
+    def _select(self, columns: set) -> str:
+        raise NotImplementedError
+
+    def _cookie(self, row) -> Dict[str, Any]:
+        raise NotImplementedError
+
+def _escape_like(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+class _RegexpFunction:
+    """一次查询的SQLite REGEXP函数，通配符和正则与内存中的域名匹配相同
+
+    正则先经过check_regex检查，匹配耗时在整个查询中累计，超过上限时记下RegexTimeout并中止查询。
+    """
+    def __init__(self):
+        self.predicates = {}
+        self.error: Optional[RegexTimeout] = None
+
+    def add(self, pattern: str):
+        if pattern not in self.predicates:
+            if pattern_kind(pattern) == KIND_REGEX:
+                check_regex(pattern)
+            self.predicates[pattern] = make_domain_predicate(pattern)
+
+    def __call__(self, pattern: str, value: Optional[str]) -> bool:
+        if value is None:
+            return False
+        try:
+            return self.predicates[pattern](value)
+        except RegexTimeout as e:
+            self.error = e
+            raise
+
+class ChromiumReader(SqliteReader):
+    """Chromium系浏览器（Chrome、Edge等）的Cookies数据库
+
+    加密保存的值（encrypted_value）需要原浏览器所在系统的密钥才能解密，离线副本中只能读出明文值。
+    """
+    name = 'chromium'
+    table = 'cookies'
+    host_column = 'host_key'
+
+    def _select(self, columns: set) -> str:
+        # 旧版本的列名为secure和httponly，没有samesite
+        secure = 'is_secure' if 'is_secure' in columns else 'secure'
+        http_only = 'is_httponly' if 'is_httponly' in columns else 'httponly'
+        same_site = 'samesite' if 'samesite' in columns else '-1'
+        persistent = 'is_persistent' if 'is_persistent' in columns else (
+            'has_expires' if 'has_expires' in columns else '1')
+        return (f'SELECT host_key, name, value, path, expires_utc, {persistent}, '
+                f'{http_only}, {secure}, {same_site} FROM cookies')
+
+    def _cookie(self, row) -> Dict[str, Any]:
+        host, name, value, path, expires, persistent, http_only, secure, same_site = row
+        expiration = expires / 1e6 - _CHROMIUM_EPOCH_OFFSET if persistent and expires else None
+        return _make_cookie(host, name, value or '', path, expiration, bool(http_only),
+                            bool(secure), _CHROMIUM_SAME_SITE.get(same_site, 'unspecified'))
+
+class FirefoxReader(SqliteReader):
+    """Firefox的cookies.sqlite数据库"""
+    name = 'firefox'
+    table = 'moz_cookies'
+    host_column = 'host'
+
+    def _select(self, columns: set) -> str:
+        same_site = 'sameSite' if 'sameSite' in columns else '0'
+        return (f'SELECT host, name, value, path, expiry, isHttpOnly, isSecure, {same_site}, id '
+                f'FROM moz_cookies')
+
+    def _cookie(self, row) -> Dict[str, Any]:
+        host, name, value, path, expiry, http_only, secure, same_site, cookie_id = row
+        # 较新的版本以毫秒保存过期时间
+        expiration = (expiry / 1000 if expiry > 1e11 else float(expiry)) if expiry else None
+        return _make_cookie(host, name, value or '', path, expiration, bool(http_only),
+                            bool(secure), _FIREFOX_SAME_SITE.get(same_site, 'unspecified'),
+                            cookie_id=cookie_id)
+
+class ZipReader(CookieReader):
+    """ZIP压缩包：按顺序读取其中的每个Cookie文件，合并为一份数据
+
+    成员边读边解压，不写到磁盘。成员可以是JSON数组或其他文本格式，也可以再经gzip或zstd压缩；
+    数据库文件和嵌套的压缩包需要先解压出来。目录、隐藏文件和__MACOSX中的文件跳过。
+    """
+    name = 'zip'
+
+    def detect(self, head: bytes, file_path: str) -> bool:
+        return head.startswith(ZIP_MAGIC)
+
+    def read(self, file_path: str, domain_pattern: str = '',
+             task: Optional[TaskControl] = None) -> Iterator[Dict[str, Any]]:
+        with zipfile.ZipFile(file_path) as archive:
+            members = [info for info in archive.infolist() if self._is_cookie_file(info)]
+            total = sum(info.compress_size for info in members)
+            done = 0
+            for number, info in enumerate(members):
+                if task is not None:
+                    task.check()
+                    task.progress(done, total, f'正在读取 {number + 1}/{len(members)}')
+                with archive.open(info) as member:
+                    try:
+                        yield from self._read_member(member, info.filename, task)
+                    except ValueError as e:
+                        raise ValueError(f'{info.filename}：{e}') from e
+                done += info.compress_size
+
+    @staticmethod
+    def _is_cookie_file(info: zipfile.ZipInfo) -> bool:
+        name = info.filename.rsplit('/', 1)[-1]
+        return (not info.is_dir() and not name.startswith('.')
+                and not info.filename.startswith('__MACOSX/'))
+
+    @staticmethod
+    def _read_member(member, name: str, task: Optional[TaskControl]):
+        stream = open_decompressed(member)
+        head = stream.read(DETECT_BYTES)
+        if not head.strip():
+            return
+        reader = None
+        if not _head_text(head).lstrip().startswith('['):
+            reader = next((reader for reader in READERS
+                           if reader.reads_text and reader.detect(head, name)), None)
+        errors = reader.errors if reader is not None else 'strict'
+        chunks = iter_stream_chunks(stream, task, errors=errors, head=head)
+        if reader is None:
+            yield from iter_json_array(chunks)
+        else:
+            yield from reader.read_chunks(chunks, task)
+
+# 按顺序尝试的读取器；都不匹配时按JSON数组读取
+READERS: List[CookieReader] = [ChromiumReader(), FirefoxReader(), HarReader(), NetscapeReader(),
+                               ZipReader()]
+
+def register_reader(reader: CookieReader):
+    """加入新的读取器，优先于内置读取器尝试"""
+    READERS.insert(0, reader)
+
+def detect_reader(file_path: str) -> Optional[CookieReader]:
+    """根据文件开头（压缩文件为解压后的开头）的内容选择读取器，JSON数组返回None"""
+    with open(file_path, 'rb') as f:
+        head = open_decompressed(f).read(DETECT_BYTES)
+    if _head_text(head).lstrip().startswith('['):
+        return None
+    for reader in READERS:
+        if reader.detect(head, file_path):
+            return reader
+    return None
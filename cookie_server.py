@@ -0,0 +1,329 @@
+"""本地查询服务
+
+把解析过的Cookie文件及其域名索引常驻内存，供其他工具反复查询，不必每次从头启动提取。
+只监听本机地址或Unix套接字，使用HTTP协议：
+
+    GET /cookies?jar=<文件路径>&q=<查询条件>   返回匹配的Cookie（与导出的JSON文件格式相同）
+    GET /jars                                  返回常驻内存的文件列表
+
+只接受Host为本机地址（127.0.0.1、localhost、[::1]）的请求，防止网页通过DNS重绑定访问；
+能查询的文件限于--root指定的目录，未指定时限于启动时读取的文件。
+查询语法与界面和命令行相同。每个请求的耗时（读取文件、过滤、编码）通过Server-Timing
+响应头返回，并输出到标准错误。常驻的文件数有上限，超出时淘汰最久未使用的文件；
+文件被修改后下一次查询会重新读取。
+"""
+import os
+import re
+import sys
+import json
+import stat
+import time
+import asyncio
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from cookie_core import CookieStore, CookieQuery, encode_cookies, load_cookie_file
+from cookie_cache import load_cached
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_JARS = 8
+# 请求行和请求头的最大长度
+MAX_HEADER_BYTES = 64 * 1024
+# 允许的Host请求头（不含端口）
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '[::1]')
+
+class _Jar:
+    """常驻内存的一个文件"""
+    __slots__ = ('path', 'version', 'store', 'last_used')
+
+    def __init__(self, path: str, version: Tuple[int, int], store: CookieStore):
+        self.path = path
+        self.version = version
+        self.store = store
+        self.last_used = time.time()
+
+class JarPool:
+    """常驻内存的Cookie文件，按最近使用顺序淘汰
+
+    读取在单独的线程池中进行，同一文件的并发请求只读取一次；
+    查询在一个单独的线程中依次执行，索引的查询缓存不会被并发修改。
+    没有指定根目录时，只能访问用allow()登记的文件。
+    """
+    def __init__(self, max_jars: int = DEFAULT_MAX_JARS, use_cache: bool = True,
+                 root: Optional[str] = None):
+        self.max_jars = max(1, max_jars)
+        self.use_cache = use_cache
+        self.root = os.path.realpath(root) if root else None
+        # 没有根目录时允许访问的文件
+        self._allowed = set()
+        self._jars: 'OrderedDict[str, _Jar]' = OrderedDict()
+        # (路径, 版本) → 正在进行的读取
+        self._loading: Dict[Tuple[str, Tuple[int, int]], asyncio.Future] = {}
+        self._loaders = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                           thread_name_prefix='jar-loader')
+        self._query_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='jar-query')
+
+    def allow(self, jar: str) -> str:
+        """登记允许访问的文件（启动时读取的文件），返回其绝对路径"""
+        path = os.path.realpath(jar)
+        self._allowed.add(path)
+        return path
+
+    def resolve(self, jar: str) -> str:
+        """请求中的文件路径转为绝对路径
+
+        指定了根目录时只允许访问其中的文件，否则只允许访问用allow()登记的文件。
+        """
+        if self.root is None:
+            path = os.path.realpath(jar)
+            if path not in self._allowed:
+                raise PermissionError(f'{jar} 不是启动时读取的文件，查询其他文件需要指定--root')
+            return path
+        path = os.path.realpath(os.path.join(self.root, jar))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise PermissionError(f'{jar} 不在允许访问的目录中')
+        return path
+
+    async def get(self, path: str) -> Tuple[CookieStore, bool]:
+        """返回(文件的解析结果, 是否已常驻内存)"""
+        info = os.stat(path)
+        version = (info.st_size, info.st_mtime_ns)
+        jar = self._jars.get(path)
+        if jar is not None and jar.version == version:
+            self._jars.move_to_end(path)
+            jar.last_used = time.time()
+            return jar.store, True
+        key = (path, version)
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(path, version))
+            self._loading[key] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(key, None))
+        # 某个请求断开时不取消其他请求也在等待的读取
+        return await asyncio.shield(loading), False
+
+    async def _load(self, path: str, version: Tuple[int, int]) -> CookieStore:
+        load = load_cached if self.use_cache else load_cookie_file
+        store = await asyncio.get_running_loop().run_in_executor(self._loaders, load, path)
+        self._jars[path] = _Jar(path, version, store)
+        self._jars.move_to_end(path)
+        while len(self._jars) > self.max_jars:
+            self._jars.popitem(last=False)
+        return store
+
+    async def query(self, store: CookieStore, query: str) -> List[dict]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._query_thread, store.filter, query)
+
+    async def encode(self, cookies: List[dict]) -> bytes:
+        """在查询线程中编码结果，大量Cookie的编码不阻塞其他连接"""
+        text = await asyncio.get_running_loop().run_in_executor(
+            self._query_thread, encode_cookies, cookies)
+        return text.encode('utf-8')
+
+    def jars(self) -> List[dict]:
+        """常驻内存的文件，最近使用的在前"""
+        return [{'path': jar.path, 'cookies': len(jar.store), 'last_used': jar.last_used}
+                for jar in reversed(self._jars.values())]
+
+    def close(self):
+        self._loaders.shutdown(wait=False, cancel_futures=True)
+        self._query_thread.shutdown(wait=False, cancel_futures=True)
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+class QueryServer:
+    """处理HTTP请求，支持长连接
+
+    allowed_hosts为接受的Host请求头（含端口），None表示不检查（Unix套接字）；
+    没有Host请求头的请求不是来自浏览器，照常处理。
+    """
+    def __init__(self, pool: JarPool, log=sys.stderr, allowed_hosts: Optional[set] = None):
+        self.pool = pool
+        self.log = log
+        self.allowed_hosts = allowed_hosts
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, host, keep_alive = request
+                started = time.perf_counter()
+                timings: List[Tuple[str, float, str]] = []
+                headers = {}
+                try:
+                    if (host is not None and self.allowed_hosts is not None
+                            and host.lower() not in self.allowed_hosts):
+                        raise HttpError(HTTPStatus.FORBIDDEN, f'不接受Host为{host}的请求')
+                    body, count = await self._dispatch(method, target, timings)
+                    status = HTTPStatus.OK
+                    headers['X-Cookie-Count'] = str(count)
+                except HttpError as e:
+                    status, count = e.status, 0
+                    body = _error_body(str(e))
+                except Exception as e:
+                    status, count = HTTPStatus.INTERNAL_SERVER_ERROR, 0
+                    body = _error_body(f'处理请求时出错：{e}')
+                elapsed = (time.perf_counter() - started) * 1000
+                headers['Server-Timing'] = ', '.join(
+                    [f'{name};dur={duration:.2f}' + (f';desc="{desc}"' if desc else '')
+                     for name, duration, desc in timings] + [f'total;dur={elapsed:.2f}'])
+                writer.write(_response(status, body, headers, keep_alive))
+                await writer.drain()
+                print(f'{method} {target} -> {status.value}，{count} 个Cookie，{elapsed:.1f} ms',
+                      file=self.log, flush=True)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """读取请求行和请求头，返回(方法, 路径, Host, 是否保持连接)，连接已关闭时返回None"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length') or 0)
+        if length:
+            # 查询不使用请求体，读出后丢弃
+            await reader.readexactly(length)
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, target, headers.get('host'), keep_alive
+
+    async def _dispatch(self, method: str, target: str, timings) -> Tuple[bytes, int]:
+        if method != 'GET':
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, '只支持GET请求')
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path == '/jars':
+            jars = self.pool.jars()
+            return json.dumps(jars, ensure_ascii=False).encode('utf-8'), 0
+        if url.path != '/cookies':
+            raise HttpError(HTTPStatus.NOT_FOUND, f'未知的路径 {url.path}')
+        if not params.get('jar'):
+            raise HttpError(HTTPStatus.BAD_REQUEST, '缺少jar参数')
+        query = params.get('q', '')
+
+        try:
+            CookieQuery.parse(query)
+        except (re.error, ValueError) as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f'查询条件有误：{e}')
+
+        started = time.perf_counter()
+        try:
+            path = self.pool.resolve(params['jar'])
+            store, resident = await self.pool.get(path)
+        except ValueError as e:
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, f'Cookie文件格式错误：{e}')
+        except PermissionError as e:
+            raise HttpError(HTTPStatus.FORBIDDEN, str(e))
+        except FileNotFoundError:
+            raise HttpError(HTTPStatus.NOT_FOUND, f'文件不存在：{params["jar"]}')
+        except OSError as e:
+            raise HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, f'读取文件时出错：{e}')
+        loaded = time.perf_counter()
+        timings.append(('jar', (loaded - started) * 1000, 'hit' if resident else 'load'))
+
+        try:
+            cookies = await self.pool.query(store, query)
+        except (re.error, ValueError) as e:
+            # 包括正则匹配超时（RegexTimeout）
+            raise HttpError(HTTPStatus.BAD_REQUEST, f'查询条件有误：{e}')
+        filtered = time.perf_counter()
+        timings.append(('filter', (filtered - loaded) * 1000, ''))
+        body = await self.pool.encode(cookies)
+        timings.append(('encode', (time.perf_counter() - filtered) * 1000, ''))
+        return body, len(cookies)
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+def _response(status: HTTPStatus, body: bytes, headers: Dict[str, str],
+              keep_alive: bool) -> bytes:
+    lines = [f'HTTP/1.1 {status.value} {status.phrase}',
+             'Content-Type: application/json; charset=utf-8',
+             f'Content-Length: {len(body)}',
+             f'Connection: {"keep-alive" if keep_alive else "close"}']
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+async def serve(args) -> None:
+    pool = JarPool(args.max_jars, not args.no_cache, args.root)
+    server = QueryServer(pool)
+    try:
+        for jar in args.jars:
+            # 预先读取，首次查询不必等待
+            store, _ = await pool.get(pool.allow(jar) if args.root is None else pool.resolve(jar))
+            print(f'已读取 {jar}：{len(store)} 个Cookie', file=sys.stderr, flush=True)
+        if args.unix:
+            if os.path.exists(args.unix) and stat.S_ISSOCK(os.stat(args.unix).st_mode):
+                # 上次未正常退出留下的套接字文件
+                os.unlink(args.unix)
+            listener = await asyncio.start_unix_server(server.handle, path=args.unix,
+                                                       limit=MAX_HEADER_BYTES)
+            address = args.unix
+        else:
+            listener = await asyncio.start_server(server.handle, args.host, args.port,
+                                                  limit=MAX_HEADER_BYTES)
+            port = listener.sockets[0].getsockname()[1]
+            server.allowed_hosts = {f'{host}:{port}' for host in LOCAL_HOSTS}
+            address = f'http://{args.host}:{port}'
+        print(f'查询服务已启动：{address}，按Ctrl+C结束', file=sys.stderr, flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        pool.close()
+        if args.unix and os.path.exists(args.unix) and stat.S_ISSOCK(os.stat(args.unix).st_mode):
+            os.unlink(args.unix)
+
+def run_server(argv: List[str]) -> int:
+    """本地查询服务模式"""
+    parser = argparse.ArgumentParser(
+        prog='cookie_extractor_gui.py --serve',
+        description='常驻内存的本地Cookie查询服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认127.0.0.1，仅本机可访问）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'监听端口（默认{DEFAULT_PORT}）')
+    parser.add_argument('--unix', metavar='PATH', help='改为监听Unix套接字')
+    parser.add_argument('--max-jars', type=int, default=DEFAULT_MAX_JARS,
+                        help=f'常驻内存的文件数上限，超出时淘汰最久未使用的文件（默认{DEFAULT_MAX_JARS}）')
+    parser.add_argument('--root', help='只允许查询此目录中的文件，jar参数为相对此目录的路径；'
+                                       '不指定时只能查询启动时读取的文件')
+    parser.add_argument('--no-cache', action='store_true', help='不读写已解析文件的磁盘缓存')
+    parser.add_argument('jars', nargs='*', help='启动时预先读取的Cookie文件')
+    args = parser.parse_args(argv)
+    if args.unix and not hasattr(asyncio, 'start_unix_server'):
+        parser.error('当前系统不支持Unix套接字')
+    if not args.root and not args.jars:
+        parser.error('需要指定--root，或给出启动时读取的文件（只能查询这些文件）')
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print('查询服务已停止', file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f'无法启动查询服务：{e}', file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,181 @@
+"""按可注册域名拆分Cookie
+
+一次遍历已解析的数据，把Cookie按可注册域名（例如 www.google.co.uk → google.co.uk）分组，
+再用有限数量的线程并行写出每个域名的文件。
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple
+
+from cookie_core import (CookieStore, DomainIndex, TaskControl, domain_of,
+                         parse_if_changed, save_cookies)
+from cookie_trace import traced
+
+# 同时写出的文件数
+SPLIT_WRITERS = min(8, os.cpu_count() or 1)
+# 没有域名的Cookie写入的文件名
+NO_DOMAIN_NAME = 'no-domain'
+
+# 常见的多级公共后缀（其下一级才是可注册域名），未列出的按最后两级计算。
+# 包括国家和地区的二级后缀，以及允许用户注册子域名的托管服务。
+MULTI_PART_SUFFIXES = frozenset('''
+    co.uk org.uk me.uk ltd.uk plc.uk net.uk ac.uk gov.uk sch.uk nhs.uk police.uk
+    com.cn net.cn org.cn gov.cn edu.cn ac.cn
+    com.hk net.hk org.hk edu.hk gov.hk idv.hk
+    com.tw net.tw org.tw edu.tw gov.tw idv.tw
+    com.mo net.mo org.mo
+    co.jp ne.jp or.jp ac.jp go.jp ad.jp ed.jp gr.jp lg.jp
+    co.kr ne.kr or.kr re.kr pe.kr go.kr ac.kr
+    com.sg net.sg org.sg edu.sg gov.sg
+    com.my net.my org.my edu.my gov.my
+    co.th in.th ac.th go.th or.th
+    co.id or.id ac.id go.id web.id my.id
+    com.vn net.vn org.vn edu.vn gov.vn
+    com.ph net.ph org.ph edu.ph gov.ph
+    co.in net.in org.in firm.in gen.in ind.in ac.in edu.in gov.in
+    com.pk net.pk org.pk edu.pk gov.pk
+    com.au net.au org.au edu.au gov.au asn.au id.au
+    co.nz net.nz org.nz ac.nz govt.nz geek.nz school.nz
+    com.br net.br org.br gov.br edu.br art.br
+    com.ar net.ar org.ar gob.ar edu.ar
+    com.mx net.mx org.mx gob.mx edu.mx
+    com.co net.co org.co gov.co edu.co
+    com.pe net.pe org.pe gob.pe edu.pe
+    com.ve net.ve org.ve gob.ve
+    com.tr net.tr org.tr gov.tr edu.tr gen.tr av.tr bel.tr
+    com.ru net.ru org.ru msk.ru spb.ru
+    com.ua net.ua org.ua in.ua kiev.ua
+    co.il org.il net.il ac.il gov.il
+    com.sa net.sa org.sa edu.sa gov.sa
+    co.za org.za net.za gov.za ac.za web.za
+    com.eg net.eg org.eg edu.eg gov.eg
+    com.ng net.ng org.ng edu.ng gov.ng
+    co.ke or.ke ac.ke go.ke
+    com.pl net.pl org.pl
+    co.at or.at gv.at ac.at
+    com.es nom.es org.es gob.es edu.es
+    com.pt org.pt gov.pt edu.pt
+    com.gr net.gr org.gr edu.gr gov.gr
+    co.hu org.hu
+    com.de
+    github.io gitlab.io blogspot.com appspot.com herokuapp.com netlify.app vercel.app
+    pages.dev workers.dev web.app firebaseapp.com azurewebsites.net cloudfront.net
+    amazonaws.com s3.amazonaws.com
+'''.split())
+
+# IPv4地址或带端口、方括号的IPv6地址不再拆分
+_IP_HOST = re.compile(r'[\d.]+|\[?[0-9a-f:]*:[0-9a-f:.]*\]?(:\d+)?')
+# 文件名中不允许的字符
+_UNSAFE_NAME_CHARS = re.compile(r'[^\w.\-]')
+
+def registrable_domain(domain: str) -> str:
+    """Cookie域名对应的可注册域名，统一为小写；IP地址和单级主机名原样返回"""
+    host = domain.strip('.').lower()
+    if not host or _IP_HOST.fullmatch(host):
+        return host
+    labels = host.rsplit('.', 4)
+    # 先检查较长的后缀，s3.amazonaws.com下的可注册域名有4级
+    if len(labels) >= 4 and '.'.join(labels[-3:]) in MULTI_PART_SUFFIXES:
+        return '.'.join(labels[-4:])
+    if len(labels) >= 3 and '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def group_by_site(store: CookieStore, query: str = '',
+                  task: Optional[TaskControl] = None) -> Dict[str, list]:
+    """把Cookie按可注册域名分组，query不为空时只包含匹配的Cookie
+
+    没有查询条件时直接遍历域名索引，每个不同的域名只计算一次可注册域名；
+    每组中的Cookie保持原来的顺序。
+    """
+    if store.index is None:
+        store.index = DomainIndex.build(store.cookies, task)
+    sites: Dict[str, str] = {}
+    groups: Dict[str, list] = {}
+    if not query:
+        for domain, rows in store.index.rows.items():
+            if rows:
+                groups.setdefault(registrable_domain(domain), []).append(rows)
+        cookies = store.cookies
+        for site, row_lists in groups.items():
+            rows = row_lists[0] if len(row_lists) == 1 else sorted(
+                row for rows in row_lists for row in rows)
+            groups[site] = [cookies[row] for row in rows]
+        return groups
+
+    for cookie in store.filter(query, task):
+        domain = domain_of(cookie)
+        site = sites.get(domain)
+        if site is None:
+            site = sites[domain] = registrable_domain(domain)
+        group = groups.get(site)
+        if group is None:
+            groups[site] = [cookie]
+        else:
+            group.append(cookie)
+    return groups
+
+def site_file_names(sites, extension: str = '.json') -> Dict[str, str]:
+    """为每个可注册域名分配文件名，替换不能用于文件名的字符，重名时追加序号"""
+    names = {}
+    used = set()
+    for site in sites:
+        stem = _UNSAFE_NAME_CHARS.sub('_', site) or NO_DOMAIN_NAME
+        name = f'{stem}{extension}'
+        counter = 1
+        while name.lower() in used:
+            counter += 1
+            name = f'{stem}_{counter}{extension}'
+        used.add(name.lower())
+        names[site] = name
+    return names
+
+def write_groups(groups: Dict[str, list], output_dir: str, extension: str = '.json',
+                 workers: int = SPLIT_WRITERS,
+                 task: Optional[TaskControl] = None) -> List[Tuple[str, str, int]]:
+    """并行写出每组Cookie，返回[(可注册域名, 文件路径, Cookie数量)]
+
+    同时提交的写出任务不超过线程数的两倍，避免一次排队上万个任务。
+    取消时等待已开始的文件写完，已写出的文件保留。
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sites = sorted(groups)
+    names = site_file_names(sites, extension)
+    written = []
+    total = len(sites)
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for done, site in enumerate(sites):
+            if task is not None:
+                task.check()
+                task.progress(done, total, '正在写出')
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+            path = os.path.join(output_dir, names[site])
+            pending.add(pool.submit(save_cookies, path, groups[site]))
+            written.append((site, path, len(groups[site])))
+        for future in pending:
+            future.result()
+    return written
+
+def split_store(store: CookieStore, output_dir: str, query: str = '',
+                extension: str = '.json', workers: int = SPLIT_WRITERS,
+                task: Optional[TaskControl] = None) -> List[Tuple[str, str, int]]:
+    """把Cookie按可注册域名拆分到output_dir下的多个文件，格式由extension决定"""
+    with traced(task, 'group') as stage:
+        groups = group_by_site(store, query, task)
+        stage.rows = len(groups)
+    with traced(task, 'write') as stage:
+        written = write_groups(groups, output_dir, extension, workers, task)
+        stage.rows = sum(count for _, _, count in written)
+    return written
+
+def split_from(store: Optional[CookieStore], text: Optional[str], query: str, output_dir: str,
+               extension: str = '.json', task: Optional[TaskControl] = None):
+    """必要时重新解析文本，再按可注册域名拆分，返回(解析结果, 写出的文件列表)"""
+    store = parse_if_changed(store, text, task)
+    return store, split_store(store, output_dir, query, extension, task=task)
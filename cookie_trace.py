@@ -0,0 +1,281 @@
+"""操作耗时统计
+
+每个操作（读取文件、提取、保存等）记录各阶段的耗时、行数和内存占用，界面在状态栏显示摘要。
+设置环境变量COOKIE_EXTRACTOR_TRACE为一个目录（命令行模式可用--trace）后，
+每个操作结束时还会在该目录写出JSON记录和cProfile数据（.prof，可用snakeviz等工具查看）。
+"""
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+# 设置后把每个操作的记录和性能分析数据写入此目录
+TRACE_DIR_ENV = 'COOKIE_EXTRACTOR_TRACE'
+
+# 操作名称 → 界面显示的名称
+OPERATION_LABELS = {
+    'load': '读取文件',
+    'paste': '解析粘贴内容',
+    'extract': '提取',
+    'save': '保存',
+    'watch': '导入变化的文件',
+    'split': '按域名拆分',
+    'merge': '合并文件',
+    'diff': '对比快照',
+    'cli_extract': '提取文件',
+    'cli_split': '拆分文件',
+    'cli_merge': '合并文件',
+    'cli_diff': '对比快照',
+}
+
+# 阶段名称 → 界面显示的名称
+STAGE_LABELS = {
+    'hash': '校验',
+    'cache_read': '读缓存',
+    'cache_write': '写缓存',
+    'read': '读取',
+    'parse': '解析',
+    'index': '索引',
+    'match': '匹配',
+    'filter': '过滤',
+    'group': '分组',
+    'merge': '去重合并',
+    'join': '对比',
+    'display': '显示',
+    'encode': '编码',
+    'write': '写入',
+}
+
+_file_lock = threading.Lock()
+
+def trace_dir() -> Optional[str]:
+    return os.environ.get(TRACE_DIR_ENV) or None
+
+def memory_usage() -> Tuple[int, int]:
+    """返回进程当前和历史峰值的常驻内存（字节），无法获取时为0"""
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t),
+                            ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t),
+                            ('PeakPagefileUsage', ctypes.c_size_t)]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters),
+                                                        counters.cb):
+                return counters.WorkingSetSize, counters.PeakWorkingSetSize
+        except Exception:
+            pass
+        return 0, 0
+    try:
+        current = peak = 0
+        with open('/proc/self/status', 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmRSS:'):
+                    current = int(line.split()[1]) * 1024
+                elif line.startswith(b'VmHWM:'):
+                    peak = int(line.split()[1]) * 1024
+        return current, peak
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS以字节为单位，其他系统以KB为单位
+        return 0, peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return 0, 0
+
+def format_bytes(size: int) -> str:
+    return f'{size / (1 << 20):.0f} MB'
+
+class Stage:
+    """一个阶段的统计"""
+    __slots__ = ('seconds', 'rows')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+
+# 正在统计内存峰值的操作，tracemalloc的峰值只在没有其他操作时重置
+_measuring_traces: set = set()
+_measure_lock = threading.Lock()
+
+class OperationTrace:
+    """一次操作的各阶段统计
+
+    同名阶段多次出现时累加耗时（例如流式读取时每一块的读取时间）。
+    启用记录目录时同时对执行操作的线程做cProfile性能分析，并用tracemalloc统计Python内存峰值。
+    """
+    def __init__(self, operation: str, output_dir: Optional[str] = None):
+        self.operation = operation
+        self.output_dir = output_dir if output_dir is not None else trace_dir()
+        self.stages: Dict[str, Stage] = {}
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+        self.memory: Dict[str, int] = {}
+        # 开始时的常驻内存，结束时报告这次操作前后的变化
+        self._start_rss = memory_usage()[0]
+        self._profile: Optional[cProfile.Profile] = None
+        # 在start_profile()和stop_profile()之间统计Python内存峰值
+        self._measuring = False
+        self._python_peak: Optional[int] = None
+        self._peak_shared = False
+        if self.output_dir and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage_of(self, name: str) -> Stage:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage()
+        return stage
+
+    def add(self, name: str, seconds: float, rows: Optional[int] = None):
+        """累加某阶段的耗时，rows不为None时更新该阶段的行数"""
+        stage = self.stage_of(name)
+        stage.seconds += seconds
+        if rows is not None:
+            stage.rows = rows
+
+    def merge(self, other: 'OperationTrace'):
+        """汇总子任务的统计：耗时和行数累加"""
+        for name, stage in other.stages.items():
+            target = self.stage_of(name)
+            target.seconds += stage.seconds
+            if stage.rows is not None:
+                target.rows = (target.rows or 0) + stage.rows
+
+    def start_profile(self):
+        """在执行操作的线程中调用，开始性能分析和内存峰值统计
+
+        tracemalloc的峰值是全进程共用的，只在没有其他操作正在统计时才重置；
+        与其他操作重叠时峰值包含它们的分配，记录中标出python_peak_shared。
+        同时只能有一个cProfile分析器（Python 3.12起），已有其他分析器时不做性能分析。
+        """
+        if not self.output_dir:
+            return
+        if not self._measuring:
+            self._measuring = True
+            with _measure_lock:
+                if _measuring_traces:
+                    for trace in _measuring_traces:
+                        trace._peak_shared = True
+                    self._peak_shared = True
+                elif tracemalloc.is_tracing():
+                    tracemalloc.reset_peak()
+                _measuring_traces.add(self)
+        if self._profile is None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                return
+            self._profile = profile
+
+    def stop_profile(self):
+        """在执行操作的线程中调用，结束性能分析并记下内存峰值"""
+        if self._profile is not None:
+            self._profile.disable()
+        if self._measuring:
+            self._measuring = False
+            with _measure_lock:
+                _measuring_traces.discard(self)
+                if tracemalloc.is_tracing():
+                    self._python_peak = tracemalloc.get_traced_memory()[1]
+
+    def finish(self) -> 'OperationTrace':
+        """结束统计，启用记录目录时写出记录"""
+        self.seconds = time.perf_counter() - self.started
+        rss, peak_rss = memory_usage()
+        self.memory = {'rss_bytes': rss, 'peak_rss_bytes': peak_rss}
+        if rss and self._start_rss:
+            self.memory['rss_delta_bytes'] = rss - self._start_rss
+        if self._python_peak is not None:
+            self.memory['python_peak_bytes'] = self._python_peak
+            if self._peak_shared:
+                self.memory['python_peak_shared'] = True
+        if self.output_dir:
+            self._write()
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'operation': self.operation,
+            'seconds': self.seconds,
+            'rows': self.rows,
+            'stages': {name: {'seconds': stage.seconds, 'rows': stage.rows}
+                       for name, stage in self.stages.items()},
+            'memory': self.memory,
+        }
+
+    def summary(self) -> str:
+        """状态栏显示的摘要
+
+        内存优先显示这次操作的Python内存峰值（启用记录目录时才统计），其次是操作前后
+        常驻内存的变化；都没有时显示进程的历史峰值，并标明是整个进程的。
+        """
+        parts = []
+        for name, stage in self.stages.items():
+            text = f'{STAGE_LABELS.get(name, name)} {stage.seconds:.2f}s'
+            if stage.rows is not None:
+                text += f'（{stage.rows}行）'
+            parts.append(text)
+        text = f'{OPERATION_LABELS.get(self.operation, self.operation)}：共 {self.seconds:.2f}s'
+        if parts:
+            text += '，' + '，'.join(parts)
+        memory = self.memory
+        if memory.get('python_peak_bytes'):
+            text += f'，内存峰值 {format_bytes(memory["python_peak_bytes"])}'
+            if memory.get('python_peak_shared'):
+                text += '（含同时进行的操作）'
+        elif 'rss_delta_bytes' in memory:
+            delta = memory['rss_delta_bytes']
+            text += f'，内存变化 {"+" if delta >= 0 else "-"}{format_bytes(abs(delta))}'
+        elif memory.get('peak_rss_bytes'):
+            text += f'，进程内存峰值 {format_bytes(memory["peak_rss_bytes"])}'
+        return text
+
+    def _write(self):
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        base = os.path.join(self.output_dir, f'{stamp}-{os.getpid()}-{self.operation}')
+        try:
+            with _file_lock:
+                os.makedirs(self.output_dir, exist_ok=True)
+                with open(base + '.json', 'w', encoding='utf-8') as f:
+                    json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+                if self._profile is not None:
+                    self._profile.dump_stats(base + '.prof')
+        except OSError:
+            pass
+
+@contextmanager
+def traced(task, name: str):
+    """统计一个阶段的耗时；task没有trace时只执行代码块
+
+    代码块内可以给返回的Stage设置rows。
+    """
+    trace = getattr(task, 'trace', None)
+    stage = Stage()
+    started = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        if trace is not None:
+            trace.add(name, time.perf_counter() - started, stage.rows)
@@ -0,0 +1,118 @@
+"""监视文件夹中的Cookie导出文件
+
+每次扫描只比较文件的大小和修改时间，只有新增或变化的文件才重新解析；
+解析结果合并到同一个CookieStore及其域名索引中，文件变化时替换该文件原来的Cookie。
+"""
+import os
+import fnmatch
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from cookie_core import CookieStore, DomainIndex, TaskControl, load_cookie_file
+from cookie_cache import load_cached
+from cookie_readers import READ_ERRORS
+
+# 监视的文件类型
+WATCH_PATTERNS = ('*.json', '*.json.gz', '*.json.zst', '*.zip')
+
+class FolderWatch:
+    """监视一个文件夹，把其中所有Cookie文件合并到store中
+
+    监视的文件常被反复改写，默认不读写磁盘缓存，以免挤掉缓存中其他的大文件；
+    use_cache为True时通过缓存读取。
+    """
+    def __init__(self, directory: str, patterns=WATCH_PATTERNS, use_cache: bool = False):
+        self.directory = os.path.abspath(directory)
+        self.patterns = patterns
+        self._load = load_cached if use_cache else load_cookie_file
+        self.store = CookieStore([], self.directory)
+        self.store.index = DomainIndex()
+        # 文件路径 → 已处理的版本(大小, 修改时间)；后台扫描时读取，合并时修改，由_lock保护
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        # 文件路径 → 该文件的Cookie在store中的行号
+        self._rows: Dict[str, range] = {}
+        # 文件路径 → 最近一次解析失败的原因
+        self.errors: Dict[str, Exception] = {}
+
+    @property
+    def file_count(self) -> int:
+        return len(self._rows)
+
+    def scan(self) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        """返回(新增或变化的文件 → 当前版本, 已删除的文件)"""
+        current = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name.lower()
+                if not any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                current[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            versions = dict(self._versions)
+        changed = {path: version for path, version in sorted(current.items())
+                   if versions.get(path) != version}
+        removed = [path for path in versions if path not in current]
+        return changed, removed
+
+    def mark(self, path: str, version: Tuple[int, int]):
+        """记录文件已处理的版本"""
+        with self._lock:
+            self._versions[path] = version
+
+    def collect(self, task: Optional[TaskControl] = None):
+        """扫描并解析变化的文件，不修改store，可在后台线程中运行
+
+        返回值交给merge()合并；解析失败的文件（例如还没写完）保留原来的Cookie，
+        文件再次变化时重新解析。
+        """
+        changed, removed = self.scan()
+        loaded = []
+        total = len(changed)
+        for done, (path, version) in enumerate(changed.items()):
+            if task is not None:
+                task.check()
+                task.progress(done, total, '正在导入变化的文件')
+            try:
+                loaded.append((path, version, self._load(path, task=task), None))
+            except READ_ERRORS as e:
+                loaded.append((path, version, None, e))
+        return loaded, removed
+
+    def merge(self, loaded, removed) -> Tuple[List[int], list]:
+        """合并collect()的结果，返回(新增的行号, 被移除的Cookie)
+
+        被替换的行在store中留空，留空的行过多时压缩store，各文件的行号随之更新。
+        """
+        store = self.store
+        added: List[int] = []
+        dropped = []
+        for path in removed:
+            dropped.extend(store.discard(self._rows.pop(path, ())))
+            with self._lock:
+                self._versions.pop(path, None)
+            self.errors.pop(path, None)
+        for path, version, parsed, error in loaded:
+            self.mark(path, version)
+            if parsed is None:
+                self.errors[path] = error
+                continue
+            self.errors.pop(path, None)
+            dropped.extend(store.discard(self._rows.pop(path, ())))
+            rows = store.append(parsed.cookies)
+            self._rows[path] = rows
+            added.extend(rows)
+        if store.needs_compact:
+            mapping = store.compact()
+            # 每个文件的行是连续的，压缩后仍然连续
+            self._rows = {path: range(mapping[rows.start], mapping[rows.start] + len(rows))
+                          if rows else range(0)
+                          for path, rows in self._rows.items()}
+            added = [mapping[row] for row in added]
+        return added, dropped
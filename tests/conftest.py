@@ -0,0 +1,6 @@
+"""测试共用设置：从仓库根目录导入各模块"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
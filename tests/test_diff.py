@@ -0,0 +1,107 @@
+"""对比两份Cookie快照"""
+import json
+
+import pytest
+
+from cookie_core import CookieStore, compact_cookies, load_cookie_file
+from cookie_diff import (DIFF_ADDED, DIFF_CHANGED, DIFF_REMOVED, PREVIOUS_KEY, STATUS_KEY,
+                         diff_files, diff_stores, diff_summary)
+
+
+def cookie(name, value='v', expiration=100, domain='.a.com', path='/', **fields):
+    return {'domain': domain, 'name': name, 'path': path, 'value': value,
+            'expirationDate': expiration, **fields}
+
+
+def store(cookies, records=True):
+    return CookieStore(compact_cookies(cookies) if records else list(cookies))
+
+
+def statuses(rows):
+    return [(row.status, row['name']) for row in rows]
+
+
+OLD = [cookie('same'), cookie('value', 'old'), cookie('expires', expiration=100),
+       cookie('gone'), cookie('flags', secure=False)]
+NEW = [cookie('added'), cookie('flags', secure=True), cookie('expires', expiration=200),
+       cookie('same'), cookie('value', 'new')]
+
+
+@pytest.mark.parametrize('old_records, new_records', [(True, True), (False, False),
+                                                      (False, True)])
+def test_statuses_and_counts(old_records, new_records):
+    rows, counts = diff_stores(store(OLD, old_records), store(NEW, new_records))
+    # 新增和改变的按新快照的顺序，删除的在最后；只改变其他字段的不算改变
+    assert statuses(rows) == [(DIFF_ADDED, 'added'), (DIFF_CHANGED, 'expires'),
+                              (DIFF_CHANGED, 'value'), (DIFF_REMOVED, 'gone')]
+    assert counts == {DIFF_ADDED: 1, DIFF_REMOVED: 1, DIFF_CHANGED: 2}
+    assert diff_summary(counts) == '新增 1 个，删除 1 个，改变 2 个'
+
+
+def test_identical_snapshots():
+    rows, counts = diff_stores(store(OLD), store(OLD))
+    assert rows == [] and counts == {DIFF_ADDED: 0, DIFF_REMOVED: 0, DIFF_CHANGED: 0}
+
+
+def test_empty_sides():
+    rows, counts = diff_stores(store([]), store(NEW))
+    assert counts[DIFF_ADDED] == len(NEW) and counts[DIFF_REMOVED] == 0
+    rows, counts = diff_stores(store(OLD), store([]))
+    assert [row.status for row in rows] == [DIFF_REMOVED] * len(OLD)
+
+
+def test_key_is_domain_name_path():
+    old = [cookie('n'), cookie('n', domain='b.com'), cookie('n', path='/x')]
+    new = [cookie('n'), cookie('n', domain='c.com'), cookie('n', path='/y')]
+    rows, counts = diff_stores(store(old), store(new))
+    assert counts == {DIFF_ADDED: 2, DIFF_REMOVED: 2, DIFF_CHANGED: 0}
+    assert [(row.status, row['domain'], row['path']) for row in rows] == [
+        (DIFF_ADDED, 'c.com', '/'), (DIFF_ADDED, '.a.com', '/y'),
+        (DIFF_REMOVED, 'b.com', '/'), (DIFF_REMOVED, '.a.com', '/x')]
+
+
+def test_duplicate_keys_keep_last():
+    # 同一份快照中重复的键以最后一条为准，重复的行不单独计数
+    old = [cookie('dup', 'a'), cookie('dup', 'b'), cookie('other')]
+    rows, counts = diff_stores(store(old), store([cookie('dup', 'b'), cookie('other')]))
+    assert rows == [] and counts == {DIFF_ADDED: 0, DIFF_REMOVED: 0, DIFF_CHANGED: 0}
+    rows, counts = diff_stores(store(old), store([cookie('dup', 'a'), cookie('dup', 'c'),
+                                                  cookie('other')]))
+    assert statuses(rows) == [(DIFF_CHANGED, 'dup')]
+    assert rows[0].old['value'] == 'b' and rows[0]['value'] == 'c'
+    assert counts == {DIFF_ADDED: 0, DIFF_REMOVED: 0, DIFF_CHANGED: 1}
+
+
+def test_unhashable_keys_are_added_and_removed():
+    rows, counts = diff_stores(store([cookie('n', domain=['a.com'])]),
+                               store([cookie('n', domain=['a.com'])]))
+    assert counts == {DIFF_ADDED: 1, DIFF_REMOVED: 1, DIFF_CHANGED: 0}
+
+
+def test_query_filters_both_sides():
+    old = [cookie('a', 'old'), cookie('b', 'old', domain='b.com')]
+    new = [cookie('a', 'new'), cookie('b', 'new', domain='b.com')]
+    rows, counts = diff_stores(store(old), store(new), '.a.com')
+    assert statuses(rows) == [(DIFF_CHANGED, 'a')]
+
+
+def test_row_access_and_export():
+    rows, _ = diff_stores(store([cookie('n', 'old', 100)]), store([cookie('n', 'new', None)]))
+    row = rows[0]
+    assert row[STATUS_KEY] == row.get(STATUS_KEY) == '改变'
+    assert row.get('missing', 'x') == 'x'
+    assert row.describe().splitlines()[:2] == ['改变', '值：old → new']
+    exported = row.to_dict()
+    assert exported[STATUS_KEY] == DIFF_CHANGED and exported['value'] == 'new'
+    assert exported[PREVIOUS_KEY] == {'value': 'old', 'expirationDate': 100}
+
+
+def test_diff_files(tmp_path):
+    paths = []
+    for name, cookies in (('old', OLD), ('new', NEW)):
+        path = tmp_path / f'{name}.json'
+        path.write_text(json.dumps(cookies), encoding='utf-8')
+        paths.append(str(path))
+    old, new, rows, counts = diff_files(*paths, loader=load_cookie_file)
+    assert len(old) == len(OLD) and len(new) == len(NEW)
+    assert counts == {DIFF_ADDED: 1, DIFF_REMOVED: 1, DIFF_CHANGED: 2}
@@ -0,0 +1,106 @@
+"""域名模式的匹配器"""
+import re
+
+import pytest
+
+import cookie_match
+from cookie_match import (KIND_GLOB, KIND_REGEX, KIND_SUBSTRING, KIND_SUFFIX, RegexTimeout,
+                          UnsafeRegex, check_regex, domain_matcher, make_domain_predicate, pattern_kind)
+
+DOMAINS = [
+    'google.com', '.google.com', 'www.google.com', '.mail.google.com', 'GOOGLE.COM',
+    'google.com.evil.net', 'notgoogle.com', 'goggle.com', 'gxogle.com', 'google.co.uk',
+    'twitter.com', '.x.com', 'x.com', 'a.b', '', 'localhost', '127.0.0.1',
+]
+
+
+@pytest.mark.parametrize('pattern, kind', [
+    ('twitter', KIND_SUBSTRING),
+    ('.google.com', KIND_SUFFIX),
+    ('*.google.com', KIND_GLOB),
+    ('g?ogle.com', KIND_GLOB),
+    ('.*google', KIND_REGEX),
+    ('^x\\.com$', KIND_REGEX),
+])
+def test_pattern_kind(pattern, kind):
+    assert pattern_kind(pattern) == kind
+
+
+@pytest.mark.parametrize('pattern', [
+    '(a+)+', '(a*)*b', '(\\w+\\.)+x$', '(a|ab)*c', '(a|a)+$', '.*.*.*.*x',
+    '(\\w|.){1,100}z$', '(a|aa){1,100}$', '(a|a){1,100}b', '(a?){25}a{25}',
+    '(a{1,10}){1,10}b', '(\\d{1,3}\\.){3}',
+])
+def test_rejects_catastrophic_patterns(pattern):
+    with pytest.raises(UnsafeRegex):
+        check_regex(pattern)
+    with pytest.raises(UnsafeRegex):
+        make_domain_predicate(pattern)
+
+
+@pytest.mark.parametrize('pattern', [
+    '\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}', '(www|mail)\\.google', '(?:ab|cd)+',
+    '^.*\\.google\\.com$', 'goo+gle', '(?:www\\.)?google', '(?>a+)+b',
+])
+def test_accepts_safe_patterns(pattern):
+    check_regex(pattern)
+    make_domain_predicate(pattern)('www.google.com')
+
+
+def test_invalid_regex():
+    with pytest.raises(ValueError, match='无效') as info:
+        check_regex('(')
+    assert not isinstance(info.value, UnsafeRegex)
+
+
+def _regex_equivalent(pattern):
+    """与快速路径语义相同的正则判断"""
+    kind = pattern_kind(pattern)
+    if kind == KIND_SUBSTRING:
+        regex = re.compile(re.escape(pattern), re.IGNORECASE)
+        return lambda domain: regex.search(domain) is not None
+    if kind == KIND_SUFFIX:
+        regex = re.compile(r'^\.*(.*\.)?' + re.escape(pattern.strip('.')) + r'$', re.IGNORECASE)
+        return lambda domain: regex.match(domain) is not None
+    regex = re.compile(cookie_match.glob_to_regex(pattern), re.IGNORECASE)
+    return lambda domain: regex.match(domain) is not None
+
+
+@pytest.mark.parametrize('pattern', [
+    'google', 'GOOGLE', '.google.com', '.x.com', '*.google.com', '*google*', '*.com',
+    'google*', 'www.*', 'g?ogle.com', '*o?gle*', 'google.com*uk',
+])
+def test_fast_paths_match_regex_path(pattern):
+    fast = make_domain_predicate(pattern)
+    slow = _regex_equivalent(pattern)
+    for domain in DOMAINS:
+        assert fast(domain) == slow(domain), (pattern, domain)
+
+
+def test_time_budget(monkeypatch):
+    # 假时钟每次读取推进0.5秒，即每次匹配耗时0.5秒
+    now = [0.0]
+
+    def clock():
+        now[0] += 0.5
+        return now[0]
+    monkeypatch.setattr(cookie_match.time, 'perf_counter', clock)
+    predicate = make_domain_predicate('^(www|mail)\\.', budget=1.2)
+    assert predicate('www.google.com')
+    assert not predicate('google.com')
+    with pytest.raises(RegexTimeout):
+        predicate('mail.google.com')
+    # 新的判断函数重新计时
+    assert make_domain_predicate('^(www|mail)\\.', budget=1.2)('mail.google.com')
+
+
+def test_no_budget_for_fast_paths_or_none():
+    assert make_domain_predicate('.google.com') is domain_matcher('.google.com')[1]
+    assert make_domain_predicate('^www', budget=None) is domain_matcher('^www')[1]
+
+
+def test_long_input_not_matched():
+    # 超长的输入不交给正则，单次匹配的耗时有上限
+    predicate = make_domain_predicate('\\w*\\w*\\w*x$')
+    assert predicate('a' * 100 + 'x')
+    assert not predicate('a' * cookie_match.MAX_REGEX_INPUT + 'x')
@@ -0,0 +1,115 @@
+"""合并多个Cookie文件时的去重规则"""
+import json
+
+import pytest
+
+from cookie_core import compact_cookies, load_cookie_file
+from cookie_merge import MERGE_LAST, MERGE_NEWEST, CookieMerger, expiration_of, merge_files
+
+
+def cookie(value, expiration=None, domain='.a.com', name='sid', path='/', **fields):
+    result = {'domain': domain, 'name': name, 'path': path, 'value': value, **fields}
+    if expiration is not None:
+        result['expirationDate'] = expiration
+    return result
+
+
+def merged_values(rule, *files, records=False):
+    merger = CookieMerger(rule)
+    for cookies in files:
+        merger.add(compact_cookies(cookies) if records else cookies)
+    return [c['value'] for c in merger.cookies], merger.duplicates
+
+
+@pytest.mark.parametrize('records', [False, True])
+def test_newest_keeps_latest_expiration(records):
+    values, duplicates = merged_values(
+        MERGE_NEWEST, [cookie('old', 200), cookie('other', 1, name='x')], [cookie('new', 100)],
+        records=records)
+    assert values == ['old', 'other'] and duplicates == 1
+
+
+@pytest.mark.parametrize('records', [False, True])
+def test_newest_tie_keeps_later_file(records):
+    values, _ = merged_values(MERGE_NEWEST, [cookie('first', 100)], [cookie('second', 100)],
+                              records=records)
+    assert values == ['second']
+
+
+@pytest.mark.parametrize('records', [False, True])
+def test_last_keeps_later_file(records):
+    values, duplicates = merged_values(MERGE_LAST, [cookie('old', 200)], [cookie('new', 100)],
+                                       records=records)
+    assert values == ['new'] and duplicates == 1
+
+
+def test_session_loses_to_persistent():
+    # 会话Cookie没有过期时间，重复时让给有过期时间的
+    values, _ = merged_values(MERGE_NEWEST, [cookie('persistent', 100)],
+                              [cookie('session', session=True)])
+    assert values == ['persistent']
+    values, _ = merged_values(MERGE_NEWEST, [cookie('session', session=True)],
+                              [cookie('persistent', 100)])
+    assert values == ['persistent']
+    # 两条都是会话Cookie时保留后面的
+    values, _ = merged_values(MERGE_NEWEST, [cookie('a', None)], [cookie('b', '')])
+    assert values == ['b']
+
+
+@pytest.mark.parametrize('value, expected', [
+    (100, 100), (1.5, 1.5), ('200', 200.0), (None, 0.0), ('', 0.0), ('soon', 0.0),
+    ([1], 0.0),
+])
+def test_expiration_of(value, expected):
+    assert expiration_of({'expirationDate': value}) == expected
+    assert expiration_of(compact_cookies([{'expirationDate': value}])[0]) == expected
+
+
+def test_order_follows_first_occurrence():
+    values, _ = merged_values(MERGE_LAST, [cookie('a1', name='a'), cookie('b1', name='b')],
+                              [cookie('b2', name='b'), cookie('c2', name='c'),
+                               cookie('a2', name='a')])
+    assert values == ['a2', 'b2', 'c2']
+
+
+def test_key_is_domain_name_path():
+    values, duplicates = merged_values(MERGE_LAST, [
+        cookie('1'), cookie('2', domain='b.com'), cookie('3', path='/x'), cookie('4', name='y'),
+        cookie('5'),
+    ])
+    assert values == ['5', '2', '3', '4'] and duplicates == 1
+
+
+@pytest.mark.parametrize('records', [False, True])
+def test_missing_key_fields(records):
+    # 缺少的字段按None参与去重
+    files = [[{'name': 'n', 'value': '1'}, {'value': '2'}], [{'name': 'n', 'value': '3'}]]
+    values, duplicates = merged_values(MERGE_LAST, *files, records=records)
+    assert values == ['3', '2'] and duplicates == 1
+
+
+@pytest.mark.parametrize('records', [False, True])
+def test_unhashable_key_fields_never_merge(records):
+    files = [[cookie('1', domain=['a.com']), cookie('2', name={'x': 1})],
+             [cookie('3', domain=['a.com']), cookie('4')]]
+    values, duplicates = merged_values(MERGE_LAST, *files, records=records)
+    assert values == ['1', '2', '3', '4'] and duplicates == 0
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError, match='未知的合并规则'):
+        CookieMerger('oldest')
+
+
+def test_merge_files(tmp_path):
+    paths = []
+    for index, cookies in enumerate([[cookie('old', 200), cookie('x', name='x')],
+                                     [cookie('new', 100), cookie('y', domain='b.com')]]):
+        path = tmp_path / f'{index}.json'
+        path.write_text(json.dumps(cookies), encoding='utf-8')
+        paths.append(str(path))
+    store, duplicates = merge_files(paths, loader=load_cookie_file, workers=2)
+    assert [c['value'] for c in store.cookies] == ['old', 'x', 'y'] and duplicates == 1
+    store, _ = merge_files(paths, rule=MERGE_LAST, loader=load_cookie_file)
+    assert [c['value'] for c in store.cookies] == ['new', 'x', 'y']
+    assert [c['value'] for c in store.filter('b.com')] == ['y']
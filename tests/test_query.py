@@ -0,0 +1,110 @@
+"""Cookie查询语言"""
+from datetime import datetime
+
+import pytest
+
+from cookie_core import CookieQuery, CookieStore, compact_cookies
+
+
+def ts(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+COOKIES = [
+    {'domain': '.google.com', 'name': 'SID', 'value': 'a', 'path': '/', 'secure': True,
+     'httpOnly': True, 'sameSite': 'lax', 'expirationDate': ts('2024-01-31T00:00')},
+    {'domain': 'mail.google.com', 'name': 'GMAIL_AT', 'value': 'b', 'path': '/mail',
+     'secure': True, 'httpOnly': False, 'sameSite': 'Strict',
+     'expirationDate': ts('2024-01-31T18:30:15')},
+    {'domain': 'xgoogle.com', 'name': 'x', 'value': 'c d', 'path': '/', 'secure': False,
+     'expirationDate': ts('2024-02-01T00:00')},
+    {'domain': '.x.com', 'name': 'auth_token', 'value': 'e', 'path': '/', 'secure': True,
+     'sameSite': 'no_restriction', 'session': True},
+    {'domain': 'twitter.com', 'name': 'ct0', 'value': '', 'path': '/',
+     'expirationDate': ts('2024-01-30T23:59:59')},
+]
+
+
+@pytest.fixture(scope='module')
+def store():
+    return CookieStore(compact_cookies([dict(cookie) for cookie in COOKIES]))
+
+
+def names(store, query):
+    return [cookie['name'] for cookie in store.filter(query)]
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', ['SID', 'GMAIL_AT', 'x', 'auth_token', 'ct0']),
+    ('google', ['SID', 'GMAIL_AT', 'x']),
+    ('.google.com', ['SID', 'GMAIL_AT']),
+    ('domain:.google.com', ['SID', 'GMAIL_AT']),
+    ('name:SID', ['SID']),
+    ('name:sid', []),
+    ('name:G*', ['GMAIL_AT']),
+    ('name:SID|ct0', ['SID', 'ct0']),
+    ('value:"c d"', ['x']),
+    ('value:', ['ct0']),
+    ('path:/mail', ['GMAIL_AT']),
+    ('samesite:strict', ['GMAIL_AT']),
+    ('secure:true', ['SID', 'GMAIL_AT', 'auth_token']),
+    ('secure:no', ['x', 'ct0']),
+    ('httponly:1 secure:yes', ['SID']),
+    ('google secure:false', ['x']),
+    ('expires:session', ['auth_token']),
+    ('Domain:.x.com NAME:auth_token', ['auth_token']),
+])
+def test_fields(store, query, expected):
+    assert names(store, query) == expected
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('domain:.google.com|twitter', ['SID', 'GMAIL_AT', 'ct0']),
+    ('domain:*.x.com|mail.google.com', ['GMAIL_AT', 'auth_token']),
+    # 正则候选不改变后缀候选的含义：.google.com不会匹配xgoogle.com
+    ('domain:.google.com|^twitter', ['SID', 'GMAIL_AT', 'ct0']),
+    ('domain:^(mail|twitter)\\.', ['GMAIL_AT', 'ct0']),
+    ('domain:^(mail|twitter)\\.|.x.com', ['GMAIL_AT', 'auth_token', 'ct0']),
+])
+def test_domain_alternatives(store, query, expected):
+    assert names(store, query) == expected
+
+
+@pytest.mark.parametrize('query, expected', [
+    # 日期表示一整天
+    ('expires:2024-01-31', ['SID', 'GMAIL_AT']),
+    ('expires>=2024-01-31', ['SID', 'GMAIL_AT', 'x']),
+    ('expires>2024-01-31', ['x']),
+    ('expires<2024-01-31', ['ct0']),
+    ('expires<=2024-01-31', ['SID', 'GMAIL_AT', 'ct0']),
+    # 带时刻时精确到秒
+    ('expires:2024-01-31T18:30:15', ['GMAIL_AT']),
+    ('expires>2024-01-31T18:30', ['GMAIL_AT', 'x']),
+    ('expires<2024-01-31T00:00', ['ct0']),
+    (f'expires:{int(ts("2024-02-01T00:00"))}', ['x']),
+    ('expires>now', []),
+    ('expires<now', ['SID', 'GMAIL_AT', 'x', 'ct0']),
+])
+def test_expires(store, query, expected):
+    assert names(store, query) == expected
+
+
+@pytest.mark.parametrize('query, message', [
+    ('name>abc', '字段name不支持比较运算符>'),
+    ('secure:', '字段secure缺少取值'),
+    ('secure:maybe', '字段secure的取值应为true或false：maybe'),
+    ('expires:tomorrow', '无法识别的时间：tomorrow'),
+    ('expires>session', 'session只能用于expires:session'),
+    ('domain:(a', '无效的域名模式'),
+    ('domain:(a+)+', '嵌套的重复'),
+])
+def test_errors(query, message):
+    with pytest.raises(ValueError, match=message.replace('(', r'\(').replace('+', r'\+')):
+        CookieQuery.parse(query)
+
+
+def test_plain_text_is_domain_pattern():
+    query = CookieQuery.parse('  twitter  ')
+    assert query.domain_patterns == ['twitter'] and query.predicate is None
+    # 没有已知字段时整段按域名模式处理，包括其中的冒号
+    assert CookieQuery.parse('foo:bar').domain_patterns == ['foo:bar']
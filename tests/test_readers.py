@@ -0,0 +1,88 @@
+"""浏览器数据库的读取器"""
+import sqlite3
+
+import pytest
+
+import cookie_match
+from cookie_match import RegexTimeout, UnsafeRegex
+from cookie_readers import FirefoxReader
+
+HOSTS = ['.google.com', 'www.google.com', 'mail.google.com', '.twitter.com', 'example.org']
+
+
+@pytest.fixture
+def firefox_db(tmp_path):
+    path = tmp_path / 'cookies.sqlite'
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE moz_cookies (id INTEGER PRIMARY KEY, host TEXT, name TEXT, '
+                     'value TEXT, path TEXT, expiry INTEGER, isHttpOnly INTEGER, '
+                     'isSecure INTEGER, sameSite INTEGER)')
+        conn.executemany('INSERT INTO moz_cookies (host, name, value, path, expiry, isHttpOnly, '
+                         'isSecure, sameSite) VALUES (?, ?, ?, ?, ?, 0, 0, 0)',
+                         [(host, f'n{i}', 'v', '/', 0) for i, host in enumerate(HOSTS)])
+    conn.close()
+    return str(path)
+
+
+def domains(file_path, pattern):
+    return [cookie['domain'] for cookie in FirefoxReader().read(file_path, pattern)]
+
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('.google.com', ['.google.com', 'www.google.com', 'mail.google.com']),
+    ('twitter', ['.twitter.com']),
+    ('*.google.com', ['.google.com', 'www.google.com', 'mail.google.com']),
+    ('^(www|mail)\\.', ['www.google.com', 'mail.google.com']),
+])
+def test_domain_filter(firefox_db, pattern, expected):
+    assert domains(firefox_db, pattern) == expected
+
+
+def test_unsafe_regex_rejected(firefox_db):
+    with pytest.raises(UnsafeRegex):
+        domains(firefox_db, '(a+)+')
+
+
+def test_regexp_time_budget(firefox_db, monkeypatch):
+    # 假时钟每次读取推进0.75秒，即每次匹配耗时1.5秒，第二次匹配时超过默认的2秒
+    now = [0.0]
+
+    def clock():
+        now[0] += 0.75
+        return now[0]
+    monkeypatch.setattr(cookie_match.time, 'perf_counter', clock)
+    with pytest.raises(RegexTimeout):
+        domains(firefox_db, '^(www|mail)\\.')
+
+
+def test_load_for_query_pushes_domain_down(firefox_db, monkeypatch, tmp_path):
+    monkeypatch.setenv('COOKIE_EXTRACTOR_CACHE_DIR', str(tmp_path / 'cache'))
+    from cookie_cache import load_for_query
+    store = load_for_query(firefox_db, '.google.com')
+    assert store.prefilter == '.google.com'
+    assert len(store) == 3
+    full = load_for_query(firefox_db, '')
+    assert full.prefilter == '' and len(full) == len(HOSTS)
+
+
+@pytest.mark.parametrize('prefilter, query, covered', [
+    ('.google.com', '.google.com', True),
+    ('.google.com', '.mail.google.com', True),
+    ('.google.com', '*.mail.google.com', True),
+    ('.google.com', 'google', False),
+    ('.google.com', '', False),
+    ('.google.com', '.com', False),
+    ('.google.com', '^www', False),
+    ('.google.com', 'domain:.mail.google.com secure:true', True),
+    ('google', 'mail.google', True),
+    ('google', '.google.com', True),
+    ('google', 'goog', False),
+    ('^(www|mail)\\.', '^(www|mail)\\.', True),
+    ('^(www|mail)\\.', '^www\\.', False),
+    ('', 'anything', True),
+])
+def test_store_covers(prefilter, query, covered):
+    from cookie_core import CookieStore
+    store = CookieStore([])
+    store.prefilter = prefilter
+    assert store.covers(query) is covered
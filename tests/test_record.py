@@ -0,0 +1,97 @@
+"""CookieRecord：与dict读取方式相同的紧凑记录"""
+import json
+
+import pytest
+
+import cookie_cache
+from cookie_cache import JarCache
+from cookie_core import CookieRecord, compact_cookies, encode_cookies
+
+FULL = {'domain': '.example.com', 'expirationDate': 1735689600.5, 'hostOnly': False,
+        'httpOnly': True, 'name': 'sid', 'path': '/', 'sameSite': 'lax', 'secure': True,
+        'session': False, 'storeId': '0', 'value': 'abc', 'id': 1}
+
+CASES = {
+    'full': FULL,
+    'missing_keys': {'name': 'n', 'value': 'v'},
+    'empty': {},
+    'nulls': {'domain': None, 'name': 'n', 'value': None, 'path': None, 'expirationDate': None,
+              'secure': None, 'httpOnly': None, 'sameSite': None, 'storeId': None, 'id': None},
+    'non_bool_flags': {'domain': 'a.com', 'secure': 1, 'httpOnly': 'true', 'hostOnly': 0,
+                       'session': [True]},
+    'unknown_fields': {'domain': 'a.com', 'partitionKey': {'topLevelSite': 'https://a.com'},
+                       'priority': 'High', 'name': 'n', 'firstPartyDomain': ''},
+    'unhashable_values': {'domain': ['a.com'], 'name': {'x': 1}, 'path': '/'},
+}
+
+
+@pytest.fixture(params=sorted(CASES))
+def cookie(request):
+    return CASES[request.param]
+
+
+def test_round_trip(cookie):
+    record = CookieRecord.from_dict(dict(cookie), {})
+    restored = record.to_dict()
+    assert restored == cookie
+    # 字段顺序原样保留
+    assert list(restored) == list(cookie)
+    assert list(record) == list(cookie) and len(record) == len(cookie)
+    assert record == cookie and record == CookieRecord.from_dict(dict(cookie))
+    assert json.loads(encode_cookies([record])) == [cookie]
+
+
+def test_dict_access(cookie):
+    record = CookieRecord.from_dict(dict(cookie))
+    for key in ('domain', 'name', 'value', 'path', 'expirationDate', 'sameSite', 'storeId', 'id',
+                'secure', 'httpOnly', 'hostOnly', 'session', 'partitionKey', 'nosuchkey'):
+        assert (key in record) == (key in cookie)
+        assert record.get(key) == cookie.get(key)
+        assert record.get(key, 'default') == cookie.get(key, 'default')
+        if key in cookie:
+            assert record[key] == cookie[key]
+        else:
+            with pytest.raises(KeyError):
+                record[key]
+
+
+def test_flag_attributes():
+    record = CookieRecord.from_dict(dict(CASES['non_bool_flags']))
+    assert record.secure == 1 and record.httpOnly == 'true' and record.hostOnly == 0
+    record = CookieRecord.from_dict(dict(FULL))
+    assert record.secure is True and record.hostOnly is False and record.extra is None
+    assert CookieRecord.from_dict({}).secure is None
+
+
+def test_shared_layouts_and_strings():
+    strings = {}
+    first = CookieRecord.from_dict(dict(FULL), strings)
+    second = CookieRecord.from_dict(json.loads(json.dumps(FULL)), strings)
+    assert first.layout is second.layout
+    assert first.domain is second.domain and first.path is second.path
+
+
+def test_state_rebuilds_record(cookie):
+    record = CookieRecord.from_dict(dict(cookie))
+    assert CookieRecord(*record.state()).to_dict() == cookie
+
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    cookies = [CASES[name] for name in sorted(CASES) if name != 'unhashable_values']
+    jar = tmp_path / 'jar.json'
+    jar.write_text(json.dumps(cookies), encoding='utf-8')
+    cache = JarCache(str(tmp_path / 'cache'))
+    cache.load(str(jar))
+
+    def not_parsed(*args, **kwargs):
+        raise AssertionError('应当从缓存读取')
+    monkeypatch.setattr(cookie_cache, 'load_cookie_file', not_parsed)
+    cached = cache.load(str(jar))
+    assert [cookie.to_dict() for cookie in cached.cookies] == cookies
+    assert [list(cookie) for cookie in cached.cookies] == [list(cookie) for cookie in cookies]
+    assert len(cached.filter('a.com')) == 2
+
+
+def test_compact_keeps_records():
+    record = CookieRecord.from_dict(dict(FULL))
+    assert compact_cookies([record, dict(FULL)]) == [FULL, FULL]
@@ -0,0 +1,22 @@
+"""按可注册域名拆分"""
+import pytest
+
+from cookie_split import registrable_domain
+
+
+@pytest.mark.parametrize('domain, expected', [
+    ('.www.google.com', 'google.com'),
+    ('a.b.c.google.com', 'google.com'),
+    ('google.com', 'google.com'),
+    ('.www.bbc.co.uk', 'bbc.co.uk'),
+    ('user.github.io', 'user.github.io'),
+    ('.Bucket.S3.AmazonAWS.com', 'bucket.s3.amazonaws.com'),
+    ('a.bucket.s3.amazonaws.com', 'bucket.s3.amazonaws.com'),
+    ('s3.amazonaws.com', 's3.amazonaws.com'),
+    ('x.amazonaws.com', 'x.amazonaws.com'),
+    ('localhost', 'localhost'),
+    ('127.0.0.1', '127.0.0.1'),
+    ('[::1]:8080', '[::1]:8080'),
+])
+def test_registrable_domain(domain, expected):
+    assert registrable_domain(domain) == expected
@@ -0,0 +1,111 @@
+"""流式解析：iter_json_array和iter_file_chunks"""
+import codecs
+import json
+
+import pytest
+
+import cookie_core
+from cookie_core import iter_file_chunks, iter_json_array, load_cookie_chunks, load_cookie_file
+
+COOKIES = [
+    {'domain': '.example.com', 'name': 'sid', 'value': 'a"b\\"c', 'path': '/'},
+    {'domain': '.中文.cn', 'name': '名称', 'value': 'Ünïcödé 😀', 'secure': True},
+    {'domain': 'x.org', 'name': 'n', 'value': '', 'expirationDate': 1.5e9, 'hostOnly': None},
+]
+TEXT = json.dumps(COOKIES, ensure_ascii=False, indent=1)
+
+
+def split_at(text, *positions):
+    bounds = [0, *positions, len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64])
+def test_fixed_size_chunks(size):
+    chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+    assert list(iter_json_array(chunks)) == COOKIES
+
+
+def test_every_split_position():
+    # 包括转义的引号、数字和true/null恰好被截断的位置
+    for i in range(len(TEXT) + 1):
+        assert list(iter_json_array(split_at(TEXT, i))) == COOKIES, i
+
+
+def test_scalar_elements_split_across_chunks():
+    text = '[12345, -1.5e10, "x\\"y", true, null, "\\u00e9"]'
+    expected = json.loads(text)
+    for i in range(len(text) + 1):
+        assert list(iter_json_array(split_at(text, i))) == expected, i
+
+
+@pytest.mark.parametrize('text', ['[]', ' [ ] ', '\n[\n]\n'])
+def test_empty_array(text):
+    assert list(iter_json_array([text])) == []
+    assert list(iter_json_array(split_at(text, len(text) // 2))) == []
+
+
+@pytest.mark.parametrize('text', ['[', '[{"domain": "a.com"', '[{"domain": "a.com"},',
+                                  '[{"domain": "a.c', '[1, 2'])
+def test_truncated_input(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(split_at(text, len(text) // 2)))
+
+
+def test_extra_data_and_trailing():
+    with pytest.raises(ValueError):
+        list(iter_json_array(['[{"a": 1}] x']))
+    assert list(iter_json_array(['[{"a": 1}] x'], trailing=True)) == [{'a': 1}]
+
+
+def test_not_an_array():
+    with pytest.raises(ValueError):
+        list(iter_json_array(['{"domain": "a.com"}']))
+
+
+@pytest.mark.parametrize('element', ['1', '"text"', 'null', '[]'])
+def test_non_object_elements(element):
+    text = f'[{{"domain": "a.com", "name": "n"}}, {element}]'
+    with pytest.raises(ValueError, match='JSON对象'):
+        load_cookie_chunks([text])
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """让文件按很小的块读取，多字节字符和BOM会落在块边界上"""
+    monkeypatch.setattr(cookie_core, 'IO_CHUNK_SIZE', 5)
+
+
+@pytest.mark.parametrize('encoding, bom', [
+    ('utf-8', b''),
+    ('utf-8', codecs.BOM_UTF8),
+    ('utf-16-le', codecs.BOM_UTF16_LE),
+    ('utf-16-be', codecs.BOM_UTF16_BE),
+    ('utf-16-le', b''),
+])
+def test_file_chunks_encodings(tmp_path, small_chunks, encoding, bom):
+    path = tmp_path / 'cookies.json'
+    path.write_bytes(bom + TEXT.encode(encoding))
+    assert ''.join(iter_file_chunks(str(path))) == TEXT
+    assert list(iter_json_array(iter_file_chunks(str(path)))) == COOKIES
+
+
+def test_file_chunks_gzip(tmp_path, small_chunks):
+    import gzip
+    path = tmp_path / 'cookies.json.gz'
+    path.write_bytes(gzip.compress(codecs.BOM_UTF8 + TEXT.encode('utf-8')))
+    assert list(iter_json_array(iter_file_chunks(str(path)))) == COOKIES
+
+
+def test_file_chunks_empty(tmp_path):
+    path = tmp_path / 'empty.json'
+    path.write_bytes(b'')
+    assert list(iter_file_chunks(str(path))) == []
+
+
+def test_load_cookie_file(tmp_path, small_chunks):
+    path = tmp_path / 'cookies.json'
+    path.write_text(TEXT, encoding='utf-8')
+    store = load_cookie_file(str(path))
+    assert [cookie.to_dict() for cookie in store.cookies] == COOKIES
+    assert store.filter('.example.com')[0]['name'] == 'sid'
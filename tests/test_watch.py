@@ -0,0 +1,52 @@
+"""监视文件夹"""
+import json
+import os
+
+from cookie_watch import FolderWatch
+
+
+def write_jar(path, domain, count, version):
+    cookies = [{'domain': domain, 'name': f'n{i}', 'value': f'v{version}'} for i in range(count)]
+    path.write_text(json.dumps(cookies), encoding='utf-8')
+    # 保证每次改写的修改时间都不同
+    os.utime(path, ns=(version * 10**9, version * 10**9))
+
+
+def sync(watch):
+    return watch.merge(*watch.collect())
+
+
+def test_rewrites_replace_rows_and_compact(tmp_path):
+    write_jar(tmp_path / 'a.json', 'a.com', 10, 1)
+    write_jar(tmp_path / 'b.json', 'b.com', 3, 1)
+    watch = FolderWatch(str(tmp_path))
+    added, dropped = sync(watch)
+    assert len(added) == 13 and dropped == []
+
+    for version in range(2, 50):
+        write_jar(tmp_path / 'a.json', 'a.com', 10, version)
+        added, dropped = sync(watch)
+        assert len(dropped) == 10
+        assert {watch.store.cookies[row]['value'] for row in added} == {f'v{version}'}
+
+    store = watch.store
+    assert len(store) == 13
+    # 被替换的行不会无限累积
+    assert len(store.cookies) <= 2 * 13 + 10
+    assert [cookie['value'] for cookie in store.filter('a.com')] == ['v49'] * 10
+    assert len(store.filter('b.com')) == 3
+    assert len(store.filter('')) == 13
+    # 压缩后各文件的行号仍然正确
+    for path, rows in watch._rows.items():
+        domain = os.path.basename(path)[0] + '.com'
+        assert all(store.cookies[row]['domain'] == domain for row in rows)
+
+
+def test_removed_file(tmp_path):
+    write_jar(tmp_path / 'a.json', 'a.com', 4, 1)
+    watch = FolderWatch(str(tmp_path))
+    sync(watch)
+    os.remove(tmp_path / 'a.json')
+    added, dropped = sync(watch)
+    assert added == [] and len(dropped) == 4
+    assert len(watch.store) == 0 and watch.file_count == 0